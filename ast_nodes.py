@@ -1,93 +1,240 @@
 # ast_nodes.py
 
+import sys
+
+# A posição (linha, coluna) de cada nó é guardada em um único inteiro:
+# os bits baixos guardam a coluna e os altos, a linha.
+BITS_COLUNA = 24
+MASCARA_COLUNA = (1 << BITS_COLUNA) - 1
+
+def compactar_posicao(line, col):
+    return (line << BITS_COLUNA) | min(col, MASCARA_COLUNA)
+
 class Node:
-    """Nó base para todos os nós da AST. Agora armazena o token de origem."""
+    """
+    Nó base para todos os nós da AST. Guarda apenas a posição compactada do token
+    de origem (não o token inteiro); todas as classes usam __slots__ para evitar
+    um __dict__ por instância.
+    """
+    __slots__ = ('_pos',)
+
     def __init__(self, token):
-        self.token = token
-        # Extrai linha e coluna para acesso fácil
-        if token:
-            self.line = token[2]
-            self.col = token[3]
-        else:
-            self.line = 0
-            self.col = 0
+        self._pos = compactar_posicao(token[2], token[3]) if token else 0
+
+    @property
+    def line(self):
+        return self._pos >> BITS_COLUNA
+
+    @property
+    def col(self):
+        return self._pos & MASCARA_COLUNA
+
+class ExpressionNode(Node):
+    """Base das expressões. `tipo` é preenchido pelo AnalisadorSemantico."""
+    __slots__ = ('tipo',)
+
+    def __init__(self, token):
+        super().__init__(token)
+        self.tipo = None
 
 class ProgramNode(Node):
     """Representa o programa inteiro."""
+    __slots__ = ('statements',)
+
     def __init__(self, statements):
         super().__init__(token=None) # Nó raiz não corresponde a um token específico
         self.statements = statements
 
 class AssignmentNode(Node):
     """Representa uma atribuição: variavel = expressao."""
+    __slots__ = ('variable', 'expression')
+
     def __init__(self, variable_node, expression_node, token):
         super().__init__(token) # O token do operador '='
         self.variable = variable_node
         self.expression = expression_node
 
-class BinOpNode(Node):
+class BinOpNode(ExpressionNode):
     """Representa uma operação binária: esquerda OPERADOR direita."""
+    __slots__ = ('left', 'op', 'right')
+
     def __init__(self, left, op_token, right):
         super().__init__(op_token) # O token do operador: '+', '*', etc.
         self.left = left
-        self.op = op_token[1]
+        # Internado: todos os nós com o mesmo operador compartilham a mesma string
+        self.op = sys.intern(op_token[1])
         self.right = right
 
+class FunctionDefNode(Node):
+    """Representa a definição de uma função: def nome(parametros): corpo."""
+    __slots__ = ('name', 'params', 'body')
+
+    def __init__(self, name_token, params, body, token):
+        super().__init__(token) # O token 'def'
+        self.name = sys.intern(name_token[1])
+        self.params = params # Nomes dos parâmetros (strings), na ordem da definição
+        self.body = body
+
+class ReturnNode(Node):
+    """Representa um return; `expression` é None quando não há valor."""
+    __slots__ = ('expression',)
+
+    def __init__(self, expression, token):
+        super().__init__(token) # O token 'return'
+        self.expression = expression
+
+class ExpressionStatementNode(Node):
+    """Representa uma expressão usada como comando (uma chamada de função)."""
+    __slots__ = ('expression',)
+
+    def __init__(self, expression):
+        super().__init__(token=None)
+        self._pos = expression._pos # Mesma posição da expressão
+        self.expression = expression
+
+class CallNode(ExpressionNode):
+    """Representa uma chamada de função: nome(argumentos)."""
+    __slots__ = ('name', 'args')
+
+    def __init__(self, name_token, args):
+        super().__init__(name_token)
+        self.name = sys.intern(name_token[1])
+        self.args = args
+
+class UnaryOpNode(ExpressionNode):
+    """Representa uma operação unária: OPERADOR operando ('-', '+' ou '!' para o not)."""
+    __slots__ = ('op', 'operand')
+
+    def __init__(self, op_token, operand):
+        super().__init__(op_token)
+        self.op = sys.intern(op_token[1])
+        self.operand = operand
+
 class IfNode(Node):
     """Representa um comando if-else."""
+    __slots__ = ('condition', 'if_block', 'else_block')
+
     def __init__(self, condition, if_block, else_block, token):
         super().__init__(token) # O token 'if'
         self.condition = condition
         self.if_block = if_block
         self.else_block = else_block
-        
+
 class ForNode(Node):
     """Representa um laço for."""
+    __slots__ = ('iterator_var', 'iterable_var', 'body')
+
     def __init__(self, iterator_var, iterable_var, body, token):
         super().__init__(token) # O token 'for'
         self.iterator_var = iterator_var
         self.iterable_var = iterable_var
         self.body = body
 
+class ForRangeNode(Node):
+    """Representa um laço for sobre range(start, stop, step) (argumentos omitidos viram 0 e 1)."""
+    __slots__ = ('iterator_var', 'start', 'stop', 'step', 'body')
+
+    def __init__(self, iterator_var, start, stop, step, body, token):
+        super().__init__(token) # O token 'for'
+        self.iterator_var = iterator_var
+        self.start = start
+        self.stop = stop
+        self.step = step
+        self.body = body
+
+class WhileNode(Node):
+    """Representa um laço while."""
+    __slots__ = ('condition', 'body')
+
+    def __init__(self, condition, body, token):
+        super().__init__(token) # O token 'while'
+        self.condition = condition
+        self.body = body
+
+class AppendNode(Node):
+    """Representa lista.append(valor), usado como comando."""
+    __slots__ = ('list_var', 'value')
+
+    def __init__(self, list_var, value, token):
+        super().__init__(token) # O token 'append'
+        self.list_var = list_var
+        self.value = value
+
 class PrintNode(Node):
     """Representa uma chamada a printf."""
+    __slots__ = ('args',)
+
     def __init__(self, args, token):
         super().__init__(token) # O token 'printf'
         self.args = args
 
-class VariableNode(Node):
+class VariableNode(ExpressionNode):
     """Representa o uso de uma variável."""
+    __slots__ = ('name',)
+
     def __init__(self, token):
         super().__init__(token)
-        self.name = token[1]
+        # Nomes se repetem muito: internar faz todas as ocorrências apontarem para a mesma string
+        self.name = sys.intern(token[1])
+
+class LenNode(ExpressionNode):
+    """Representa len(lista)."""
+    __slots__ = ('operand',)
+
+    def __init__(self, operand, token):
+        super().__init__(token) # O token 'len'
+        self.operand = operand
+
+class IndexNode(ExpressionNode):
+    """Representa a leitura de um elemento: lista[indice]."""
+    __slots__ = ('list_var', 'index')
+
+    def __init__(self, list_var, index, token):
+        super().__init__(token) # O token '['
+        self.list_var = list_var
+        self.index = index
 
-class NumberNode(Node):
+class NumberNode(ExpressionNode):
     """Representa um literal numérico."""
+    __slots__ = ('value',)
+
     def __init__(self, token):
         super().__init__(token)
         self.value = token[1]
 
-class StringNode(Node):
+class BoolNode(NumberNode):
+    """Representa True ou False (valor '1' ou '0'); nas outras fases vale como um NumberNode."""
+    __slots__ = ()
+
+class StringNode(ExpressionNode):
     """Representa um literal de string."""
+    __slots__ = ('value',)
+
     def __init__(self, token):
         super().__init__(token)
         self.value = token[1]
 
-class ListNode(Node):
+class ListNode(ExpressionNode):
     """Representa a criação de uma lista."""
+    __slots__ = ('elements',)
+
     def __init__(self, elements, token):
         super().__init__(token) # O token '['
         self.elements = elements
 
-class DictNode(Node):
+class DictNode(ExpressionNode):
     """Representa a criação de um dicionário (não traduzível)."""
+    __slots__ = ('pairs',)
+
     def __init__(self, pairs, token):
         super().__init__(token)
         self.pairs = pairs
 
 class DictItemNode(Node):
     """Representa um par chave-valor em um dicionário."""
+    __slots__ = ('key', 'value')
+
     def __init__(self, key, value, token):
         super().__init__(token) # O token ':'
         self.key = key
-        self.value = value
\ No newline at end of file
+        self.value = value
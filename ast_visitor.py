@@ -0,0 +1,143 @@
+# ast_visitor.py
+
+import inspect
+from ast_nodes import Node, AssignmentNode, ForNode, ForRangeNode
+
+class NodeVisitor:
+    """
+    Base dos passes sobre a AST (análise semântica, geração de código, otimizações)
+    que percorre a árvore sem recursão do Python.
+
+    Cada nó é despachado para `visit_<NomeDaClasse>` (ou para o visitante da classe
+    base mais próxima) por uma tabela calculada uma única vez por classe de nó. O
+    método pode ser uma função comum, que devolve o resultado diretamente, ou um
+    gerador: cada `yield filho` suspende o método até o filho ser visitado e devolve
+    o resultado do filho como valor do `yield`. Os geradores suspensos ficam em uma
+    pilha explícita, então a profundidade da árvore (ex.: cadeias
+    `a1 + a2 + ... + a5000`) é limitada apenas pela memória.
+    """
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Cada subclasse tem sua própria tabela: classe do nó -> (função, é_gerador)
+        cls._despacho = {}
+
+    _despacho = {}
+
+    def _resolver(self, classe_no):
+        cls = type(self)
+        # Uma subclasse de nó sem visitante próprio usa o da classe base (ex.: BoolNode)
+        for classe in classe_no.__mro__:
+            metodo = getattr(cls, f'visit_{classe.__name__}', None)
+            if metodo is not None:
+                break
+        else:
+            metodo = cls.generic_visit
+        entrada = (metodo, inspect.isgeneratorfunction(metodo))
+        cls._despacho[classe_no] = entrada
+        return entrada
+
+    def generic_visit(self, node):
+        return None
+
+    def visit(self, node):
+        despacho = self._despacho
+        entrada = despacho.get(type(node)) or self._resolver(type(node))
+        metodo, eh_gerador = entrada
+        if not eh_gerador:
+            return metodo(self, node)
+
+        pilha = [metodo(self, node)]
+        valor = None
+        erro = None
+        while pilha:
+            gerador = pilha[-1]
+            try:
+                if erro is None:
+                    filho = gerador.send(valor)
+                else:
+                    # Propaga a exceção do filho para dentro do método pai
+                    excecao, erro = erro, None
+                    filho = gerador.throw(excecao)
+            except StopIteration as fim:
+                pilha.pop()
+                valor = fim.value
+                continue
+            except BaseException as e:
+                pilha.pop()
+                if not pilha:
+                    raise
+                erro = e
+                continue
+
+            entrada = despacho.get(type(filho)) or self._resolver(type(filho))
+            metodo, eh_gerador = entrada
+            try:
+                if eh_gerador:
+                    pilha.append(metodo(self, filho))
+                    valor = None
+                else:
+                    valor = metodo(self, filho)
+            except BaseException as e:
+                erro = e
+        return valor
+
+_campos_por_classe = {}
+
+def campos_de(classe_no):
+    """Nomes dos campos de uma classe de nó (os __slots__ de toda a hierarquia, sem os privados)."""
+    campos = _campos_por_classe.get(classe_no)
+    if campos is None:
+        campos = []
+        for classe in reversed(classe_no.__mro__):
+            for campo in getattr(classe, '__slots__', ()):
+                if not campo.startswith('_') and campo not in campos:
+                    campos.append(campo)
+        campos = _campos_por_classe[classe_no] = tuple(campos)
+    return campos
+
+def filhos(node):
+    """Filhos diretos de um nó: campos que contêm nós ou listas de nós."""
+    for campo in campos_de(type(node)):
+        valor = getattr(node, campo)
+        if isinstance(valor, Node):
+            yield valor
+        elif isinstance(valor, list):
+            for item in valor:
+                if isinstance(item, Node):
+                    yield item
+
+def percorrer(raiz):
+    """Todos os nós da subárvore em pré-ordem, usando uma pilha explícita."""
+    pilha = [raiz]
+    while pilha:
+        node = pilha.pop()
+        yield node
+        pilha.extend(reversed(list(filhos(node))))
+
+def variaveis_atribuidas(raiz):
+    """Nomes de todas as variáveis escritas dentro da subárvore (atribuições e iteradores de for)."""
+    nomes = set()
+    for node in percorrer(raiz):
+        if isinstance(node, AssignmentNode):
+            nomes.add(node.variable.name)
+        elif isinstance(node, (ForNode, ForRangeNode)):
+            nomes.add(node.iterator_var.name)
+    return nomes
+
+def filhos_com_campo(node):
+    """Como `filhos`, mas devolve (campo, índice, filho); o índice é None para campos simples."""
+    for campo in campos_de(type(node)):
+        valor = getattr(node, campo)
+        if isinstance(valor, Node):
+            yield campo, None, valor
+        elif isinstance(valor, list):
+            for indice, item in enumerate(valor):
+                if isinstance(item, Node):
+                    yield campo, indice, item
+
+def substituir_filho(pai, campo, indice, novo):
+    """Troca o filho de `pai` identificado por (campo, índice), como devolvido por `filhos_com_campo`."""
+    if indice is None:
+        setattr(pai, campo, novo)
+    else:
+        getattr(pai, campo)[indice] = novo
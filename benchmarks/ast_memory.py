@@ -0,0 +1,180 @@
+# benchmarks/ast_memory.py
+#
+# Mede quantos bytes cada nó da AST ocupa depois do parsing, comparando o layout
+# atual (ast_nodes.py, com __slots__) com o layout antigo (um __dict__ por nó e o
+# token de origem guardado junto com cópias de linha/coluna).
+#
+# Uso (a partir da raiz do repositório):
+#   python -m benchmarks.ast_memory [--statements N]
+
+import argparse
+import gc
+import tracemalloc
+from contextlib import contextmanager
+
+import ast_nodes
+import py_to_c_parser
+from py_to_c_lexer import PythonToCLexer
+from py_to_c_parser import Parser
+
+# --- Layout antigo dos nós, reproduzido para comparação ---
+
+class LegacyNode:
+    def __init__(self, token):
+        self.token = token
+        if token:
+            self.line = token[2]
+            self.col = token[3]
+        else:
+            self.line = 0
+            self.col = 0
+
+class LegacyProgramNode(LegacyNode):
+    def __init__(self, statements):
+        super().__init__(token=None)
+        self.statements = statements
+
+class LegacyAssignmentNode(LegacyNode):
+    def __init__(self, variable_node, expression_node, token):
+        super().__init__(token)
+        self.variable = variable_node
+        self.expression = expression_node
+
+class LegacyBinOpNode(LegacyNode):
+    def __init__(self, left, op_token, right):
+        super().__init__(op_token)
+        self.left = left
+        self.op = op_token[1]
+        self.right = right
+
+class LegacyIfNode(LegacyNode):
+    def __init__(self, condition, if_block, else_block, token):
+        super().__init__(token)
+        self.condition = condition
+        self.if_block = if_block
+        self.else_block = else_block
+
+class LegacyForNode(LegacyNode):
+    def __init__(self, iterator_var, iterable_var, body, token):
+        super().__init__(token)
+        self.iterator_var = iterator_var
+        self.iterable_var = iterable_var
+        self.body = body
+
+class LegacyPrintNode(LegacyNode):
+    def __init__(self, args, token):
+        super().__init__(token)
+        self.args = args
+
+class LegacyVariableNode(LegacyNode):
+    def __init__(self, token):
+        super().__init__(token)
+        self.name = token[1]
+
+class LegacyNumberNode(LegacyNode):
+    def __init__(self, token):
+        super().__init__(token)
+        self.value = token[1]
+
+class LegacyStringNode(LegacyNode):
+    def __init__(self, token):
+        super().__init__(token)
+        self.value = token[1]
+
+class LegacyListNode(LegacyNode):
+    def __init__(self, elements, token):
+        super().__init__(token)
+        self.elements = elements
+
+LEGACY = {
+    'ProgramNode': LegacyProgramNode,
+    'AssignmentNode': LegacyAssignmentNode,
+    'BinOpNode': LegacyBinOpNode,
+    'IfNode': LegacyIfNode,
+    'ForNode': LegacyForNode,
+    'PrintNode': LegacyPrintNode,
+    'VariableNode': LegacyVariableNode,
+    'NumberNode': LegacyNumberNode,
+    'StringNode': LegacyStringNode,
+    'ListNode': LegacyListNode,
+}
+
+@contextmanager
+def nos_antigos():
+    """Faz o parser instanciar as classes do layout antigo durante o bloco."""
+    originais = {nome: getattr(py_to_c_parser, nome) for nome in LEGACY}
+    for nome, classe in LEGACY.items():
+        setattr(py_to_c_parser, nome, classe)
+    try:
+        yield
+    finally:
+        for nome, classe in originais.items():
+            setattr(py_to_c_parser, nome, classe)
+
+def gerar_programa(statements):
+    """Programa sintético com atribuições, expressões, prints, ifs e fors."""
+    linhas = ["lista = [1.5, 2.5, 3.5, 4.5]", "acc = 0"]
+    for i in range(statements):
+        resto = i % 4
+        if resto == 0:
+            linhas.append(f"v{i} = acc + {i} * 3 - (acc / 2)")
+        elif resto == 1:
+            linhas.append(f"print(\"valor\", v{i - 1}, acc)")
+        elif resto == 2:
+            linhas.append(f"if v{i - 2} > {i}:")
+            linhas.append(f"    acc = acc + v{i - 2}")
+            linhas.append("else:")
+            linhas.append("    acc = acc - 1")
+        else:
+            linhas.append("for item in lista:")
+            linhas.append("    acc = acc + item * 2")
+    return "\n".join(linhas) + "\n"
+
+def contar_nos(raiz):
+    total = 0
+    pilha = [raiz]
+    while pilha:
+        no = pilha.pop()
+        if isinstance(no, list):
+            pilha.extend(no)
+            continue
+        if no is None or isinstance(no, (str, int, tuple)):
+            continue
+        total += 1
+        campos = no.__slots__ if hasattr(no, '__slots__') else vars(no)
+        for campo in campos:
+            if campo not in ('token', '_pos', 'op', 'name', 'value', 'line', 'col'):
+                pilha.append(getattr(no, campo))
+    return total
+
+def medir(codigo, legado):
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    if legado:
+        with nos_antigos():
+            arvore = Parser(PythonToCLexer().iter_tokens(codigo)).parse()
+    else:
+        arvore = Parser(PythonToCLexer().iter_tokens(codigo)).parse()
+    gc.collect()
+    retido = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return retido, contar_nos(arvore)
+
+def main():
+    argparser = argparse.ArgumentParser(description="Memória por nó da AST: layout antigo x atual.")
+    argparser.add_argument('--statements', type=int, default=20000)
+    args = argparser.parse_args()
+
+    codigo = gerar_programa(args.statements)
+    print(f"Programa sintético: {args.statements} comandos, {len(codigo)} caracteres")
+    resultados = {}
+    for rotulo, legado in (('antes (__dict__ + token)', True), ('depois (__slots__)', False)):
+        retido, nos = medir(codigo, legado)
+        resultados[rotulo] = retido / nos
+        print(f"  {rotulo:26} {nos:>9} nós  {retido / 1024 / 1024:8.2f} MB  {retido / nos:7.1f} bytes/nó")
+    antes, depois = resultados.values()
+    print(f"  redução: {100 * (1 - depois / antes):.1f}%")
+
+if __name__ == "__main__":
+    main()
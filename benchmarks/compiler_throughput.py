@@ -0,0 +1,198 @@
+# benchmarks/compiler_throughput.py
+#
+# Mede o tempo e o pico de memória de cada fase do compilador (léxica, sintática,
+# semântica, otimização e geração de código) sobre programas sintéticos de
+# benchmarks/program_generator.py, e grava os resultados em JSON para comparar
+# versões e encontrar regressões.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m benchmarks.compiler_throughput --saida antes.json
+#   python -m benchmarks.compiler_throughput --saida depois.json
+#   python -m benchmarks.compiler_throughput --comparar antes.json depois.json
+#
+# O tempo de cada fase é o menor de --repeticoes execuções, sem o tracemalloc
+# ligado; o pico de memória vem de uma execução separada com o tracemalloc. Os
+# tokens são materializados em uma lista para que as fases léxica e sintática
+# possam ser medidas separadamente (no compilador eles são consumidos sob demanda).
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from benchmarks.program_generator import gerar_programa
+from code_generator import CodeGenerator
+from optimizer import otimizar
+from py_to_c_lexer import PythonToCLexer
+from py_to_c_parser import Parser
+from semantic_analyzer import AnalisadorSemantico
+
+FORMATO = 1
+
+FASES = ('lexica', 'sintatica', 'semantica', 'otimizacao', 'geracao')
+
+# Cenários padrão: cada um força uma dimensão diferente do programa
+CENARIOS = {
+    'linear': dict(comandos=20000, tamanho_expressao=4, profundidade=0, tamanho_lista=4),
+    'expressoes_longas': dict(comandos=300, tamanho_expressao=500, profundidade=0, tamanho_lista=4),
+    'aninhado': dict(comandos=5000, tamanho_expressao=4, profundidade=10, tamanho_lista=4),
+    'listas_grandes': dict(comandos=500, tamanho_expressao=4, profundidade=1, tamanho_lista=2000),
+}
+
+def executar_fases(codigo, nivel_otimizacao, medir):
+    """Executa o pipeline fase a fase; `medir(fase, funcao)` executa e mede cada etapa."""
+    tokens = medir('lexica', lambda: list(PythonToCLexer().iter_tokens(codigo)))
+    ast_tree = medir('sintatica', lambda: Parser(tokens).parse())
+    tabela_de_simbolos = medir('semantica', lambda: AnalisadorSemantico(ast_tree).analisar())
+    if nivel_otimizacao:
+        ast_tree = medir('otimizacao', lambda: otimizar(ast_tree, tabela_de_simbolos, nivel_otimizacao)[0])
+    medir('geracao', lambda: CodeGenerator(tabela_de_simbolos).generate(ast_tree))
+
+def medir_tempos(codigo, nivel_otimizacao, repeticoes):
+    melhores = {}
+
+    def medir(fase, funcao):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        decorrido = time.perf_counter() - inicio
+        melhores[fase] = min(decorrido, melhores.get(fase, decorrido))
+        return resultado
+
+    for _ in range(repeticoes):
+        gc.collect()
+        executar_fases(codigo, nivel_otimizacao, medir)
+    return melhores
+
+def medir_memoria(codigo, nivel_otimizacao):
+    """Pico de memória alocada durante cada fase, além do que já estava alocado antes dela."""
+    picos = {}
+
+    def medir(fase, funcao):
+        gc.collect()
+        antes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        resultado = funcao()
+        picos[fase] = tracemalloc.get_traced_memory()[1] - antes
+        return resultado
+
+    tracemalloc.start()
+    try:
+        executar_fases(codigo, nivel_otimizacao, medir)
+    finally:
+        tracemalloc.stop()
+    return picos
+
+def executar_cenario(parametros, nivel_otimizacao, repeticoes, semente):
+    codigo = gerar_programa(semente=semente, **parametros)
+    tempos = medir_tempos(codigo, nivel_otimizacao, repeticoes)
+    picos = medir_memoria(codigo, nivel_otimizacao)
+    return {
+        'parametros': parametros,
+        'caracteres': len(codigo),
+        'linhas': codigo.count("\n"),
+        'fases': {
+            fase: {'segundos': tempos[fase], 'pico_bytes': picos[fase]}
+            for fase in FASES if fase in tempos
+        },
+    }
+
+def imprimir_resultados(resultados):
+    for nome, cenario in resultados['cenarios'].items():
+        print(f"{nome}: {cenario['linhas']} linhas, {cenario['caracteres']} caracteres")
+        for fase, medidas in cenario['fases'].items():
+            print(f"  {fase:12} {medidas['segundos'] * 1000:10.2f} ms  {medidas['pico_bytes'] / 1024 / 1024:9.2f} MB")
+
+def comparar(caminho_base, caminho_novo, tolerancia):
+    """Mostra a variação de cada medida; devolve 1 se alguma piorou mais que `tolerancia` %."""
+    with open(caminho_base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(caminho_novo, encoding='utf-8') as f:
+        novo = json.load(f)
+
+    if base['nivel_otimizacao'] != novo['nivel_otimizacao']:
+        print(f"aviso: níveis de otimização diferentes (-O{base['nivel_otimizacao']} x -O{novo['nivel_otimizacao']})")
+    regressoes = 0
+    for nome, cenario in novo['cenarios'].items():
+        cenario_base = base['cenarios'].get(nome)
+        if cenario_base is None:
+            print(f"{nome}: sem medida na base")
+            continue
+        if cenario_base['parametros'] != cenario['parametros']:
+            print(f"{nome}: parâmetros diferentes, comparação ignorada")
+            continue
+        print(f"{nome}:")
+        for fase, medidas in cenario['fases'].items():
+            medidas_base = cenario_base['fases'].get(fase)
+            if medidas_base is None:
+                continue
+            linha = f"  {fase:12}"
+            for chave, unidade, escala in (('segundos', 'ms', 1000), ('pico_bytes', 'MB', 1 / 1024 / 1024)):
+                antes, depois = medidas_base[chave], medidas[chave]
+                variacao = 100 * (depois - antes) / antes if antes else 0.0
+                marca = ""
+                if variacao > tolerancia:
+                    marca = " REGRESSÃO"
+                    regressoes += 1
+                linha += f"  {antes * escala:9.2f} -> {depois * escala:9.2f} {unidade} ({variacao:+6.1f}%){marca}"
+            print(linha)
+    if regressoes:
+        print(f"{regressoes} medida(s) piores que a tolerância de {tolerancia}%")
+    return 1 if regressoes else 0
+
+def main(argv=None):
+    argparser = argparse.ArgumentParser(description="Tempo e memória por fase do compilador em programas sintéticos.")
+    argparser.add_argument('--cenario', action='append', choices=sorted(CENARIOS),
+                           help="cenário a executar (pode repetir); padrão: todos")
+    argparser.add_argument('--comandos', type=int, help="executa um cenário personalizado com estes parâmetros")
+    argparser.add_argument('--tamanho-expressao', type=int, default=8)
+    argparser.add_argument('--profundidade', type=int, default=2)
+    argparser.add_argument('--tamanho-lista', type=int, default=8)
+    argparser.add_argument('--escala', type=float, default=1.0,
+                           help="multiplica o número de comandos dos cenários (ex.: 0.1 para uma rodada rápida)")
+    argparser.add_argument('-O', dest='nivel_otimizacao', type=int, default=0)
+    argparser.add_argument('--repeticoes', type=int, default=3)
+    argparser.add_argument('--semente', type=int, default=0)
+    argparser.add_argument('--saida', help="arquivo JSON onde gravar os resultados")
+    argparser.add_argument('--comparar', nargs=2, metavar=('BASE', 'NOVO'),
+                           help="compara dois arquivos JSON gerados por este script")
+    argparser.add_argument('--tolerancia', type=float, default=10.0,
+                           help="piora percentual a partir da qual --comparar acusa regressão (padrão: 10)")
+    args = argparser.parse_args(argv)
+
+    if args.comparar:
+        return comparar(args.comparar[0], args.comparar[1], args.tolerancia)
+
+    if args.comandos is not None:
+        cenarios = {'personalizado': dict(comandos=args.comandos, tamanho_expressao=args.tamanho_expressao,
+                                          profundidade=args.profundidade, tamanho_lista=args.tamanho_lista)}
+    else:
+        cenarios = {nome: CENARIOS[nome] for nome in (args.cenario or CENARIOS)}
+        cenarios = {
+            nome: dict(parametros, comandos=max(1, int(parametros['comandos'] * args.escala)))
+            for nome, parametros in cenarios.items()
+        }
+
+    resultados = {
+        'formato': FORMATO,
+        'python': platform.python_version(),
+        'nivel_otimizacao': args.nivel_otimizacao,
+        'repeticoes': args.repeticoes,
+        'semente': args.semente,
+        'cenarios': {},
+    }
+    for nome, parametros in cenarios.items():
+        resultados['cenarios'][nome] = executar_cenario(
+            parametros, args.nivel_otimizacao, args.repeticoes, args.semente)
+
+    imprimir_resultados(resultados)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, sort_keys=True)
+            f.write("\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+# benchmarks/generated_code.py
+#
+# Mede o código gerado, não o compilador: cada programa de PROGRAMAS (laços com
+# '**', '//' e '%') é traduzido em cada nível de otimização, compilado pelo
+# compilador C local (native_build, perfil --perfil) e executado. Antes de medir,
+# confere que todos os níveis imprimem exatamente o mesmo que o próprio Python.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m benchmarks.generated_code [--iteracoes 1000000] [--saida codigo.json]
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from compile_api import compile_source
+from native_build import (PERFIL_PADRAO, PERFIS, ConfiguracaoNativa, ErroDeCompilacaoNativa,
+                          caminho_executavel, construir, localizar_compilador)
+
+NIVEIS = (0, 1, 2)
+
+# Os programas só imprimem inteiros: a saída pode ser comparada com a do Python
+PROGRAMAS = {
+    # x ** n com n literal (multiplicações a partir do -O1)
+    'potencias': """
+n = 0
+for i in range({iteracoes}):
+    x = i % 1000
+    n = n + x ** 2 + x ** 3 + x ** 4 - x ** 0
+    n = n % 1000000007
+print(n)
+""",
+    # Divisões e restos por potências de 2, com dividendos negativos (>> e & a partir do -O1)
+    'divisoes': """
+n = 0
+for i in range({iteracoes}):
+    x = i * 7 - 3000000
+    n = n + x // 8 + x % 16 - x // 1024 + x % 4096
+print(n)
+""",
+    # x ** 2 entre reais vira x * x; a base composta continua no pow()
+    'reais': """
+contagem = 0
+for i in range({iteracoes}):
+    y = i / {iteracoes}
+    if y ** 2 + (1 - y) ** 2 < 0.6:
+        contagem = contagem + 1
+print(contagem)
+""",
+}
+
+def executar_programa(comando):
+    resultado = subprocess.run(comando, capture_output=True, text=True)
+    if resultado.returncode != 0:
+        raise SystemExit(f"{comando[0]} terminou com código {resultado.returncode}: {resultado.stderr.strip()}")
+    return resultado.stdout
+
+def medir(executavel, repeticoes):
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        executar_programa([executavel])
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return melhor
+
+def executar_cenario(nome, codigo, config, diretorio, repeticoes):
+    esperado = executar_programa([sys.executable, '-c', codigo])
+    cenario = {'segundos': {}, 'otimizacoes': {}}
+    for nivel in NIVEIS:
+        resultado = compile_source(codigo, nivel_otimizacao=nivel)
+        if not resultado.sucesso:
+            raise SystemExit(f"{nome}: {resultado.diagnosticos[0]}")
+        arquivo_c = os.path.join(diretorio, f"{nome}_O{nivel}.c")
+        with open(arquivo_c, 'w', encoding='utf-8') as f:
+            f.write(resultado.c_code)
+        executavel = caminho_executavel(arquivo_c)
+        construir(arquivo_c, executavel, config)
+        if executar_programa([executavel]) != esperado:
+            raise SystemExit(f"{nome}: a saída com -O{nivel} difere da do Python")
+        cenario['segundos'][f"O{nivel}"] = medir(executavel, repeticoes)
+        cenario['otimizacoes'][f"O{nivel}"] = {descricao: quantidade
+                                               for descricao, quantidade in resultado.relatorio_otimizacao.items()
+                                               if quantidade}
+    cenario['aceleracao'] = cenario['segundos']['O0'] / cenario['segundos'][f"O{NIVEIS[-1]}"]
+    return cenario
+
+def main(argv=None):
+    argparser = argparse.ArgumentParser(description="Tempo de execução do C gerado em cada nível de otimização.")
+    argparser.add_argument('--programa', action='append', choices=sorted(PROGRAMAS),
+                           help="programa a executar (pode repetir); padrão: todos")
+    argparser.add_argument('--iteracoes', type=int, default=1000000)
+    argparser.add_argument('--repeticoes', type=int, default=3)
+    argparser.add_argument('--perfil', choices=sorted(PERFIS), default=PERFIL_PADRAO)
+    argparser.add_argument('--cc', help="compilador C (padrão: $CC, cc, gcc ou clang)")
+    argparser.add_argument('--saida', help="arquivo JSON onde gravar os resultados")
+    args = argparser.parse_args(argv)
+
+    try:
+        config = ConfiguracaoNativa(localizar_compilador(args.cc), args.perfil)
+    except ErroDeCompilacaoNativa as e:
+        raise SystemExit(str(e))
+    resultados = {'python': platform.python_version(), 'compilador': config.identidade.splitlines()[0],
+                  'perfil': args.perfil, 'iteracoes': args.iteracoes, 'repeticoes': args.repeticoes,
+                  'programas': {}}
+    with tempfile.TemporaryDirectory() as diretorio:
+        for nome in args.programa or PROGRAMAS:
+            codigo = PROGRAMAS[nome].format(iteracoes=args.iteracoes)
+            cenario = executar_cenario(nome, codigo, config, diretorio, args.repeticoes)
+            resultados['programas'][nome] = cenario
+            print(f"{nome}:")
+            for nivel, segundos in cenario['segundos'].items():
+                print(f"  -{nivel} {segundos * 1000:10.2f} ms")
+            print(f"  aceleração: {cenario['aceleracao']:.2f}x")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, sort_keys=True)
+            f.write("\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# benchmarks/lexer_throughput.py
+#
+# Compara o varredor próprio do PythonToCLexer com o caminho pelo módulo tokenize
+# (PythonToCLexer(usar_tokenize=True)) em programas sintéticos grandes de
+# benchmarks/program_generator.py. Antes de medir, confere que os dois produzem
+# exatamente os mesmos tokens.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m benchmarks.lexer_throughput [--escala 0.1] [--saida lexer.json]
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+
+from benchmarks.compiler_throughput import CENARIOS
+from benchmarks.program_generator import gerar_programa
+from py_to_c_lexer import PythonToCLexer
+
+VARREDORES = {
+    'tokenize': PythonToCLexer(usar_tokenize=True),
+    'proprio': PythonToCLexer(),
+}
+
+def medir(lexer, codigo, repeticoes):
+    melhor = None
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        for _ in lexer.iter_tokens(codigo):
+            pass
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return melhor
+
+def executar_cenario(parametros, repeticoes, semente):
+    codigo = gerar_programa(semente=semente, **parametros)
+    tokens = VARREDORES['proprio'].tokenize(codigo)
+    if tokens != VARREDORES['tokenize'].tokenize(codigo):
+        raise SystemExit("os dois varredores produziram tokens diferentes")
+    segundos = {nome: medir(lexer, codigo, repeticoes) for nome, lexer in VARREDORES.items()}
+    return {
+        'parametros': parametros,
+        'caracteres': len(codigo),
+        'tokens': len(tokens),
+        'segundos': segundos,
+        'aceleracao': segundos['tokenize'] / segundos['proprio'],
+    }
+
+def main(argv=None):
+    argparser = argparse.ArgumentParser(description="Varredor próprio x tokenize em programas sintéticos.")
+    argparser.add_argument('--cenario', action='append', choices=sorted(CENARIOS),
+                           help="cenário a executar (pode repetir); padrão: todos")
+    argparser.add_argument('--escala', type=float, default=1.0,
+                           help="multiplica o número de comandos dos cenários")
+    argparser.add_argument('--repeticoes', type=int, default=3)
+    argparser.add_argument('--semente', type=int, default=0)
+    argparser.add_argument('--saida', help="arquivo JSON onde gravar os resultados")
+    args = argparser.parse_args(argv)
+
+    resultados = {'python': platform.python_version(), 'repeticoes': args.repeticoes, 'cenarios': {}}
+    for nome in args.cenario or CENARIOS:
+        parametros = dict(CENARIOS[nome], comandos=max(1, int(CENARIOS[nome]['comandos'] * args.escala)))
+        cenario = executar_cenario(parametros, args.repeticoes, args.semente)
+        resultados['cenarios'][nome] = cenario
+        megabytes = cenario['caracteres'] / 1024 / 1024
+        print(f"{nome}: {cenario['tokens']} tokens, {megabytes:.2f} MB")
+        for varredor, segundos in cenario['segundos'].items():
+            print(f"  {varredor:10} {segundos * 1000:10.2f} ms  {megabytes / segundos:7.2f} MB/s")
+        print(f"  aceleração: {cenario['aceleracao']:.2f}x")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, sort_keys=True)
+            f.write("\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
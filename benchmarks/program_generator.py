@@ -0,0 +1,141 @@
+# benchmarks/program_generator.py
+#
+# Gera programas Python sintéticos, válidos no subconjunto aceito pelo compilador,
+# para medir como cada fase escala. Os parâmetros controlam o número de comandos,
+# o tamanho das expressões, a profundidade de aninhamento de if/for e o tamanho
+# das listas literais; a mesma semente sempre produz o mesmo programa.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m benchmarks.program_generator --comandos 1000 > programa.py
+
+import argparse
+import random
+
+INDENTACAO = "    "
+
+class GeradorDeProgramas:
+    """
+    Variáveis novas só são criadas no nível de cima do programa, então toda leitura
+    acontece depois de uma atribuição que sempre executa; dentro de ifs e fors os
+    comandos apenas reatribuem variáveis existentes (e o iterador do laço). As
+    divisões usam sempre um literal diferente de zero como divisor.
+    """
+    def __init__(self, comandos=1000, tamanho_expressao=8, profundidade=2, tamanho_lista=8, semente=0):
+        self.comandos = comandos
+        self.tamanho_expressao = max(1, tamanho_expressao)
+        self.profundidade = profundidade
+        self.tamanho_lista = max(1, tamanho_lista)
+        self.semente = semente
+
+    def gerar(self):
+        self._aleatorio = random.Random(self.semente)
+        self._linhas = []
+        self._variaveis = []
+        self._listas = 0
+        self._restantes = self.comandos
+        self._atribuir(0, visiveis=[], nova=True)
+        while self._restantes > 0:
+            self._comando(0, [])
+        return "\n".join(self._linhas) + "\n"
+
+    def _emitir(self, nivel, texto):
+        self._linhas.append(INDENTACAO * nivel + texto)
+
+    def _literal(self):
+        if self._aleatorio.random() < 0.5:
+            return str(self._aleatorio.randint(1, 99))
+        return f"{self._aleatorio.uniform(0.5, 99.5):.2f}"
+
+    def _operando(self, visiveis):
+        candidatas = self._variaveis + visiveis
+        if candidatas and self._aleatorio.random() < 0.7:
+            return self._aleatorio.choice(candidatas)
+        return self._literal()
+
+    def _expressao(self, visiveis):
+        partes = [self._operando(visiveis)]
+        aberto = False
+        for _ in range(self.tamanho_expressao - 1):
+            operador = self._aleatorio.choice(('+', '-', '*', '/'))
+            if operador == '/':
+                partes.append(f"/ {self._aleatorio.randint(1, 9)}")
+                continue
+            operando = self._operando(visiveis)
+            if not aberto and self._aleatorio.random() < 0.1:
+                operando = "(" + operando
+                aberto = True
+            elif aberto and self._aleatorio.random() < 0.3:
+                operando += ")"
+                aberto = False
+            partes.append(f"{operador} {operando}")
+        if aberto:
+            partes.append("+ 0)")
+        return " ".join(partes)
+
+    def _comando(self, nivel, visiveis):
+        sorteio = self._aleatorio.random()
+        pode_aninhar = nivel < self.profundidade
+        if pode_aninhar and sorteio < 0.15:
+            self._if(nivel, visiveis)
+        elif pode_aninhar and sorteio < 0.3:
+            self._for(nivel, visiveis)
+        elif sorteio < 0.45 and (self._variaveis or visiveis):
+            self._print(nivel, visiveis)
+        else:
+            self._atribuir(nivel, visiveis, nova=nivel == 0 and sorteio < 0.8)
+
+    def _atribuir(self, nivel, visiveis, nova):
+        self._restantes -= 1
+        expressao = self._expressao(visiveis)
+        if nova or not self._variaveis:
+            nome = f"v{len(self._variaveis)}"
+            self._emitir(nivel, f"{nome} = {expressao}")
+            self._variaveis.append(nome)
+        else:
+            self._emitir(nivel, f"{self._aleatorio.choice(self._variaveis)} = {expressao}")
+
+    def _print(self, nivel, visiveis):
+        self._restantes -= 1
+        argumentos = [f'"linha {len(self._linhas)}:"']
+        argumentos += [self._operando(visiveis) for _ in range(self._aleatorio.randint(1, 3))]
+        self._emitir(nivel, f"print({', '.join(argumentos)})")
+
+    def _bloco(self, nivel, visiveis):
+        for _ in range(self._aleatorio.randint(1, 3)):
+            self._comando(nivel, visiveis)
+
+    def _if(self, nivel, visiveis):
+        self._restantes -= 1
+        comparador = self._aleatorio.choice(('<', '>', '<=', '>=', '==', '!='))
+        self._emitir(nivel, f"if {self._operando(visiveis)} {comparador} {self._expressao(visiveis)}:")
+        self._bloco(nivel + 1, visiveis)
+        if self._aleatorio.random() < 0.5:
+            self._emitir(nivel, "else:")
+            self._bloco(nivel + 1, visiveis)
+
+    def _for(self, nivel, visiveis):
+        self._restantes -= 1
+        lista = f"lista{self._listas}"
+        iterador = f"item{self._listas}"
+        self._listas += 1
+        elementos = ", ".join(self._literal() for _ in range(self.tamanho_lista))
+        self._emitir(nivel, f"{lista} = [{elementos}]")
+        self._emitir(nivel, f"for {iterador} in {lista}:")
+        self._bloco(nivel + 1, visiveis + [iterador])
+
+def gerar_programa(comandos=1000, tamanho_expressao=8, profundidade=2, tamanho_lista=8, semente=0):
+    return GeradorDeProgramas(comandos, tamanho_expressao, profundidade, tamanho_lista, semente).gerar()
+
+def main():
+    argparser = argparse.ArgumentParser(description="Gera um programa Python sintético no subconjunto aceito.")
+    argparser.add_argument('--comandos', type=int, default=1000)
+    argparser.add_argument('--tamanho-expressao', type=int, default=8)
+    argparser.add_argument('--profundidade', type=int, default=2)
+    argparser.add_argument('--tamanho-lista', type=int, default=8)
+    argparser.add_argument('--semente', type=int, default=0)
+    args = argparser.parse_args()
+    print(gerar_programa(args.comandos, args.tamanho_expressao, args.profundidade,
+                         args.tamanho_lista, args.semente), end="")
+
+if __name__ == "__main__":
+    main()
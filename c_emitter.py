@@ -0,0 +1,95 @@
+# c_emitter.py
+
+INDENTACAO = "    "
+
+class PrologueSlot:
+    """
+    Espaço reservado no meio da saída (ex.: declarações) que pode ser preenchido
+    depois que o código seguinte já foi emitido.
+    """
+    def __init__(self, emissor, nivel):
+        self._emissor = emissor
+        self._linhas = []
+        self.nivel = nivel
+        self.fechado = False
+
+    def linha(self, texto=""):
+        if self.fechado:
+            raise RuntimeError("Slot de prólogo já foi fechado")
+        self._linhas.append(INDENTACAO * self.nivel + texto if texto else "")
+
+    def fechar(self):
+        """Marca o slot como completo, permitindo que o emissor descarregue o que vem depois dele."""
+        self.fechado = True
+        self._emissor._descarregar()
+
+class CEmitter:
+    """
+    Emissor de código C linha a linha. Todas as linhas vão para um único buffer
+    (ou direto para um arquivo, se `destino` for informado), então o custo total
+    é linear no tamanho da saída, sem concatenações repetidas de blocos aninhados.
+    Linhas emitidas depois de um slot de prólogo ainda aberto ficam retidas até
+    o slot ser fechado.
+    """
+    def __init__(self, destino=None, nivel=0):
+        self.destino = destino
+        self.nivel = nivel
+        self._partes = []  # strings (linhas) e PrologueSlots, na ordem de saída
+
+    def linha(self, texto=""):
+        texto = INDENTACAO * self.nivel + texto if texto else ""
+        if self.destino is not None and not self._partes:
+            self.destino.write(texto + "\n")
+        else:
+            self._partes.append(texto)
+
+    def texto_pronto(self, texto):
+        """Acrescenta linhas já indentadas e terminadas em quebra de linha, sem alterá-las."""
+        if not texto:
+            return
+        if self.destino is not None and not self._partes:
+            self.destino.write(texto)
+        else:
+            self._partes.append(texto[:-1])  # a quebra final volta ao juntar as partes
+
+    def reservar_prologo(self):
+        slot = PrologueSlot(self, self.nivel)
+        self._partes.append(slot)
+        return slot
+
+    def _descarregar(self):
+        """Escreve no destino todas as partes prontas, parando no primeiro slot aberto."""
+        if self.destino is None:
+            return
+        escrever = self.destino.write
+        prontas = 0
+        for parte in self._partes:
+            if isinstance(parte, PrologueSlot):
+                if not parte.fechado:
+                    break
+                for linha in parte._linhas:
+                    escrever(linha)
+                    escrever("\n")
+            else:
+                escrever(parte)
+                escrever("\n")
+            prontas += 1
+        del self._partes[:prontas]
+
+    def _linhas(self):
+        for parte in self._partes:
+            if isinstance(parte, PrologueSlot):
+                yield from parte._linhas
+            else:
+                yield parte
+
+    def finalizar(self):
+        """Fecha os slots pendentes e descarrega o restante no destino."""
+        for parte in self._partes:
+            if isinstance(parte, PrologueSlot):
+                parte.fechado = True
+        self._descarregar()
+
+    def getvalue(self):
+        """Código acumulado no buffer (quando não há destino)."""
+        return "".join(linha + "\n" for linha in self._linhas())
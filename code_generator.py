@@ -1,111 +1,809 @@
 # code_generator.py
 
+import ast
 from ast_nodes import *
-from semantic_analyzer import AnalisadorSemantico, TIPO_NUMERO, TIPO_STRING, TIPO_ARRAY_NUMERO, TIPO_BOOL, ProgramNode
+from ast_visitor import NodeVisitor, percorrer
+from c_emitter import CEmitter
+from loop_parallelism import analisar_laco
+from semantic_analyzer import (
+    TIPO_INTEIRO, TIPO_NUMERO, TIPO_STRING, TIPO_ARRAY_INTEIRO, TIPO_ARRAY_NUMERO, TIPO_BOOL,
+    TIPOS_ARRAY, tipo_do_elemento, inteiro_literal, sempre_retorna,
+)
 
-class CodeGenerator:
-    def __init__(self, tabela_de_simbolos):
-        self._indentation_level = 0
+# Funções auxiliares emitidas antes do main quando o programa as usa: nome -> (includes, linhas)
+ROTINAS_DE_SUPORTE = {
+    # '%' do Python: o resto tem o sinal do divisor, mesmo quando é um zero real (o '%'
+    # do C trunca em direção ao zero)
+    'py_mod_i': ((), (
+        "static long py_mod_i(long a, long b) {",
+        "    long r = a % b;",
+        "    return (r != 0 && (r < 0) != (b < 0)) ? r + b : r;",
+        "}",
+    )),
+    'py_mod_f': (("math.h",), (
+        "static double py_mod_f(double a, double b) {",
+        "    double r = fmod(a, b);",
+        "    if (r == 0) return copysign(0.0, b);",
+        "    return ((r < 0) != (b < 0)) ? r + b : r;",
+        "}",
+    )),
+    # '//' do Python arredonda para baixo (o '/' do C trunca em direção ao zero)
+    'py_div_i': ((), (
+        "static long py_div_i(long a, long b) {",
+        "    long q = a / b;",
+        "    return (a % b != 0 && (a < 0) != (b < 0)) ? q - 1 : q;",
+        "}",
+    )),
+    # Mesmo cálculo do float.__floordiv__ do CPython: floor(a / b) erraria quando a
+    # divisão arredonda para cima de um inteiro (ex.: 1 // 0.1 é 9.0, não 10.0)
+    'py_div_f': (("math.h",), (
+        "static double py_div_f(double a, double b) {",
+        "    double resto = fmod(a, b);",
+        "    double q = (a - resto) / b;",
+        "    if (resto != 0 && (resto < 0) != (b < 0)) q -= 1.0;",
+        "    if (q == 0) return copysign(0.0, a / b);",
+        "    double piso = floor(q);",
+        "    return q - piso > 0.5 ? piso + 1.0 : piso;",
+        "}",
+    )),
+    # '**' entre inteiros por quadrados sucessivos, em aritmética sem sinal (o estouro
+    # dá a volta em vez de ser comportamento indefinido)
+    'py_pot_i': (("stdlib.h",), (
+        "static long py_pot_i(long base, long expoente) {",
+        "    unsigned long resultado = 1, fator = (unsigned long)base;",
+        "    if (expoente < 0) {",
+        '        fputs("ValueError: negative exponent in an integer power is not supported\\n", stderr);',
+        "        exit(1);",
+        "    }",
+        "    while (expoente) {",
+        "        if (expoente & 1) resultado *= fator;",
+        "        expoente >>= 1;",
+        "        fator *= fator;",
+        "    }",
+        "    return (long)resultado;",
+        "}",
+    )),
+    'py_pot_f': (("math.h", "stdlib.h"), (
+        "static double py_pot_f(double base, double expoente) {",
+        "    if (base == 0 && expoente < 0) {",
+        '        fputs("ZeroDivisionError: 0.0 cannot be raised to a negative power\\n", stderr);',
+        "        exit(1);",
+        "    }",
+        "    return pow(base, expoente);",
+        "}",
+    )),
+    # Escrita de inteiros sem passar pela interpretação do formato do printf
+    'py_escrever_long': ((), (
+        "static void py_escrever_long(long v) {",
+        "    char buffer[24];",
+        "    char *p = buffer + sizeof buffer;",
+        "    unsigned long u = v < 0 ? 0UL - (unsigned long)v : (unsigned long)v;",
+        "    do { *--p = (char)('0' + u % 10); u /= 10; } while (u);",
+        "    if (v < 0) *--p = '-';",
+        "    fwrite(p, 1, (size_t)(buffer + sizeof buffer - p), stdout);",
+        "}",
+    )),
+    # Erros do Python que terminam o programa, com a mensagem em stderr
+    'py_sem_memoria': (("stdlib.h",), (
+        "static void py_sem_memoria(void) {",
+        '    fputs("MemoryError\\n", stderr);',
+        "    exit(1);",
+        "}",
+    )),
+    'py_indice_invalido': (("stdlib.h",), (
+        "static void py_indice_invalido(void) {",
+        '    fputs("IndexError: list index out of range\\n", stderr);',
+        "    exit(1);",
+        "}",
+    )),
+}
+
+# Operadores do Python sem equivalente no C -> rotina usada para cada tipo do resultado.
+# Com booleanos (só 0 e 1) o '%' e o '//' do C já dão o resultado do Python.
+ROTINAS_DOS_OPERADORES = {
+    '%': {TIPO_INTEIRO: 'py_mod_i', TIPO_NUMERO: 'py_mod_f'},
+    '//': {TIPO_INTEIRO: 'py_div_i', TIPO_NUMERO: 'py_div_f'},
+    '**': {TIPO_INTEIRO: 'py_pot_i', TIPO_NUMERO: 'py_pot_f'},
+}
+
+# Listas do Python viram vetores dinâmicos no heap, manipulados por ponteiro (como
+# no Python, `b = a` faz as duas variáveis verem a mesma lista). O sufixo das
+# rotinas indica o tipo dos elementos, como em py_mod_i/py_mod_f.
+SUFIXOS_DE_VETOR = {TIPO_ARRAY_INTEIRO: 'i', TIPO_ARRAY_NUMERO: 'f'}
+
+# Capacidade inicial de um vetor; cada append em um vetor cheio dobra a capacidade
+CAPACIDADE_MINIMA_DO_VETOR = 8
+
+# Vetores criados dentro de uma função entram na lista `py_vetores` da chamada e são
+# liberados no return: nenhuma lista sai da função (parâmetros e retornos são números).
+# Os do main entram na lista do main, liberada no fim do programa.
+LISTA_DE_VETORES = 'py_vetores'
+
+# `referencias` conta as variáveis que apontam para o vetor: uma lista literal
+# atribuída a uma variável que é a única a ver o vetor antigo reaproveita esse vetor
+# (ex.: `L = [i, 1, 2]` dentro de um laço não cria um vetor por iteração)
+ROTINAS_DE_SUPORTE['py_vetor'] = ((), (
+    "typedef struct py_vetor {",
+    "    union { long *i; double *f; } dados;",
+    "    long tamanho, capacidade, referencias;",
+    "    struct py_vetor *proximo;",
+    "} py_vetor;",
+))
+# `b = a` entre listas: as duas variáveis passam a ver o mesmo vetor
+ROTINAS_DE_SUPORTE['py_vetor_compartilhar'] = ((), (
+    "static py_vetor *py_vetor_compartilhar(py_vetor *antigo, py_vetor *novo) {",
+    "    if (novo != NULL) novo->referencias++;",
+    "    if (antigo != NULL) antigo->referencias--;",
+    "    return novo;",
+    "}",
+))
+ROTINAS_DE_SUPORTE['py_vetor_liberar'] = (("stdlib.h",), (
+    "static void py_vetor_liberar(py_vetor *v) {",
+    "    while (v != NULL) {",
+    "        py_vetor *proximo = v->proximo;",
+    "        free(v->dados.i);",
+    "        free(v);",
+    "        v = proximo;",
+    "    }",
+    "}",
+))
+
+def rotinas_de_vetor(sufixo, tipo_c):
+    """Rotinas de suporte dos vetores com elementos `tipo_c`: criação, append e leitura de um elemento."""
+    return {
+        f'py_vetor_novo_{sufixo}': (("stdlib.h", "string.h"), (
+            f"static py_vetor *py_vetor_novo_{sufixo}(py_vetor **dono, const {tipo_c} *dados, long tamanho) {{",
+            "    py_vetor *v = malloc(sizeof *v);",
+            f"    long capacidade = tamanho > {CAPACIDADE_MINIMA_DO_VETOR} ? tamanho : {CAPACIDADE_MINIMA_DO_VETOR};",
+            f"    if (v == NULL || (v->dados.{sufixo} = malloc((size_t)capacidade * sizeof *v->dados.{sufixo})) == NULL) py_sem_memoria();",
+            f"    if (tamanho > 0) memcpy(v->dados.{sufixo}, dados, (size_t)tamanho * sizeof *v->dados.{sufixo});",
+            "    v->tamanho = tamanho;",
+            "    v->capacidade = capacidade;",
+            "    v->referencias = 1;",
+            "    v->proximo = dono != NULL ? *dono : NULL;",
+            "    if (dono != NULL) *dono = v;",
+            "    return v;",
+            "}",
+        )),
+        # Atribuição de uma lista literal à variável que aponta para `v`
+        f'py_vetor_refazer_{sufixo}': (("stdlib.h", "string.h"), (
+            f"static py_vetor *py_vetor_refazer_{sufixo}(py_vetor *v, py_vetor **dono, const {tipo_c} *dados, long tamanho) {{",
+            "    if (v == NULL || v->referencias > 1) {",
+            "        if (v != NULL) v->referencias--;",
+            f"        return py_vetor_novo_{sufixo}(dono, dados, tamanho);",
+            "    }",
+            "    if (tamanho > v->capacidade) {",
+            f"        {tipo_c} *novos = realloc(v->dados.{sufixo}, (size_t)tamanho * sizeof *novos);",
+            "        if (novos == NULL) py_sem_memoria();",
+            f"        v->dados.{sufixo} = novos;",
+            "        v->capacidade = tamanho;",
+            "    }",
+            f"    if (tamanho > 0) memcpy(v->dados.{sufixo}, dados, (size_t)tamanho * sizeof *v->dados.{sufixo});",
+            "    v->tamanho = tamanho;",
+            "    return v;",
+            "}",
+        )),
+        f'py_vetor_append_{sufixo}': (("stdlib.h",), (
+            f"static void py_vetor_append_{sufixo}(py_vetor *v, {tipo_c} valor) {{",
+            "    if (v->tamanho == v->capacidade) {",
+            "        long capacidade = v->capacidade * 2;",
+            f"        {tipo_c} *dados = realloc(v->dados.{sufixo}, (size_t)capacidade * sizeof *dados);",
+            "        if (dados == NULL) py_sem_memoria();",
+            f"        v->dados.{sufixo} = dados;",
+            "        v->capacidade = capacidade;",
+            "    }",
+            f"    v->dados.{sufixo}[v->tamanho++] = valor;",
+            "}",
+        )),
+        # Índices negativos contam do fim, como no Python
+        f'py_vetor_ler_{sufixo}': ((), (
+            f"static {tipo_c} py_vetor_ler_{sufixo}(const py_vetor *v, long i) {{",
+            "    if (i < 0) i += v->tamanho;",
+            "    if (i < 0 || i >= v->tamanho) py_indice_invalido();",
+            f"    return v->dados.{sufixo}[i];",
+            "}",
+        )),
+    }
+
+ROTINAS_DE_SUPORTE.update(rotinas_de_vetor('i', 'long'))
+ROTINAS_DE_SUPORTE.update(rotinas_de_vetor('f', 'double'))
+
+# Rotinas que precisam ser emitidas antes de outras: nome -> rotinas usadas por ela
+DEPENDENCIAS_DAS_ROTINAS = {'py_vetor_liberar': ('py_vetor',), 'py_vetor_compartilhar': ('py_vetor',)}
+for _sufixo in SUFIXOS_DE_VETOR.values():
+    DEPENDENCIAS_DAS_ROTINAS[f'py_vetor_novo_{_sufixo}'] = ('py_vetor', 'py_sem_memoria')
+    DEPENDENCIAS_DAS_ROTINAS[f'py_vetor_refazer_{_sufixo}'] = (f'py_vetor_novo_{_sufixo}',)
+    DEPENDENCIAS_DAS_ROTINAS[f'py_vetor_append_{_sufixo}'] = ('py_vetor', 'py_sem_memoria')
+    DEPENDENCIAS_DAS_ROTINAS[f'py_vetor_ler_{_sufixo}'] = ('py_vetor', 'py_indice_invalido')
+
+def ordenar_rotinas(nomes):
+    """`nomes` e as rotinas de que eles dependem, cada rotina depois das suas dependências."""
+    ordem = []
+    pendentes = [(nome, False) for nome in sorted(nomes, reverse=True)]
+    while pendentes:
+        nome, dependencias_prontas = pendentes.pop()
+        if nome in ordem:
+            continue
+        if dependencias_prontas:
+            ordem.append(nome)
+            continue
+        pendentes.append((nome, True))
+        pendentes.extend((dependencia, False) for dependencia in reversed(DEPENDENCIAS_DAS_ROTINAS.get(nome, ())))
+    return ordem
+
+# Listas literais a partir deste tamanho, só com constantes, ficam em um array
+# static const (dados prontos no executável) em vez de um literal montado na pilha
+MINIMO_DE_ELEMENTOS_ESTATICOS = 16
+ELEMENTOS_POR_LINHA = 16
+
+def elemento_constante(node):
+    while isinstance(node, UnaryOpNode):
+        node = node.operand
+    return isinstance(node, NumberNode)
+
+def literal_long(texto):
+    """
+    Literal inteiro como long do C. O -2**63 dobrado já vem como uma expressão long
+    entre parênteses (ver constant_folding.literal_c): só os outros recebem o sufixo L.
+    """
+    return texto if texto.startswith('(') else texto + "L"
+
+# Nomes que uma função do programa não pode ter no C: palavras reservadas, o main e
+# as funções da biblioteca usadas pelo código gerado
+NOMES_RESERVADOS_C = frozenset({
+    'auto', 'bool', 'break', 'case', 'char', 'const', 'continue', 'default', 'do', 'double',
+    'else', 'enum', 'extern', 'false', 'float', 'for', 'goto', 'if', 'inline', 'int', 'long',
+    'register', 'restrict', 'return', 'short', 'signed', 'sizeof', 'static', 'struct',
+    'switch', 'true', 'typedef', 'union', 'unsigned', 'void', 'volatile', 'while',
+    'main', 'printf', 'puts', 'fputs', 'putchar', 'fwrite', 'setvbuf', 'stdout', 'fmod',
+})
+
+def nome_c_da_funcao(nome):
+    """Nome C de uma função do programa; os que colidiriam (e os py_*, das rotinas de suporte) ganham o prefixo py_fn_."""
+    if nome in NOMES_RESERVADOS_C or nome.startswith('py_'):
+        return 'py_fn_' + nome
+    return nome
+
+# Tamanho do buffer de stdout instalado com a opção buffer_saida
+TAMANHO_BUFFER_SAIDA = 1 << 16
+
+# Com a opção paralelo, laços com menos iterações que isto rodam em uma thread só
+# (ainda vetorizados): abaixo disso, criar as threads custa mais que o laço
+MINIMO_DE_ITERACOES_PARALELAS = 10000
+
+ESCAPES_C = {'\\': '\\\\', '"': '\\"', '\n': '\\n', '\t': '\\t', '\r': '\\r'}
+
+def texto_do_literal(valor):
+    """Conteúdo de um literal de string do Python, ou None se não for um literal simples (ex.: f-string)."""
+    try:
+        texto = ast.literal_eval(valor)
+    except (ValueError, SyntaxError):
+        return None
+    return texto if isinstance(texto, str) else None
+
+def escapar_c(texto, formato=False):
+    """Texto pronto para ir entre aspas em C; com `formato`, '%' vira '%%' (string de formato do printf)."""
+    partes = []
+    anterior = ''
+    for ch in texto:
+        if ch in ESCAPES_C:
+            partes.append(ESCAPES_C[ch])
+        elif ch == '%' and formato:
+            partes.append('%%')
+        elif ch == '?' and anterior == '?':
+            partes.append('\\?')  # evita trígrafos (ex.: '??(') no modo C99
+        elif ord(ch) < 32 or ord(ch) == 127:
+            partes.append(f'\\{ord(ch):03o}')
+        else:
+            partes.append(ch)
+        anterior = ch
+    return ''.join(partes)
+
+class CodeGenerator(NodeVisitor):
+    """
+    Gera o programa C. Opções reconhecidas (as mesmas que entram na chave do cache):
+    `buffer_saida` instala um buffer grande em stdout no início do main, e
+    `impressao_rapida` troca o printf de prints só com textos e inteiros por escritas
+    diretas com py_escrever_long, e `paralelo` marca os for de iterações independentes
+    (ver loop_parallelism) com `#pragma omp parallel for simd`.
+    """
+    def __init__(self, tabela_de_simbolos, opcoes=None):
         self.tabela_de_simbolos = tabela_de_simbolos
+        self.opcoes = opcoes or {}
+        self.emissor = None
+        self._partes = None  # fragmentos da expressão sendo gerada
+        self._globais = frozenset()  # variáveis lidas por funções: declaradas fora do main
+        self._profundidade = 0  # laços abertos em volta do comando sendo gerado
+        self._dono_dos_vetores = "NULL"  # lista onde os vetores criados são registrados
 
     def _map_type_to_c(self, tipo):
+        if tipo == TIPO_INTEIRO: return "long"
         if tipo == TIPO_NUMERO: return "double"
         if tipo == TIPO_BOOL: return "bool"
         return "void"
 
-    def _indent(self):
-        return "    " * self._indentation_level
-
     def generate(self, ast_root):
-        self._indentation_level = 1
-        body_code_string = self.visit(ast_root)
-        
-        headers = ["#include <stdio.h>", "#include <stdbool.h>\n", "int main() {"]
-        final_code = list(headers)
-        
-        declarations = []
-        for nome, info in sorted(self.tabela_de_simbolos.simbolos.items()):
-            if info['tipo'] == TIPO_ARRAY_NUMERO: continue
-            tipo_c = self._map_type_to_c(info['tipo'])
-            declarations.append(f"    {tipo_c} {nome};")
-
-        if declarations:
-            final_code.extend(declarations)
-            final_code.append("")
-        
-        final_code.append(body_code_string)
-        
-        final_code.append(f"\n    return 0;")
-        final_code.append("}")
-        return "\n".join(final_code)
-
-    def visit(self, node):
-        method_name = f'visit_{type(node).__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+        """Gera o programa C completo e o devolve como string."""
+        self.emissor = CEmitter()
+        self._emitir_programa(ast_root)
+        return self.emissor.getvalue()
+
+    def generate_to(self, ast_root, arquivo):
+        """Gera o programa C escrevendo as linhas diretamente em `arquivo`, à medida que são produzidas."""
+        self.emissor = CEmitter(destino=arquivo)
+        self._emitir_programa(ast_root)
+
+    def _emitir_programa(self, ast_root):
+        funcoes = self._funcoes_usadas(ast_root)
+        comandos = ProgramNode([s for s in ast_root.statements if not isinstance(s, FunctionDefNode)])
+        self._emitir_inicio(self._rotinas_usadas(comandos, *(f.body for f in funcoes)), funcoes)
+        self.visit(ast_root)
+        self._emitir_fim()
+
+    def _emitir_inicio(self, rotinas, funcoes=()):
+        """Includes, rotinas de suporte, funções do programa, abertura do main e declarações das variáveis."""
+        emissor = self.emissor
+        rotinas = ordenar_rotinas(set(rotinas) | self._rotinas_de_vetores(funcoes))
+        includes = ["stdio.h", "stdbool.h"]
+        for nome in rotinas:
+            includes.extend(i for i in ROTINAS_DE_SUPORTE[nome][0] if i not in includes)
+        for include in includes:
+            emissor.linha(f"#include <{include}>")
+        emissor.linha()
+        for nome in rotinas:
+            for linha in ROTINAS_DE_SUPORTE[nome][1]:
+                emissor.linha(linha)
+            emissor.linha()
+        buffer_saida = self.opcoes.get('buffer_saida')
+        if buffer_saida:
+            emissor.linha(f"static char py_buffer_saida[{TAMANHO_BUFFER_SAIDA}];")
+            emissor.linha()
+        self._globais = frozenset()
+        if funcoes:
+            self._emitir_funcoes(funcoes)
+        emissor.linha("int main() {")
+        emissor.nivel += 1
+        if buffer_saida:
+            # Precisa vir antes de qualquer escrita em stdout
+            emissor.linha("setvbuf(stdout, py_buffer_saida, _IOFBF, sizeof py_buffer_saida);")
+        declaracoes = emissor.reservar_prologo()
+        self._emitir_declaracoes(declaracoes)
+        self._dono_dos_vetores = self._dono_no_main()
+
+    def _emitir_fim(self):
+        emissor = self.emissor
+        emissor.linha()
+        if self._vetores_no_main():
+            emissor.linha(f"py_vetor_liberar({LISTA_DE_VETORES});")
+        emissor.linha("return 0;")
+        emissor.nivel -= 1
+        emissor.linha("}")
+        emissor.finalizar()
+
+    def gerar_trecho(self, statements):
+        """
+        Gera só os comandos `statements`, como ficariam dentro do main; devolve
+        (código C, rotinas de suporte usadas). Usado pela compilação incremental.
+        """
+        trecho = ProgramNode(statements)
+        self.emissor = CEmitter(nivel=1)
+        self._dono_dos_vetores = self._dono_no_main()
+        self.visit(trecho)
+        return self.emissor.getvalue(), self._rotinas_usadas(trecho)
+
+    def montar(self, trechos, rotinas):
+        """Programa completo a partir do código já gerado de cada trecho (ver gerar_trecho)."""
+        self.emissor = CEmitter()
+        self._emitir_inicio(sorted(rotinas))
+        for codigo in trechos:
+            self.emissor.texto_pronto(codigo)
+        self._emitir_fim()
+        return self.emissor.getvalue()
+
+    def _rotinas_usadas(self, *raizes):
+        """Rotinas de suporte necessárias, descobertas antes da emissão para não reter a saída."""
+        usadas = set()
+        for raiz in raizes:
+            for node in percorrer(raiz):
+                if isinstance(node, BinOpNode) and node.op in ROTINAS_DOS_OPERADORES:
+                    rotina = ROTINAS_DOS_OPERADORES[node.op].get(node.tipo)
+                    if rotina:
+                        usadas.add(rotina)
+                elif isinstance(node, PrintNode) and self._usa_impressao_rapida(node):
+                    usadas.add('py_escrever_long')
+                elif isinstance(node, AssignmentNode) and isinstance(node.expression, ListNode):
+                    usadas.add('py_vetor_refazer_' + SUFIXOS_DE_VETOR[node.variable.tipo])
+                elif isinstance(node, AssignmentNode) and node.variable.tipo in TIPOS_ARRAY:
+                    usadas.add('py_vetor_compartilhar')
+                elif isinstance(node, AppendNode):
+                    usadas.add('py_vetor_append_' + SUFIXOS_DE_VETOR[node.list_var.tipo])
+                elif isinstance(node, IndexNode):
+                    usadas.add('py_vetor_ler_' + SUFIXOS_DE_VETOR[node.list_var.tipo])
+        return sorted(usadas)
+
+    def _rotinas_de_vetores(self, funcoes=()):
+        """O tipo py_vetor e a liberação, se o main ou alguma função cria listas."""
+        tabela = self.tabela_de_simbolos
+        rotinas = set()
+        if self._vetores_no_main():
+            rotinas.update(('py_vetor', 'py_vetor_liberar'))
+        if any(self._cria_vetores(tabela.funcoes[node.name]) for node in funcoes):
+            rotinas.add('py_vetor_liberar')
+        return rotinas
+
+    def _vetores_no_main(self):
+        return any(info['tipo'] in TIPOS_ARRAY for info in self.tabela_de_simbolos.simbolos.values())
+
+    def _dono_no_main(self):
+        return "&" + LISTA_DE_VETORES if self._vetores_no_main() else "NULL"
+
+    def _cria_vetores(self, funcao):
+        return any(info['tipo'] in TIPOS_ARRAY for info in funcao.locais.values())
+
+    def _funcoes_usadas(self, ast_root):
+        """Definições das funções alcançáveis a partir do main, na ordem do programa."""
+        funcoes = self.tabela_de_simbolos.funcoes
+        alcancadas = set()
+        pendentes = [s for s in ast_root.statements if not isinstance(s, FunctionDefNode)]
+        while pendentes:
+            for node in percorrer(pendentes.pop()):
+                if isinstance(node, CallNode) and node.name not in alcancadas:
+                    alcancadas.add(node.name)
+                    pendentes.append(funcoes[node.name].node.body)
+        return [s for s in ast_root.statements if isinstance(s, FunctionDefNode) and s.name in alcancadas]
+
+    def _declaracoes(self, simbolos, omitir=()):
+        """Linhas de declaração das variáveis de `simbolos`; as listas são ponteiros para vetores."""
+        return [f"py_vetor *{nome} = NULL;" if info['tipo'] in TIPOS_ARRAY
+                else f"{self._map_type_to_c(info['tipo'])} {nome};"
+                for nome, info in sorted(simbolos.items()) if nome not in omitir]
+
+    def _emitir_declaracoes(self, slot):
+        declaracoes = self._declaracoes(self.tabela_de_simbolos.simbolos, self._globais)
+        if self._vetores_no_main():
+            declaracoes.append(f"py_vetor *{LISTA_DE_VETORES} = NULL;")
+        for declaracao in declaracoes:
+            slot.linha(declaracao)
+        if declaracoes:
+            slot.linha()
+        slot.fechar()
+
+    def _assinatura(self, funcao):
+        retorno = self._map_type_to_c(funcao.retorno)
+        parametros = ", ".join(f"{self._map_type_to_c(funcao.locais[nome]['tipo'])} {nome}"
+                               for nome in funcao.parametros)
+        return f"static {retorno} {nome_c_da_funcao(funcao.nome)}({parametros or 'void'})"
+
+    def _emitir_funcoes(self, definicoes):
+        """
+        Variáveis globais lidas pelas funções, protótipos e uma função C static para
+        cada função do programa. As variáveis locais são declaradas no início de cada uma.
+        """
+        emissor = self.emissor
+        tabela = self.tabela_de_simbolos
+        funcoes = [tabela.funcoes[node.name] for node in definicoes]
+
+        globais = set()
+        for funcao in funcoes:
+            globais.update(node.name for node in percorrer(funcao.node.body)
+                           if isinstance(node, VariableNode) and node.name not in funcao.nomes_locais)
+        self._globais = frozenset(globais)
+        for declaracao in self._declaracoes({nome: tabela.simbolos[nome] for nome in globais}):
+            emissor.linha("static " + declaracao)
+        if globais:
+            emissor.linha()
+
+        assinaturas = [self._assinatura(funcao) for funcao in funcoes]
+        for assinatura in assinaturas:
+            emissor.linha(assinatura + ";")
+        emissor.linha()
+
+        for funcao, assinatura in zip(funcoes, assinaturas):
+            emissor.linha(assinatura + " {")
+            emissor.nivel += 1
+            locais = {nome: info for nome, info in funcao.locais.items() if nome not in funcao.parametros}
+            declaracoes = self._declaracoes(locais)
+            self._dono_dos_vetores = "NULL"
+            if self._cria_vetores(funcao):
+                declaracoes.append(f"py_vetor *{LISTA_DE_VETORES} = NULL;")
+                if funcao.retorna_valor:
+                    declaracoes.append(f"{self._map_type_to_c(funcao.retorno)} py_retorno;")
+                self._dono_dos_vetores = "&" + LISTA_DE_VETORES
+            for declaracao in declaracoes:
+                emissor.linha(declaracao)
+            if declaracoes:
+                emissor.linha()
+            with tabela.escopo(funcao):
+                self.visit(funcao.node.body)
+            if self._dono_dos_vetores != "NULL" and not sempre_retorna(funcao.node.body):
+                emissor.linha(f"py_vetor_liberar({LISTA_DE_VETORES});")
+            self._dono_dos_vetores = "NULL"
+            emissor.nivel -= 1
+            emissor.linha("}")
+            emissor.linha()
 
     def generic_visit(self, node):
         raise Exception(f'Nenhum método visit_{type(node).__name__} encontrado')
 
+    def _expr(self, node):
+        """
+        Gera o código de uma expressão. Os visitantes de expressão acrescentam
+        fragmentos em `self._partes`, que são unidos uma única vez no final: o custo
+        é linear no tamanho da expressão, mesmo em cadeias muito longas.
+        """
+        partes_externas = self._partes
+        self._partes = partes = []
+        try:
+            self.visit(node)
+        finally:
+            self._partes = partes_externas
+        return "".join(partes)
+
+    # --- Comandos: emitem linhas no emissor ---
+
     def visit_ProgramNode(self, node):
-        lines = []
         for statement in node.statements:
-            result = self.visit(statement)
-            if result:
-                lines.append(result)
-        return "\n".join(lines)
+            yield statement
 
     def visit_AssignmentNode(self, node):
         var_name = node.variable.name
         info_var = self.tabela_de_simbolos.consultar(var_name)
-        if info_var['tipo'] == TIPO_ARRAY_NUMERO:
-            elements_code = self.visit(node.expression)
-            tipo_c = self._map_type_to_c(TIPO_NUMERO)
-            return f"{self._indent()}{tipo_c} {var_name}[] = {elements_code};"
-        expr_code = self.visit(node.expression)
-        return f"{self._indent()}{var_name} = {expr_code};"
+        if info_var['tipo'] in TIPOS_ARRAY and isinstance(node.expression, ListNode):
+            self._emitir_lista(var_name, info_var['tipo'], node.expression)
+            return
+        expr_code = self._expr(node.expression)
+        if info_var['tipo'] in TIPOS_ARRAY:
+            expr_code = f"py_vetor_compartilhar({var_name}, {expr_code})"
+        self.emissor.linha(f"{var_name} = {expr_code};")
+
+    def _emitir_lista(self, nome, tipo, lista):
+        """Atribui a `nome` um vetor novo com os elementos da lista literal."""
+        emissor = self.emissor
+        novo = f"py_vetor_refazer_{SUFIXOS_DE_VETOR[tipo]}({nome}, {self._dono_dos_vetores}, "
+        tipo_c = self._map_type_to_c(tipo_do_elemento(tipo))
+        elementos = lista.elements
+        if not elementos:
+            emissor.linha(f"{nome} = {novo}NULL, 0);")
+            return
+        if len(elementos) < MINIMO_DE_ELEMENTOS_ESTATICOS or not all(map(elemento_constante, elementos)):
+            emissor.linha(f"{nome} = {novo}({tipo_c}[]){self._expr(lista)}, {len(elementos)});")
+            return
+        # Um static dentro de um bloco: o nome não colide com os de outras listas
+        dados = "py_dados" if nome != "py_dados" else "py_dados_"
+        valores = [self._expr(elemento) for elemento in elementos]
+        emissor.linha("{")
+        emissor.nivel += 1
+        emissor.linha(f"static const {tipo_c} {dados}[] = {{")
+        emissor.nivel += 1
+        for inicio in range(0, len(valores), ELEMENTOS_POR_LINHA):
+            emissor.linha(", ".join(valores[inicio:inicio + ELEMENTOS_POR_LINHA]) + ",")
+        emissor.nivel -= 1
+        emissor.linha("};")
+        emissor.linha(f"{nome} = {novo}{dados}, {len(valores)});")
+        emissor.nivel -= 1
+        emissor.linha("}")
+
+    def visit_AppendNode(self, node):
+        sufixo = SUFIXOS_DE_VETOR[node.list_var.tipo]
+        self.emissor.linha(f"py_vetor_append_{sufixo}({node.list_var.name}, {self._expr(node.value)});")
+
+    def visit_FunctionDefNode(self, node):
+        return  # emitida antes do main (_emitir_funcoes)
+
+    def visit_ReturnNode(self, node):
+        emissor = self.emissor
+        if self._dono_dos_vetores != "NULL":
+            # O valor pode ler as listas: é calculado antes de liberá-las
+            if node.expression is not None:
+                emissor.linha(f"py_retorno = {self._expr(node.expression)};")
+            emissor.linha(f"py_vetor_liberar({LISTA_DE_VETORES});")
+            emissor.linha("return;" if node.expression is None else "return py_retorno;")
+        elif node.expression is None:
+            emissor.linha("return;")
+        else:
+            emissor.linha(f"return {self._expr(node.expression)};")
+
+    def visit_ExpressionStatementNode(self, node):
+        self.emissor.linha(f"{self._expr(node.expression)};")
 
     def visit_IfNode(self, node):
-        cond_code = self.visit(node.condition)
-        if_code = f"{self._indent()}if ({cond_code}) {{\n"
-        self._indentation_level += 1
-        if_code += self.visit(node.if_block)
-        self._indentation_level -= 1
-        if_code += f"\n{self._indent()}}}"
+        emissor = self.emissor
+        cond_code = self._expr(node.condition)
+        emissor.linha(f"if ({cond_code}) {{")
+        emissor.nivel += 1
+        yield node.if_block
+        emissor.nivel -= 1
         if node.else_block:
-            if_code += " else {\n"
-            self._indentation_level += 1
-            if_code += self.visit(node.else_block)
-            self._indentation_level -= 1
-            if_code += f"\n{self._indent()}}}"
-        return if_code
+            emissor.linha("} else {")
+            emissor.nivel += 1
+            yield node.else_block
+            emissor.nivel -= 1
+        emissor.linha("}")
+
+    def _nomes_do_laco(self, node, *prefixos):
+        """
+        Nomes das variáveis C próprias de um laço (índice, limite), declaradas no
+        próprio for: só precisam ser diferentes dos nomes usados dentro dele. A
+        profundidade no nome separa os laços aninhados; laços em sequência repetem
+        os mesmos nomes, cada um no seu escopo.
+        """
+        usados = set()
+        for filho in percorrer(node):
+            if isinstance(filho, VariableNode):
+                usados.add(filho.name)
+            elif isinstance(filho, CallNode):
+                usados.add(nome_c_da_funcao(filho.name))
+        nomes = []
+        for prefixo in prefixos:
+            nome = f"{prefixo}{self._profundidade}"
+            while nome in usados:
+                nome = "_" + nome
+            nomes.append(nome)
+        return nomes
+
+    def _corpo_do_laco(self, node, primeira_linha=None):
+        emissor = self.emissor
+        emissor.nivel += 1
+        if primeira_linha:
+            emissor.linha(primeira_linha)
+        self._profundidade += 1
+        yield node.body
+        self._profundidade -= 1
+        emissor.nivel -= 1
+        emissor.linha("}")
+
+    def _laco_paralelo(self, node):
+        """Análise do for (LacoParalelo) com a opção paralelo, se as iterações são independentes; senão None."""
+        if not self.opcoes.get('paralelo'):
+            return None
+        return analisar_laco(node, self.tabela_de_simbolos)
+
+    def _abrir_bloco(self, cabecalho):
+        self.emissor.linha(cabecalho)
+        self.emissor.nivel += 1
+
+    def _fechar_blocos(self, quantidade):
+        for _ in range(quantidade):
+            self.emissor.nivel -= 1
+            self.emissor.linha("}")
+
+    def _emitir_pragma_paralelo(self, laco, iteracoes, executa=None):
+        """
+        Pragma do OpenMP antes do for. As variáveis privadas (o iterador, os temporários)
+        voltam com o valor da última iteração (lastprivate), como depois de um for do
+        Python. Sem nenhuma iteração o lastprivate deixaria essas variáveis indefinidas:
+        se `executa` (condição C de haver iterações) é dada, o laço fica dentro de um if.
+        Retorna o número de blocos abertos.
+        """
+        if laco is None:
+            return 0
+        if executa is not None:
+            self._abrir_bloco(f"if ({executa}) {{")
+        clausulas = [f"if(parallel: {iteracoes} >= {MINIMO_DE_ITERACOES_PARALELAS})"]
+        clausulas.extend(f"reduction({operador}:{nome})" for operador, nome in laco.reducoes)
+        clausulas.append(f"lastprivate({', '.join(laco.privadas)})")
+        self.emissor.linha(f"#pragma omp parallel for simd {' '.join(clausulas)}")
+        return 0 if executa is None else 1
 
     def visit_ForNode(self, node):
         iterator = node.iterator_var.name
         iterable = node.iterable_var.name
-        code = f"{self._indent()}int size_{iterable} = sizeof({iterable}) / sizeof({iterable}[0]);\n"
-        code += f"{self._indent()}for (int i = 0; i < size_{iterable}; i++) {{\n"
-        self._indentation_level += 1
-        code += f"{self._indent()}{iterator} = {iterable}[i];\n"
-        code += self.visit(node.body)
-        self._indentation_level -= 1
-        code += f"\n{self._indent()}}}"
-        return code
+        indice, percorrido = self._nomes_do_laco(node, '_i', '_it')
+        # Como no Python, o laço percorre o vetor que a variável via antes dele: uma
+        # referência a mais faz uma nova lista atribuída à variável no corpo ir para um
+        # vetor novo. O tamanho é lido a cada iteração: um append no corpo também é
+        # percorrido (um laço paralelo não tem append no corpo)
+        sufixo = SUFIXOS_DE_VETOR[node.iterable_var.tipo]
+        self._abrir_bloco("{")
+        self.emissor.linha(f"py_vetor *{percorrido} = {iterable};")
+        self.emissor.linha(f"{percorrido}->referencias++;")
+        tamanho = f"{percorrido}->tamanho"
+        blocos = self._emitir_pragma_paralelo(self._laco_paralelo(node), tamanho, f"{tamanho} > 0")
+        self.emissor.linha(f"for (long {indice} = 0; {indice} < {tamanho}; {indice}++) {{")
+        yield from self._corpo_do_laco(node, f"{iterator} = {percorrido}->dados.{sufixo}[{indice}];")
+        self._fechar_blocos(blocos)
+        self.emissor.linha(f"{percorrido}->referencias--;")
+        self._fechar_blocos(1)
+
+    def visit_ForRangeNode(self, node):
+        # O índice é uma variável própria do laço: como no Python, reatribuir o
+        # iterador no corpo não muda as iterações, e o limite é avaliado uma vez só
+        indice, primeiro, limite = self._nomes_do_laco(node, '_i', '_a', '_n')
+        passo = inteiro_literal(node.step)
+        inicio = self._expr(node.start)
+        fim = self._expr(node.stop)
+        emissor = self.emissor
+        laco = self._laco_paralelo(node)
+        # Com início e fim literais (o passo sempre é) já se sabe se há iterações;
+        # um laço que nunca executa fica sem o pragma
+        valores = (inteiro_literal(node.start), inteiro_literal(node.stop))
+        if None not in valores and (valores[0] - valores[1]) * passo >= 0:
+            laco = None
+        blocos = 0
+        if laco is not None and None in valores:
+            # A forma canônica do OpenMP só admite o índice na inicialização do for, e
+            # dentro do pragma as reduções e as lastprivate já são cópias privadas:
+            # início e fim são calculados antes, nessa ordem e uma vez só, como no
+            # Python, em um bloco em volta do for
+            self._abrir_bloco("{")
+            blocos = 1
+            if valores[0] is None:
+                emissor.linha(f"long {primeiro} = {inicio};")
+                inicio = primeiro
+            if valores[1] is None:
+                emissor.linha(f"long {limite} = {fim};")
+                fim = limite
+            declaracao = f"long {indice} = {inicio}"
+            limite = fim
+        elif isinstance(node.stop, NumberNode):
+            declaracao = f"long {indice} = {inicio}"
+            limite = fim
+        else:
+            declaracao = f"long {indice} = {inicio}, {limite} = {fim}"
+        comparacao = "<" if passo > 0 else ">"
+        if passo in (1, -1):
+            incremento = indice + ("++" if passo > 0 else "--")
+        else:
+            incremento = f"{indice} += {passo}"
+        distancia = f"{limite} - {inicio}" if passo > 0 else f"{inicio} - {limite}"
+        executa = f"{inicio} {comparacao} {limite}"
+        if None not in valores:
+            executa = None
+        blocos += self._emitir_pragma_paralelo(
+            laco, distancia if abs(passo) == 1 else f"({distancia}) / {abs(passo)}", executa)
+        emissor.linha(f"for ({declaracao}; {indice} {comparacao} {limite}; {incremento}) {{")
+        yield from self._corpo_do_laco(node, f"{node.iterator_var.name} = {indice};")
+        self._fechar_blocos(blocos)
+
+    def visit_WhileNode(self, node):
+        self.emissor.linha(f"while ({self._expr(node.condition)}) {{")
+        yield from self._corpo_do_laco(node)
+
+    def _texto_fixo(self, arg_node):
+        """Texto de um argumento de print que é um literal de string, ou None."""
+        if isinstance(arg_node, StringNode):
+            return texto_do_literal(arg_node.value)
+        return None
+
+    def _usa_impressao_rapida(self, node):
+        # Só vale a pena quando há inteiros; reais continuam com a formatação do printf
+        if not self.opcoes.get('impressao_rapida'):
+            return False
+        tem_inteiro = False
+        for arg_node in node.args:
+            if self._texto_fixo(arg_node) is not None:
+                continue
+            if arg_node.tipo not in (TIPO_INTEIRO, TIPO_BOOL):
+                return False
+            tem_inteiro = True
+        return tem_inteiro
 
     def visit_PrintNode(self, node):
+        if self._usa_impressao_rapida(node):
+            self._emitir_impressao_rapida(node)
+            return
+
         format_parts = []
         args_parts = []
-        
-        temp_analyzer = AnalisadorSemantico(ProgramNode([]))
-        temp_analyzer.tabela_de_simbolos = self.tabela_de_simbolos
-        
+
         for arg_node in node.args:
-            arg_type = temp_analyzer.visit(arg_node)
-            arg_code = self.visit(arg_node)
+            # Literais de string vão direto na string de formato, sem um %s a interpretar
+            texto = self._texto_fixo(arg_node)
+            if texto is not None:
+                format_parts.append(escapar_c(texto, formato=True))
+                continue
+
+            # Tipo anotado pelo AnalisadorSemantico: nada é reanalisado aqui
+            arg_type = arg_node.tipo
+            arg_code = self._expr(arg_node)
 
             if arg_type == TIPO_STRING:
                 format_parts.append("%s")
                 args_parts.append(arg_code)
+            elif arg_type == TIPO_INTEIRO:
+                format_parts.append("%ld")
+                # Um literal sozinho seria um int do C, não um long
+                args_parts.append(literal_long(arg_code) if isinstance(arg_node, NumberNode) else arg_code)
             elif arg_type == TIPO_NUMERO:
                 format_parts.append("%f")
                 args_parts.append(arg_code)
@@ -113,19 +811,112 @@ class CodeGenerator:
                 format_parts.append("%d")
                 args_parts.append(arg_code)
 
+        if not args_parts:
+            # Só texto: puts já acrescenta a quebra de linha
+            textos = [escapar_c(self._texto_fixo(a)) for a in node.args if self._texto_fixo(a) is not None]
+            self.emissor.linha(f'puts("{" ".join(textos)}");')
+            return
         format_string = f'"{" ".join(format_parts)}\\n"'
         final_args = [format_string] + args_parts
-        return f'{self._indent()}printf({", ".join(final_args)});'
-    
+        self.emissor.linha(f'printf({", ".join(final_args)});')
+
+    def _emitir_impressao_rapida(self, node):
+        texto_pendente = []
+        comandos = []
+        for i, arg_node in enumerate(node.args):
+            if i:
+                texto_pendente.append(" ")
+            texto = self._texto_fixo(arg_node)
+            if texto is not None:
+                texto_pendente.append(texto)
+                continue
+            if texto_pendente:
+                comandos.append(f'fputs("{escapar_c("".join(texto_pendente))}", stdout);')
+                texto_pendente = []
+            comandos.append(f"py_escrever_long({self._expr(arg_node)});")
+        texto_pendente.append("\n")
+        texto_final = "".join(texto_pendente)
+        if texto_final == "\n":
+            comandos.append("putchar('\\n');")
+        else:
+            comandos.append(f'fputs("{escapar_c(texto_final)}", stdout);')
+        for comando in comandos:
+            self.emissor.linha(comando)
+
+    # --- Expressões: acrescentam fragmentos de código C em self._partes ---
+
     def visit_BinOpNode(self, node):
-        left_code = self.visit(node.left)
-        right_code = self.visit(node.right)
-        return f"({left_code} {node.op} {right_code})"
-    
-    def visit_VariableNode(self, node): return node.name
-    def visit_NumberNode(self, node): return node.value
-    def visit_StringNode(self, node): return node.value
+        partes = self._partes
+        rotina = ROTINAS_DOS_OPERADORES.get(node.op, {}).get(node.tipo)
+        if rotina:
+            partes.append(rotina + "(")
+            yield node.left
+            partes.append(", ")
+            yield node.right
+            partes.append(")")
+            return
+        if node.op in ('&&', '||') and node.tipo != TIPO_BOOL:
+            # Como no Python, o valor é um dos operandos (ex.: `n or 1`), não 0/1. O da
+            # esquerda aparece duas vezes: as expressões não têm efeitos colaterais.
+            partes.append("((long)(" if node.tipo == TIPO_INTEIRO else "(")
+            yield node.left
+            partes.append(" ? ")
+            yield node.right if node.op == '&&' else node.left
+            partes.append(" : ")
+            yield node.left if node.op == '&&' else node.right
+            partes.append("))" if node.tipo == TIPO_INTEIRO else ")")
+            return
+        partes.append("(")
+        if node.op == '/' and node.left.tipo == TIPO_INTEIRO and node.right.tipo == TIPO_INTEIRO:
+            # '/' do Python é divisão real mesmo entre inteiros
+            partes.append("(double)")
+        if node.tipo == TIPO_INTEIRO and isinstance(node.left, NumberNode):
+            # O operando mais à esquerda define o tipo C da conta: com o sufixo L ela é
+            # feita em long desde o início (ex.: 100000 * 100000 não estoura um int)
+            partes.append(literal_long(node.left.value))
+        else:
+            yield node.left
+        partes.append(f" {node.op} ")
+        yield node.right
+        partes.append(")")
+
+    def visit_UnaryOpNode(self, node):
+        partes = self._partes
+        partes.append("(" + node.op)
+        if node.tipo == TIPO_INTEIRO and isinstance(node.operand, NumberNode):
+            # Com o sufixo L o literal negado é um long, como na BinOp (ex.: -5 * 100000 * 100000)
+            partes.append(literal_long(node.operand.value))
+        else:
+            yield node.operand
+        partes.append(")")
+
+    def visit_CallNode(self, node):
+        partes = self._partes
+        partes.append(nome_c_da_funcao(node.name) + "(")
+        for i, arg in enumerate(node.args):
+            if i:
+                partes.append(", ")
+            yield arg
+        partes.append(")")
+
+    def visit_LenNode(self, node):
+        self._partes.append(f"{node.operand.name}->tamanho")
+
+    def visit_IndexNode(self, node):
+        partes = self._partes
+        partes.append(f"py_vetor_ler_{SUFIXOS_DE_VETOR[node.list_var.tipo]}({node.list_var.name}, ")
+        yield node.index
+        partes.append(")")
+
+    def visit_VariableNode(self, node): self._partes.append(node.name)
+    def visit_NumberNode(self, node): self._partes.append(node.value)
+    def visit_StringNode(self, node): self._partes.append(node.value)
 
     def visit_ListNode(self, node):
-        elementos = [self.visit(el) for el in node.elements]
-        return f"{{{', '.join(elementos)}}}"
\ No newline at end of file
+        partes = self._partes
+        partes.append("{")
+        for i, elemento in enumerate(node.elements):
+            if i:
+                partes.append(", ")
+            yield elemento
+        partes.append("}")
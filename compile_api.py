@@ -0,0 +1,92 @@
+# compile_api.py
+
+from code_generator import CodeGenerator
+from optimizer import otimizar
+from py_to_c_lexer import PythonToCLexer
+from py_to_c_parser import Parser
+from semantic_analyzer import AnalisadorSemantico, SemanticError
+
+# Opções que alteram o código gerado, com seus valores padrão
+OPCOES_PADRAO = {
+    'nivel_otimizacao': 0,
+    'buffer_saida': False,
+    'impressao_rapida': False,
+    'paralelo': False,
+}
+
+class Diagnostico:
+    """Erro encontrado durante a compilação, com a posição quando conhecida."""
+    __slots__ = ('fase', 'mensagem', 'linha', 'coluna')
+
+    def __init__(self, fase, mensagem, linha=None, coluna=None):
+        self.fase = fase
+        self.mensagem = mensagem
+        self.linha = linha
+        self.coluna = coluna
+
+    def __str__(self):
+        return self.mensagem
+
+    def __repr__(self):
+        return f"Diagnostico({self.fase!r}, {self.mensagem!r}, linha={self.linha}, coluna={self.coluna})"
+
+class ResultadoDeCompilacao:
+    """
+    Resultado de `compile_source`. Em caso de erro, `c_code` é None e `diagnosticos`
+    descreve o problema; `simbolos` mapeia cada variável para o tipo inferido.
+    """
+    def __init__(self, c_code=None, diagnosticos=None, ast=None, tabela_de_simbolos=None, relatorio=None):
+        self.c_code = c_code
+        self.diagnosticos = diagnosticos or []
+        self.ast = ast
+        self.tabela_de_simbolos = tabela_de_simbolos
+        self.relatorio_otimizacao = relatorio or {}
+
+    @property
+    def sucesso(self):
+        return self.c_code is not None
+
+    @property
+    def simbolos(self):
+        if self.tabela_de_simbolos is None:
+            return {}
+        return {nome: info['tipo'] for nome, info in self.tabela_de_simbolos.simbolos.items()}
+
+def validar_opcoes(opcoes):
+    desconhecidas = set(opcoes) - set(OPCOES_PADRAO)
+    if desconhecidas:
+        raise TypeError(f"Opções de compilação desconhecidas: {', '.join(sorted(desconhecidas))}")
+    return dict(OPCOES_PADRAO, **opcoes)
+
+def analisar(code, opcoes):
+    """Fases 1 a 3 e as otimizações pedidas em `opcoes`; devolve (AST, tabela de símbolos, relatório)."""
+    # Os tokens são produzidos sob demanda enquanto o parser os consome
+    ast_tree = Parser(PythonToCLexer().iter_tokens(code)).parse()
+    tabela_de_simbolos = AnalisadorSemantico(ast_tree).analisar()
+    ast_tree, relatorio = otimizar(ast_tree, tabela_de_simbolos, opcoes.get('nivel_otimizacao', 0))
+    return ast_tree, tabela_de_simbolos, relatorio
+
+def traduzir(code, opcoes=None):
+    """Executa todas as fases do compilador e devolve (código C, AST, tabela de símbolos)."""
+    opcoes = opcoes or {}
+    ast_tree, tabela_de_simbolos, _ = analisar(code, opcoes)
+    return CodeGenerator(tabela_de_simbolos, opcoes).generate(ast_tree), ast_tree, tabela_de_simbolos
+
+def compile_source(texto, **opcoes):
+    """
+    Compila o programa Python em `texto` inteiramente em memória, sem ler ou escrever
+    arquivos e sem imprimir nada. As opções são as de OPCOES_PADRAO (ex.:
+    `compile_source(codigo, nivel_otimizacao=2)`). Erros de sintaxe e semânticos
+    não são lançados: voltam em `diagnosticos`, com `c_code` igual a None.
+    """
+    opcoes = validar_opcoes(opcoes)
+    try:
+        ast_tree, tabela_de_simbolos, relatorio = analisar(texto, opcoes)
+    except SemanticError as e:
+        return ResultadoDeCompilacao(diagnosticos=[Diagnostico('semantica', str(e), e.line, e.col)])
+    except SyntaxError as e:
+        linha = getattr(e, 'linha', e.lineno)
+        coluna = getattr(e, 'coluna', e.offset)
+        return ResultadoDeCompilacao(diagnosticos=[Diagnostico('sintatica', str(e), linha, coluna)])
+    c_code = CodeGenerator(tabela_de_simbolos, opcoes).generate(ast_tree)
+    return ResultadoDeCompilacao(c_code, [], ast_tree, tabela_de_simbolos, relatorio)
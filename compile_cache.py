@@ -0,0 +1,167 @@
+# compile_cache.py
+
+import glob
+import hashlib
+import os
+import shutil
+import stat
+import tempfile
+
+DIRETORIO_PADRAO = '.py_to_c_cache'
+TAMANHO_MAXIMO_PADRAO = 256 * 1024 * 1024  # bytes
+
+# Incrementar quando o formato das entradas do cache mudar
+VERSAO_DO_FORMATO = 1
+
+_fingerprint = None
+
+def fingerprint_do_compilador():
+    """
+    Hash do código-fonte de todos os módulos do compilador. Qualquer alteração no
+    compilador muda o fingerprint e invalida automaticamente as entradas antigas.
+    """
+    global _fingerprint
+    if _fingerprint is None:
+        h = hashlib.sha256(f'formato-{VERSAO_DO_FORMATO}'.encode())
+        diretorio = os.path.dirname(os.path.abspath(__file__))
+        for caminho in sorted(glob.glob(os.path.join(diretorio, '*.py'))):
+            h.update(os.path.basename(caminho).encode())
+            with open(caminho, 'rb') as f:
+                h.update(f.read())
+        _fingerprint = h.hexdigest()
+    return _fingerprint
+
+# Cada processo (ex.: um worker do pool) mantém sua própria instância de cada cache
+_caches_por_processo = {}
+
+def obter_cache(config_cache, classe=None):
+    """
+    A instância de `classe` (padrão: CompileCache) deste processo para config_cache =
+    (diretório, tamanho máximo em bytes), ou None se config_cache é None (sem cache).
+    """
+    if config_cache is None:
+        return None
+    classe = classe or CompileCache
+    cache = _caches_por_processo.get((classe, *config_cache))
+    if cache is None:
+        cache = _caches_por_processo[(classe, *config_cache)] = classe(*config_cache)
+    return cache
+
+class CompileCache:
+    """
+    Cache em disco endereçado por conteúdo: a chave é o hash do código-fonte mais o
+    fingerprint do compilador (e das opções de compilação). Cada entrada guarda o C
+    gerado.
+    A evicção é LRU pelo mtime dos arquivos, que é atualizado a cada acerto.
+    """
+    # Extensão do artefato principal de cada entrada
+    EXTENSAO = '.c'
+
+    def __init__(self, diretorio=DIRETORIO_PADRAO, tamanho_maximo=TAMANHO_MAXIMO_PADRAO):
+        self.diretorio = diretorio
+        self.tamanho_maximo = tamanho_maximo
+        self.hits = 0
+        self.misses = 0
+
+    def chave(self, source, opcoes=None):
+        h = hashlib.sha256(fingerprint_do_compilador().encode())
+        if opcoes:
+            h.update(repr(sorted(opcoes.items())).encode())
+        h.update(b'\0')
+        h.update(source.encode('utf-8'))
+        return h.hexdigest()
+
+    def _caminho(self, chave, extensao):
+        # Subdiretórios pelo prefixo da chave evitam diretórios com milhares de arquivos
+        return os.path.join(self.diretorio, chave[:2], chave + extensao)
+
+    def obter(self, chave):
+        """Retorna o código C armazenado para a chave, ou None (contabilizando acerto/falha)."""
+        caminho = self._caminho(chave, self.EXTENSAO)
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                c_code = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+        self._tocar(caminho)
+        self.hits += 1
+        return c_code
+
+    def copiar_para(self, chave, destino):
+        """Copia o código C armazenado diretamente para `destino`; retorna False se não houver entrada."""
+        caminho = self._caminho(chave, self.EXTENSAO)
+        try:
+            shutil.copyfile(caminho, destino)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        self._tocar(caminho)
+        self.hits += 1
+        return True
+
+    def guardar(self, chave, c_code):
+        os.makedirs(os.path.dirname(self._caminho(chave, self.EXTENSAO)), exist_ok=True)
+        self._escrever_atomico(self._caminho(chave, self.EXTENSAO), c_code.encode('utf-8'))
+
+    def guardar_arquivo(self, chave, origem):
+        """Como `guardar`, mas copia o código C de um arquivo já gerado sem carregá-lo na memória."""
+        caminho = self._caminho(chave, self.EXTENSAO)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        fd, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix='.tmp')
+        os.close(fd)
+        try:
+            shutil.copyfile(origem, temporario)
+            os.replace(temporario, caminho)
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+    def _escrever_atomico(self, caminho, dados):
+        # Vários workers podem gravar a mesma entrada: escreve em um temporário e renomeia
+        fd, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(dados)
+            os.replace(temporario, caminho)
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+    def _tocar(self, caminho):
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+
+    def aplicar_limite(self):
+        """Remove as entradas usadas há mais tempo até o cache caber no tamanho máximo."""
+        entradas = []
+        total = 0
+        for caminho in glob.glob(os.path.join(self.diretorio, '*', '*')):
+            try:
+                info = os.stat(caminho)
+            except OSError:
+                continue
+            if not stat.S_ISREG(info.st_mode):
+                continue  # subdiretórios de outros caches guardados aqui dentro (ex.: objetos/)
+            entradas.append((info.st_mtime, info.st_size, caminho))
+            total += info.st_size
+
+        removidos = 0
+        entradas.sort()
+        for _, tamanho, caminho in entradas:
+            if total <= self.tamanho_maximo:
+                break
+            try:
+                os.remove(caminho)
+            except OSError:
+                continue
+            total -= tamanho
+            removidos += 1
+        return removidos
+
+    def limpar(self):
+        shutil.rmtree(self.diretorio, ignore_errors=True)
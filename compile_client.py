@@ -0,0 +1,205 @@
+# compile_client.py
+#
+# Cliente do compile_daemon.py: envia os programas pelo socket Unix do servidor,
+# que já está com o interpretador, os módulos do compilador e o cache carregados.
+# Aceita as mesmas entradas e opções de saída do main.py e, como o main.py com -q
+# ou -o, não imprime nada além dos erros (em stderr) e do C pedido em stdout. Se o
+# servidor não estiver rodando, compila neste mesmo processo.
+#
+# Uso:
+#   python compile_daemon.py &
+#   python compile_client.py exemplo.py -O2
+#   python gerador.py | python compile_client.py - > programa.c
+#
+# Só usa a biblioteca padrão: o custo de iniciar o cliente é o do interpretador.
+
+import argparse
+import glob
+import json
+import os
+import socket
+import sys
+import tempfile
+
+# Protocolo: uma requisição JSON por linha e uma resposta JSON por linha, ligadas
+# pelo campo 'id' (as respostas podem chegar fora de ordem).
+LIMITE_DA_LINHA = 256 * 1024 * 1024
+
+def socket_padrao():
+    return os.path.join(tempfile.gettempdir(), f"py_to_c-{os.getuid()}.sock")
+
+class ErroDeConexao(Exception):
+    pass
+
+class ClienteDeCompilacao:
+    def __init__(self, caminho_socket=None):
+        self.caminho_socket = caminho_socket or socket_padrao()
+        self._socket = None
+        self._arquivo = None
+        self._proximo_id = 0
+
+    def conectar(self):
+        conexao = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            conexao.connect(self.caminho_socket)
+        except OSError as e:
+            conexao.close()
+            raise ErroDeConexao(f"servidor indisponível em {self.caminho_socket}: {e}") from None
+        self._socket = conexao
+        self._arquivo = conexao.makefile('rwb')
+        return self
+
+    def fechar(self):
+        if self._arquivo:
+            self._arquivo.close()
+            self._socket.close()
+            self._arquivo = self._socket = None
+
+    def __enter__(self):
+        return self.conectar()
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def enviar(self, requisicao):
+        """Envia sem esperar a resposta; devolve o id da requisição."""
+        self._proximo_id += 1
+        requisicao = dict(requisicao, id=self._proximo_id)
+        self._arquivo.write(json.dumps(requisicao).encode('utf-8') + b"\n")
+        return self._proximo_id
+
+    def receber(self):
+        self._arquivo.flush()
+        linha = self._arquivo.readline(LIMITE_DA_LINHA)
+        if not linha:
+            raise ErroDeConexao("o servidor fechou a conexão")
+        return json.loads(linha)
+
+    def requisitar_varias(self, requisicoes):
+        """Envia todas as requisições de uma vez e devolve as respostas na ordem delas."""
+        ids = [self.enviar(requisicao) for requisicao in requisicoes]
+        respostas = {}
+        while len(respostas) < len(ids):
+            resposta = self.receber()
+            respostas[resposta.get('id')] = resposta
+        return [respostas[i] for i in ids]
+
+    def requisitar(self, requisicao):
+        return self.requisitar_varias([requisicao])[0]
+
+def caminho_saida(input_file):
+    return os.path.splitext(input_file)[0] + '.c'
+
+def resolver_entradas(entradas):
+    arquivos = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            arquivos.extend(sorted(glob.glob(os.path.join(entrada, '**', '*.py'), recursive=True)))
+        elif any(c in entrada for c in '*?['):
+            arquivos.extend(sorted(c for c in glob.glob(entrada, recursive=True) if os.path.isfile(c)))
+        else:
+            arquivos.append(entrada)
+    return list(dict.fromkeys(arquivos))
+
+def mensagem_de_erro(resposta):
+    if resposta.get('diagnosticos'):
+        return "; ".join(f"ERRO DE COMPILAÇÃO: {d['mensagem']}" for d in resposta['diagnosticos'])
+    return resposta.get('erro', 'erro desconhecido')
+
+def criar_argparser():
+    parser = argparse.ArgumentParser(
+        description="Cliente do servidor de compilação Python → C.",
+        usage="python compile_client.py [opções] <arquivo.py | diretório | glob | -> ...",
+    )
+    parser.add_argument('entradas', nargs='*', metavar='entrada',
+                        help="arquivos .py, diretórios ou globs; '-' lê de stdin e escreve o C em stdout")
+    parser.add_argument('-o', '--output', metavar='ARQUIVO',
+                        help="arquivo de saída de um único programa ('-' para stdout)")
+    parser.add_argument('-O', dest='nivel_otimizacao', type=int, default=0, metavar='NÍVEL')
+    parser.add_argument('--stdout-buffer', action='store_true')
+    parser.add_argument('--fast-print', action='store_true')
+    parser.add_argument('--parallel', action='store_true')
+    parser.add_argument('--socket', help=f"socket do servidor (padrão: {socket_padrao()})")
+    parser.add_argument('--status', action='store_true', help="mostra os contadores do servidor")
+    parser.add_argument('--shutdown', action='store_true', help="encerra o servidor")
+    return parser
+
+def compilar_localmente(requisicao):
+    """Atende a requisição neste processo, com a mesma resposta que o servidor daria."""
+    # Só importa o compilador quando realmente precisa dele
+    from compile_api import compile_source
+    try:
+        codigo = requisicao.get('codigo')
+        if codigo is None:
+            with open(requisicao['caminho'], 'r', encoding='utf-8') as f:
+                codigo = f.read()
+        resultado = compile_source(codigo, **requisicao['opcoes'])
+        if not resultado.sucesso:
+            return {'ok': False, 'diagnosticos': [{'mensagem': str(d)} for d in resultado.diagnosticos]}
+        if 'saida' in requisicao:
+            with open(requisicao['saida'], 'w', encoding='utf-8') as f:
+                f.write(resultado.c_code)
+            return {'ok': True}
+        return {'ok': True, 'c_code': resultado.c_code}
+    except OSError as e:
+        return {'ok': False, 'erro': f"Erro de E/S: {e}"}
+
+def main(argv=None):
+    argparser = criar_argparser()
+    args = argparser.parse_args(argv)
+    cliente = ClienteDeCompilacao(args.socket)
+
+    if args.status or args.shutdown:
+        try:
+            with cliente:
+                resposta = cliente.requisitar({'comando': 'encerrar' if args.shutdown else 'status'})
+        except ErroDeConexao as e:
+            print(e, file=sys.stderr)
+            return 1
+        print(json.dumps(resposta, indent=2, ensure_ascii=False))
+        return 0
+
+    if not args.entradas:
+        argparser.print_usage()
+        return 1
+    opcoes = {
+        'nivel_otimizacao': args.nivel_otimizacao,
+        'buffer_saida': args.stdout_buffer,
+        'impressao_rapida': args.fast_print,
+        'paralelo': args.parallel,
+    }
+
+    if args.entradas == ['-']:
+        destinos = [args.output or '-']
+        requisicoes = [{'codigo': sys.stdin.read(), 'opcoes': opcoes}]
+    else:
+        arquivos = resolver_entradas(args.entradas)
+        if not arquivos:
+            print("Nenhum arquivo .py encontrado nas entradas informadas.", file=sys.stderr)
+            return 1
+        if args.output and len(arquivos) > 1:
+            argparser.error("-o só pode ser usado com um único programa")
+        destinos = [args.output or caminho_saida(arquivo) for arquivo in arquivos]
+        # O servidor pode ter outro diretório de trabalho: os caminhos vão absolutos
+        requisicoes = [{'caminho': os.path.abspath(arquivo), 'opcoes': opcoes} for arquivo in arquivos]
+    for requisicao, destino in zip(requisicoes, destinos):
+        if destino != '-':
+            requisicao['saida'] = os.path.abspath(destino)
+
+    try:
+        with cliente:
+            respostas = cliente.requisitar_varias(requisicoes)
+    except ErroDeConexao:
+        respostas = [compilar_localmente(requisicao) for requisicao in requisicoes]
+
+    falhas = 0
+    for requisicao, destino, resposta in zip(requisicoes, destinos, respostas):
+        if not resposta.get('ok'):
+            falhas += 1
+            print(f"{requisicao.get('caminho', '<stdin>')}: {mensagem_de_erro(resposta)}", file=sys.stderr)
+        elif destino == '-':
+            sys.stdout.write(resposta['c_code'])
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
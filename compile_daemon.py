@@ -0,0 +1,236 @@
+# compile_daemon.py
+#
+# Servidor de compilação de longa duração. Fica escutando em um socket Unix e
+# atende requisições do compile_client.py (ou de qualquer programa que fale o
+# protocolo abaixo), evitando pagar a inicialização do interpretador e a importação
+# dos módulos a cada arquivo. A compilação roda em um pool de processos; o cache
+# em disco e um cache em memória dos resultados recentes ficam quentes no servidor.
+#
+# Uso:
+#   python compile_daemon.py [--socket CAMINHO] [-j N] [--no-cache]
+#
+# Protocolo: uma requisição JSON por linha, respondida com uma linha JSON com o
+# mesmo 'id'. Várias requisições da mesma conexão são atendidas em paralelo.
+#   {"id": 1, "codigo": "...", "opcoes": {...}}             -> {"id": 1, "ok": true, "c_code": "..."}
+#   {"id": 2, "caminho": "/abs/a.py", "saida": "/abs/a.c"}  -> {"id": 2, "ok": true, "cache": false}
+#   {"id": 3, "comando": "status"} / {"comando": "encerrar"}
+# Em caso de erro: {"ok": false, "diagnosticos": [...]} ou {"ok": false, "erro": "..."}.
+#
+# O servidor não percebe alterações no código do compilador: reinicie-o depois de
+# atualizá-lo (o fingerprint do cache é calculado uma única vez).
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from compile_api import compile_source, validar_opcoes
+from compile_cache import CompileCache, DIRETORIO_PADRAO, TAMANHO_MAXIMO_PADRAO
+from compile_client import LIMITE_DA_LINHA, socket_padrao
+
+TAMANHO_CACHE_EM_MEMORIA = 64 * 1024 * 1024  # bytes de código C
+
+def compilar_no_worker(codigo, opcoes):
+    """Executado nos processos do pool; devolve (código C, diagnósticos) em tipos serializáveis."""
+    resultado = compile_source(codigo, **opcoes)
+    diagnosticos = [
+        {'fase': d.fase, 'mensagem': d.mensagem, 'linha': d.linha, 'coluna': d.coluna}
+        for d in resultado.diagnosticos
+    ]
+    return resultado.c_code, diagnosticos
+
+def aquecer_worker():
+    # Os módulos do compilador já foram importados junto com este; força o resto da
+    # inicialização preguiçosa antes da primeira requisição real.
+    compile_source("x = 1\n")
+
+class CacheEmMemoria:
+    """LRU dos códigos C mais recentes, limitado pelo total de caracteres guardados."""
+    def __init__(self, limite):
+        self.limite = limite
+        self._itens = OrderedDict()
+        self._tamanho = 0
+
+    def obter(self, chave):
+        c_code = self._itens.get(chave)
+        if c_code is not None:
+            self._itens.move_to_end(chave)
+        return c_code
+
+    def guardar(self, chave, c_code):
+        if chave in self._itens:
+            self._tamanho -= len(self._itens.pop(chave))
+        self._itens[chave] = c_code
+        self._tamanho += len(c_code)
+        while self._tamanho > self.limite and self._itens:
+            _, removido = self._itens.popitem(last=False)
+            self._tamanho -= len(removido)
+
+class ServidorDeCompilacao:
+    def __init__(self, caminho_socket, jobs=None, cache=None):
+        self.caminho_socket = caminho_socket
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache = cache
+        self.memoria = CacheEmMemoria(TAMANHO_CACHE_EM_MEMORIA)
+        self.contadores = {'requisicoes': 0, 'compilacoes': 0, 'acertos_memoria': 0, 'acertos_disco': 0, 'erros': 0}
+        self._pool = None
+        self._servidor = None
+        self._encerrar = None
+
+    async def executar(self):
+        self._preparar_socket()
+        loop = asyncio.get_running_loop()
+        self._encerrar = asyncio.Event()
+        for sinal in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sinal, self._encerrar.set)
+        self._pool = ProcessPoolExecutor(max_workers=self.jobs, initializer=aquecer_worker)
+        try:
+            self._servidor = await asyncio.start_unix_server(
+                self._atender_conexao, path=self.caminho_socket, limit=LIMITE_DA_LINHA)
+            print(f"Servidor de compilação em {self.caminho_socket} ({self.jobs} processo(s))", flush=True)
+            async with self._servidor:
+                await self._encerrar.wait()
+        finally:
+            self._pool.shutdown(cancel_futures=True)
+            if os.path.exists(self.caminho_socket):
+                os.remove(self.caminho_socket)
+
+    def _preparar_socket(self):
+        """Remove um socket abandonado por um servidor anterior; falha se ainda houver um ativo."""
+        if not os.path.exists(self.caminho_socket):
+            return
+        teste = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            teste.connect(self.caminho_socket)
+        except OSError:
+            os.remove(self.caminho_socket)
+        else:
+            raise SystemExit(f"Já existe um servidor ativo em {self.caminho_socket}")
+        finally:
+            teste.close()
+
+    async def _atender_conexao(self, leitor, escritor):
+        trava_de_escrita = asyncio.Lock()
+        tarefas = set()
+
+        async def responder(requisicao):
+            resposta = await self._atender(requisicao)
+            resposta['id'] = requisicao.get('id')
+            async with trava_de_escrita:
+                escritor.write(json.dumps(resposta).encode('utf-8') + b"\n")
+                await escritor.drain()
+
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    break
+                try:
+                    requisicao = json.loads(linha)
+                except ValueError:
+                    requisicao = {'comando': 'invalido'}
+                tarefa = asyncio.create_task(responder(requisicao))
+                tarefas.add(tarefa)
+                tarefa.add_done_callback(tarefas.discard)
+            if tarefas:
+                await asyncio.gather(*tarefas, return_exceptions=True)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass  # cliente desconectou ou mandou uma linha grande demais
+        except asyncio.CancelledError:
+            pass  # servidor encerrando com a conexão ainda aberta
+        finally:
+            escritor.close()
+
+    async def _atender(self, requisicao):
+        self.contadores['requisicoes'] += 1
+        comando = requisicao.get('comando', 'compilar')
+        if comando == 'status':
+            return {'ok': True, 'contadores': self.contadores, 'jobs': self.jobs}
+        if comando == 'encerrar':
+            self._encerrar.set()
+            return {'ok': True}
+        if comando != 'compilar':
+            return {'ok': False, 'erro': f"Comando inválido: {comando}"}
+
+        try:
+            resposta = await self._compilar(requisicao)
+        except Exception as e:
+            # Qualquer falha (ex.: RecursionError no worker, caminho que não é UTF-8)
+            # vira uma resposta de erro: sem ela o cliente esperaria para sempre
+            resposta = {'ok': False, 'erro': f"{type(e).__name__}: {e}"}
+        if not resposta['ok']:
+            self.contadores['erros'] += 1
+        return resposta
+
+    async def _compilar(self, requisicao):
+        opcoes = validar_opcoes(requisicao.get('opcoes') or {})
+        codigo = requisicao.get('codigo')
+        if codigo is None:
+            codigo = await asyncio.to_thread(ler_arquivo, requisicao['caminho'])
+
+        chave = self.cache.chave(codigo, opcoes) if self.cache else None
+        origem = None
+        c_code = self.memoria.obter(chave) if chave else None
+        if c_code is not None:
+            self.contadores['acertos_memoria'] += 1
+            origem = 'memoria'
+        elif self.cache:
+            c_code = await asyncio.to_thread(self.cache.obter, chave)
+            if c_code is not None:
+                self.contadores['acertos_disco'] += 1
+                origem = 'disco'
+
+        if c_code is None:
+            self.contadores['compilacoes'] += 1
+            loop = asyncio.get_running_loop()
+            c_code, diagnosticos = await loop.run_in_executor(self._pool, compilar_no_worker, codigo, opcoes)
+            if c_code is None:
+                return {'ok': False, 'diagnosticos': diagnosticos}
+            if self.cache:
+                await asyncio.to_thread(self._guardar_no_disco, chave, c_code)
+        if chave:
+            self.memoria.guardar(chave, c_code)
+
+        resposta = {'ok': True, 'cache': origem is not None}
+        if 'saida' in requisicao:
+            await asyncio.to_thread(escrever_arquivo, requisicao['saida'], c_code)
+        else:
+            resposta['c_code'] = c_code
+        return resposta
+
+    def _guardar_no_disco(self, chave, c_code):
+        self.cache.guardar(chave, c_code)
+        self.cache.aplicar_limite()
+
+def ler_arquivo(caminho):
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def escrever_arquivo(caminho, conteudo):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write(conteudo)
+
+def main(argv=None):
+    argparser = argparse.ArgumentParser(description="Servidor de compilação Python → C em um socket Unix.")
+    argparser.add_argument('--socket', default=socket_padrao(), help="caminho do socket (padrão: %(default)s)")
+    argparser.add_argument('-j', '--jobs', type=int, default=None,
+                           help="processos de compilação (padrão: número de núcleos)")
+    argparser.add_argument('--no-cache', action='store_true', help="não usa o cache em disco nem em memória")
+    argparser.add_argument('--cache-dir', default=os.path.abspath(DIRETORIO_PADRAO),
+                           help="diretório do cache (padrão: %(default)s)")
+    argparser.add_argument('--cache-size', type=int, default=TAMANHO_MAXIMO_PADRAO // (1024 * 1024),
+                           help="tamanho máximo do cache em disco, em MB")
+    args = argparser.parse_args(argv)
+
+    cache = None if args.no_cache else CompileCache(args.cache_dir, args.cache_size * 1024 * 1024)
+    servidor = ServidorDeCompilacao(args.socket, args.jobs, cache)
+    asyncio.run(servidor.executar())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+# compile_incremental.py
+#
+# Compilação incremental para o ciclo editar-compilar (main.py --watch). O programa
+# é dividido em comandos de nível superior (cada um começa em uma linha na coluna 0),
+# e cada trecho guarda sua AST (com os tipos anotados) e o C gerado. Numa nova compilação só
+# passam de novo pelas fases os trechos cujo texto mudou e aqueles cujos tipos de
+# variáveis foram afetados pela mudança; o resto é reaproveitado.
+#
+# O resultado é sempre idêntico ao da compilação completa (compile_api.traduzir).
+# Quando a divisão em trechos não se aplica (erros, otimizações de programa inteiro
+# com -O1/-O2, funções, cujos tipos vêm de todas as chamadas) é a própria
+# compilação completa que roda.
+
+import re
+
+from ast_visitor import percorrer
+from ast_nodes import FunctionDefNode, ProgramNode, VariableNode
+from code_generator import CodeGenerator
+from compile_api import traduzir, validar_opcoes
+from py_to_c_lexer import PythonToCLexer
+from py_to_c_parser import Parser
+from semantic_analyzer import AnalisadorSemantico, SemanticError, TabelaDeSimbolos
+
+# Resultados da análise semântica guardados por trecho (um por ambiente de tipos)
+MAXIMO_DE_ANALISES_POR_TRECHO = 8
+
+# 'else' e 'elif' na coluna 0 continuam o if anterior, não começam um comando
+CONTINUACAO = re.compile(r'(else|elif)\b')
+
+def dividir_em_trechos(texto):
+    """
+    Divide o programa nos textos dos comandos de nível superior. Linhas em branco e
+    comentários ficam com o trecho anterior. Linhas na coluna 0 que ainda fazem parte
+    do comando anterior (dentro de parênteses ou de uma string de várias linhas) são
+    reunidas depois, quando o trecho isolado não puder ser tokenizado.
+    """
+    trechos = []
+    atual = []
+    for linha in texto.splitlines(keepends=True):
+        inicia = linha[:1] not in ('', ' ', '\t', '\f', '#', '\n', '\r') and not CONTINUACAO.match(linha)
+        if inicia and atual:
+            trechos.append("".join(atual))
+            atual = []
+        atual.append(linha)
+    if atual:
+        trechos.append("".join(atual))
+    return trechos
+
+class Trecho:
+    """Um comando de nível superior e tudo o que já foi calculado para ele."""
+    __slots__ = ('texto', 'comandos', 'nomes', 'analises', 'chave_anotada', 'chave_final',
+                 'chave_geracao', 'codigo_c', 'rotinas')
+
+    def __init__(self, texto, comandos):
+        self.texto = texto
+        self.comandos = comandos
+        self.nomes = tuple(sorted({no.name for no in percorrer(ProgramNode(comandos))
+                                   if isinstance(no, VariableNode)}))
+        # Tipos das variáveis do trecho na entrada da análise -> atribuições que ele faz
+        self.analises = {}
+        self.chave_anotada = None  # ambiente da última análise (o que está anotado na AST)
+        self.chave_final = None
+        self.chave_geracao = None
+        self.codigo_c = None
+        self.rotinas = ()
+
+    def tipos_de_entrada(self, tabela):
+        simbolos = tabela.simbolos
+        return tuple(simbolos[nome]['tipo'] if nome in simbolos else None for nome in self.nomes)
+
+class TabelaComRegistro(TabelaDeSimbolos):
+    """Tabela de símbolos que anota cada tipo atribuído, para reproduzir a análise de um trecho."""
+    def __init__(self):
+        super().__init__()
+        self.registro = []
+
+    def unir_tipo(self, nome, tipo):
+        self.registro.append((nome, tipo))
+        super().unir_tipo(nome, tipo)
+
+class CompiladorIncremental:
+    """
+    Mantém os trechos da última compilação. `compilar(texto)` devolve o código C e
+    lança SyntaxError/SemanticError como a compilação completa; `estatisticas`
+    conta, na última chamada, os trechos reprocessados em cada fase.
+    """
+    def __init__(self, **opcoes):
+        self.opcoes = validar_opcoes(opcoes)
+        self.lexer = PythonToCLexer()
+        self._trechos = {}  # texto -> trechos com esse texto (comandos repetidos não compartilham a AST)
+        self.estatisticas = {}
+
+    def compilar(self, texto):
+        self.estatisticas = {'trechos': 0, 'novos': 0, 'reanalisados': 0, 'regerados': 0, 'completa': False}
+        if self.opcoes['nivel_otimizacao'] > 0:
+            # Os passes de otimização olham o programa inteiro
+            return self._compilacao_completa(texto)
+        trechos = self._atualizar_trechos(texto)
+        if trechos is None:
+            return self._compilacao_completa(texto)
+        try:
+            tabela = self._analisar(trechos)
+        except SemanticError:
+            # A compilação completa repete o erro com a linha e a coluna no arquivo
+            for trecho in trechos:
+                trecho.chave_anotada = None
+            return self._compilacao_completa(texto)
+        return self._gerar(trechos, tabela)
+
+    def _compilacao_completa(self, texto):
+        self.estatisticas['completa'] = True
+        return traduzir(texto, self.opcoes)[0]
+
+    def _atualizar_trechos(self, texto):
+        """Trechos do novo texto, reaproveitando os já conhecidos; None se a divisão falhar."""
+        anteriores = self._trechos
+        self._trechos = atuais = {}
+        trechos = []
+        pendente = ""
+        for parte in dividir_em_trechos(texto):
+            parte = pendente + parte
+            reaproveitaveis = anteriores.get(parte)
+            if reaproveitaveis:
+                trecho = reaproveitaveis.pop()
+            else:
+                try:
+                    tokens = self.lexer.tokenize(parte)
+                except SyntaxError:
+                    # Ex.: lista ou string que continua na próxima linha da coluna 0
+                    pendente = parte
+                    continue
+                parser = Parser(tokens)
+                try:
+                    ast_trecho = parser.parse()
+                except SyntaxError:
+                    ast_trecho = None
+                if ast_trecho is None or parser.current_token is not None:
+                    break
+                if any(isinstance(comando, FunctionDefNode) for comando in ast_trecho.statements):
+                    break
+                trecho = Trecho(parte, ast_trecho.statements)
+                self.estatisticas['novos'] += 1
+            pendente = ""
+            trechos.append(trecho)
+            atuais.setdefault(parte, []).append(trecho)
+        else:
+            if not pendente:
+                self.estatisticas['trechos'] = len(trechos)
+                return trechos
+        # Mantém também os trechos anteriores: o próximo texto deve corrigir o erro
+        for parte, lista in anteriores.items():
+            atuais.setdefault(parte, []).extend(lista)
+        return None
+
+    def _analisar(self, trechos):
+        """
+        Mesmo ponto fixo do AnalisadorSemantico.analisar, trecho a trecho. O efeito de
+        um trecho na tabela depende só dos tipos das variáveis que ele usa: se esse
+        ambiente já foi visto, as atribuições guardadas são repetidas sem visitar a AST.
+        """
+        tabela = TabelaComRegistro()
+        analisador = AnalisadorSemantico(None)
+        analisador.tabela_de_simbolos = tabela
+        while True:
+            antes = {nome: info['tipo'] for nome, info in tabela.simbolos.items()}
+            for trecho in trechos:
+                chave = trecho.tipos_de_entrada(tabela)
+                trecho.chave_final = chave
+                registro = trecho.analises.get(chave)
+                if registro is not None:
+                    for nome, tipo in registro:
+                        TabelaDeSimbolos.unir_tipo(tabela, nome, tipo)
+                    continue
+                tabela.registro = []
+                trecho.chave_anotada = None
+                analisador.visit(ProgramNode(trecho.comandos))
+                trecho.chave_anotada = chave
+                if len(trecho.analises) >= MAXIMO_DE_ANALISES_POR_TRECHO:
+                    trecho.analises.clear()
+                trecho.analises[chave] = tabela.registro
+                self.estatisticas['reanalisados'] += 1
+            depois = {nome: info['tipo'] for nome, info in tabela.simbolos.items()}
+            if depois == antes:
+                break
+
+        # Os tipos anotados na AST precisam ser os da última passagem
+        for trecho in trechos:
+            if trecho.chave_anotada != trecho.chave_final:
+                local = AnalisadorSemantico(None)
+                for nome, tipo in zip(trecho.nomes, trecho.chave_final):
+                    if tipo is not None:
+                        local.tabela_de_simbolos.definir_tipo(nome, tipo)
+                local.visit(ProgramNode(trecho.comandos))
+                trecho.chave_anotada = trecho.chave_final
+                self.estatisticas['reanalisados'] += 1
+        return tabela
+
+    def _gerar(self, trechos, tabela):
+        gerador = CodeGenerator(tabela, self.opcoes)
+        rotinas = set()
+        for trecho in trechos:
+            # O C de um trecho depende dos tipos anotados e dos tipos finais das suas variáveis
+            chave = (trecho.chave_final, trecho.tipos_de_entrada(tabela))
+            if chave != trecho.chave_geracao:
+                trecho.codigo_c, trecho.rotinas = gerador.gerar_trecho(trecho.comandos)
+                trecho.chave_geracao = chave
+                self.estatisticas['regerados'] += 1
+            rotinas.update(trecho.rotinas)
+        return gerador.montar([trecho.codigo_c for trecho in trechos], rotinas)
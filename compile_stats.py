@@ -0,0 +1,70 @@
+# compile_stats.py
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from ast_visitor import percorrer
+
+def contar_nos(raiz):
+    return sum(1 for _ in percorrer(raiz))
+
+class EstatisticasDeCompilacao:
+    """
+    Tempo de parede e pico de memória rastreada (tracemalloc) de cada fase, junto
+    com as contagens que a fase produziu (tokens, nós da AST, símbolos, ...).
+    O pico de uma fase é medido a partir da memória já alocada quando ela começa.
+    Os tempos incluem o custo do tracemalloc, que fica ativo enquanto as fases rodam.
+    """
+    def __init__(self):
+        self.fases = []
+
+    def iniciar(self):
+        tracemalloc.start()
+
+    def encerrar(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextmanager
+    def fase(self, nome):
+        """Mede o bloco como a fase `nome`; o dicionário devolvido recebe as contagens da fase."""
+        registro = {'fase': nome}
+        rastreando = tracemalloc.is_tracing()
+        if rastreando:
+            antes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro['segundos'] = time.perf_counter() - inicio
+            registro['pico_bytes'] = tracemalloc.get_traced_memory()[1] - antes if rastreando else None
+            self.fases.append(registro)
+
+    def como_dict(self):
+        return {
+            'fases': self.fases,
+            'total_segundos': sum(f['segundos'] for f in self.fases),
+        }
+
+    def formatar_json(self):
+        return json.dumps(self.como_dict(), indent=2, ensure_ascii=False)
+
+    def formatar_texto(self):
+        linhas = [" Estatísticas por fase:"]
+        for registro in self.fases:
+            memoria = "" if registro['pico_bytes'] is None else f"{registro['pico_bytes'] / 1024 / 1024:9.2f} MB"
+            contagens = ", ".join(
+                f"{chave}={valor}" for chave, valor in registro.items()
+                if chave not in ('fase', 'segundos', 'pico_bytes')
+            )
+            linhas.append(f"   {registro['fase']:12} {registro['segundos'] * 1000:10.2f} ms {memoria}  {contagens}")
+        linhas.append(f"   {'total':12} {self.como_dict()['total_segundos'] * 1000:10.2f} ms")
+        return "\n".join(linhas)
+
+@contextmanager
+def sem_medicao(nome):
+    """Substituto de EstatisticasDeCompilacao.fase quando as estatísticas estão desligadas."""
+    yield {}
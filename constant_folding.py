@@ -0,0 +1,299 @@
+# constant_folding.py
+
+import math
+import operator
+from ast_nodes import *
+from ast_visitor import NodeVisitor, variaveis_atribuidas
+from py_to_c_lexer import TokenKind
+from semantic_analyzer import TIPO_INTEIRO, TIPO_NUMERO, TIPO_BOOL, inteiro_literal
+
+# Inteiros fora do intervalo de 64 bits não são dobrados (o C não os representaria)
+LIMITE_INTEIRO = 2 ** 63
+
+def potencia(base, expoente):
+    """
+    '**' do Python, sem calcular inteiros gigantes (ex.: 10 ** 10 ** 9): o que não
+    caberia em 64 bits nem é calculado. Resultados complexos (base negativa com
+    expoente fracionário) também não são dobrados, nem inteiro ** inteiro negativo:
+    com o expoente vindo de uma variável o nó é inteiro, e no programa sem
+    otimizações isso é um erro em tempo de execução (py_pot_i).
+    """
+    if isinstance(base, int) and isinstance(expoente, int) and expoente < 0:
+        raise ArithmeticError("expoente negativo entre inteiros")
+    if isinstance(base, int) and isinstance(expoente, int) and expoente > 0 and abs(base) > 1:
+        if (abs(base).bit_length() - 1) * expoente >= 64:
+            raise OverflowError("potência grande demais")
+    resultado = base ** expoente
+    if isinstance(resultado, complex):
+        raise ArithmeticError("resultado complexo")
+    return resultado
+
+# As operações seguem a semântica do Python, que é a linguagem de origem
+OPERACOES = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '%': operator.mod,
+    '//': operator.floordiv,
+    '**': potencia,
+    '<': operator.lt,
+    '>': operator.gt,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<=': operator.le,
+    '>=': operator.ge,
+    # and/or devolvem um dos operandos, como no Python
+    '&&': lambda a, b: a and b,
+    '||': lambda a, b: a or b,
+}
+
+OPERACOES_UNARIAS = {
+    '-': operator.neg,
+    '+': operator.pos,
+    '!': operator.not_,
+}
+
+def valor_literal(node):
+    """Valor Python de um NumberNode, ou None se não for um número real (ex.: '2j')."""
+    texto = node.value
+    try:
+        return int(texto, 0)
+    except ValueError:
+        pass
+    try:
+        return float(texto)
+    except ValueError:
+        return None
+
+def representavel(valor):
+    if isinstance(valor, bool):
+        return True
+    if isinstance(valor, int):
+        return -LIMITE_INTEIRO <= valor < LIMITE_INTEIRO
+    return math.isfinite(valor)
+
+def literal_c(valor, tipo):
+    """Texto do literal C para `valor`, no formato do tipo C correspondente a `tipo`."""
+    if tipo == TIPO_BOOL:
+        return '1' if valor else '0'
+    if tipo == TIPO_NUMERO:
+        # Variáveis reais são double: o literal também precisa ser (ex.: ao passar para printf)
+        return repr(float(valor))
+    if valor == -LIMITE_INTEIRO:
+        # 9223372036854775808 não cabe em um long: o literal negado estouraria
+        return f"({-LIMITE_INTEIRO + 1}L - 1)"
+    return str(int(valor))
+
+def novo_numero(valor, tipo, origem):
+    """NumberNode sintetizado para `valor`, na posição do nó `origem`."""
+    node = NumberNode((TokenKind.NUMERO, literal_c(valor, tipo), origem.line, origem.col))
+    node.tipo = tipo
+    return node
+
+class PropagadorDeConstantes(NodeVisitor):
+    """
+    Dobra expressões numéricas e comparações com operandos constantes, propaga os
+    valores constantes de atribuições em código linear, resolve ifs cuja condição
+    é constante e remove laços que nunca executam. Os visitantes devolvem o nó substituto (ou uma lista de comandos,
+    quando um if é trocado pelo conteúdo do ramo escolhido).
+    """
+    def __init__(self):
+        self.constantes = {}  # variável -> valor conhecido naquele ponto do programa
+        self.estatisticas = {
+            'expressões dobradas': 0,
+            'constantes propagadas': 0,
+            'ifs resolvidos': 0,
+            'laços sem iterações removidos': 0,
+        }
+
+    def otimizar(self, ast):
+        return self.visit(ast)
+
+    def generic_visit(self, node):
+        return node
+
+    # --- Comandos ---
+
+    def visit_ProgramNode(self, node):
+        novos = []
+        for statement in node.statements:
+            resultado = yield statement
+            if isinstance(resultado, list):
+                novos.extend(resultado)
+            elif resultado is not None:
+                novos.append(resultado)
+        node.statements = novos
+        return node
+
+    def visit_AssignmentNode(self, node):
+        node.expression = yield node.expression
+        nome = node.variable.name
+        valor = valor_literal(node.expression) if isinstance(node.expression, NumberNode) else None
+        if valor is not None:
+            self.constantes[nome] = valor
+        else:
+            self.constantes.pop(nome, None)
+        return node
+
+    def visit_IfNode(self, node):
+        node.condition = yield node.condition
+        if isinstance(node.condition, NumberNode):
+            valor = valor_literal(node.condition)
+            if valor is not None:
+                self.estatisticas['ifs resolvidos'] += 1
+                bloco = node.if_block if valor else node.else_block
+                if bloco is None:
+                    return []
+                bloco = yield bloco
+                return bloco.statements
+
+        antes = dict(self.constantes)
+        node.if_block = yield node.if_block
+        depois_if = self.constantes
+        self.constantes = antes
+        if node.else_block:
+            node.else_block = yield node.else_block
+        depois_else = self.constantes
+        # Depois do if só continuam conhecidas as constantes iguais nos dois caminhos
+        self.constantes = {
+            nome: valor for nome, valor in depois_if.items()
+            if nome in depois_else and type(depois_else[nome]) is type(valor) and depois_else[nome] == valor
+        }
+        return node
+
+    def visit_ForNode(self, node):
+        # O corpo pode executar várias vezes (ou nenhuma): tudo o que ele escreve
+        # deixa de ser constante tanto na entrada do corpo quanto depois do laço.
+        escritas = variaveis_atribuidas(node.body)
+        escritas.add(node.iterator_var.name)
+        for nome in escritas:
+            self.constantes.pop(nome, None)
+        node.body = yield node.body
+        for nome in escritas:
+            self.constantes.pop(nome, None)
+        return node
+
+    def visit_ForRangeNode(self, node):
+        # Os argumentos são avaliados uma vez, antes da primeira iteração
+        node.start = yield node.start
+        node.stop = yield node.stop
+        node.step = yield node.step
+        if isinstance(node.start, NumberNode) and isinstance(node.stop, NumberNode):
+            inicio = valor_literal(node.start)
+            fim = valor_literal(node.stop)
+            passo = inteiro_literal(node.step)
+            if inicio is not None and fim is not None and passo and not range(inicio, fim, passo):
+                self.estatisticas['laços sem iterações removidos'] += 1
+                return []
+        escritas = variaveis_atribuidas(node)
+        for nome in escritas:
+            self.constantes.pop(nome, None)
+        node.body = yield node.body
+        for nome in escritas:
+            self.constantes.pop(nome, None)
+        return node
+
+    def visit_WhileNode(self, node):
+        # A condição é avaliada de novo depois de cada iteração: o que o corpo
+        # escreve também não é constante nela
+        escritas = variaveis_atribuidas(node.body)
+        for nome in escritas:
+            self.constantes.pop(nome, None)
+        node.condition = yield node.condition
+        if isinstance(node.condition, NumberNode) and valor_literal(node.condition) == 0:
+            self.estatisticas['laços sem iterações removidos'] += 1
+            return []
+        node.body = yield node.body
+        for nome in escritas:
+            self.constantes.pop(nome, None)
+        return node
+
+    def visit_AppendNode(self, node):
+        node.value = yield node.value
+        return node
+
+    def visit_PrintNode(self, node):
+        for i, arg in enumerate(node.args):
+            node.args[i] = yield arg
+        return node
+
+    def visit_FunctionDefNode(self, node):
+        # O corpo roda a cada chamada, quando as globais podem valer outra coisa:
+        # começa sem nenhuma constante conhecida. As funções não escrevem em globais,
+        # então as constantes do nível superior continuam valendo depois das chamadas.
+        externas = self.constantes
+        self.constantes = {}
+        node.body = yield node.body
+        self.constantes = externas
+        return node
+
+    def visit_ReturnNode(self, node):
+        if node.expression is not None:
+            node.expression = yield node.expression
+        return node
+
+    def visit_ExpressionStatementNode(self, node):
+        node.expression = yield node.expression
+        return node
+
+    # --- Expressões ---
+
+    def visit_BinOpNode(self, node):
+        node.left = yield node.left
+        node.right = yield node.right
+        if isinstance(node.left, NumberNode) and isinstance(node.right, NumberNode):
+            esquerda = valor_literal(node.left)
+            direita = valor_literal(node.right)
+            operacao = OPERACOES.get(node.op)
+            if esquerda is not None and direita is not None and operacao is not None:
+                try:
+                    resultado = operacao(esquerda, direita)
+                except ArithmeticError:
+                    # Fica para o tempo de execução, como no programa original
+                    return node
+                if representavel(resultado):
+                    self.estatisticas['expressões dobradas'] += 1
+                    return novo_numero(resultado, node.tipo, node)
+        elif node.op in ('&&', '||') and isinstance(node.left, NumberNode):
+            # Com a esquerda constante, o and/or já sabe qual operando é o resultado
+            esquerda = valor_literal(node.left)
+            if esquerda is not None:
+                if bool(esquerda) == (node.op == '||'):
+                    self.estatisticas['expressões dobradas'] += 1
+                    return novo_numero(esquerda, node.tipo, node)
+                if node.right.tipo == node.tipo:
+                    self.estatisticas['expressões dobradas'] += 1
+                    return node.right
+        return node
+
+    def visit_UnaryOpNode(self, node):
+        node.operand = yield node.operand
+        if isinstance(node.operand, NumberNode):
+            valor = valor_literal(node.operand)
+            if valor is not None:
+                resultado = OPERACOES_UNARIAS[node.op](valor)
+                if representavel(resultado):
+                    self.estatisticas['expressões dobradas'] += 1
+                    return novo_numero(resultado, node.tipo, node)
+        return node
+
+    def visit_VariableNode(self, node):
+        if node.name in self.constantes and node.tipo in (TIPO_INTEIRO, TIPO_NUMERO, TIPO_BOOL):
+            self.estatisticas['constantes propagadas'] += 1
+            return novo_numero(self.constantes[node.name], node.tipo, node)
+        return node
+
+    def visit_IndexNode(self, node):
+        node.index = yield node.index
+        return node
+
+    def visit_CallNode(self, node):
+        for i, arg in enumerate(node.args):
+            node.args[i] = yield arg
+        return node
+
+    def visit_ListNode(self, node):
+        for i, elemento in enumerate(node.elements):
+            node.elements[i] = yield elemento
+        return node
@@ -0,0 +1,230 @@
+# dead_code.py
+
+from ast_nodes import *
+from ast_visitor import percorrer
+from constant_folding import valor_literal
+from redundancy_elimination import divisao_segura
+
+NOS_PUROS = (BinOpNode, UnaryOpNode, VariableNode, NumberNode, StringNode, ListNode, LenNode)
+
+def variaveis_lidas(raiz):
+    return {node.name for node in percorrer(raiz) if isinstance(node, VariableNode)}
+
+def expressao_pura(raiz):
+    """Verdadeiro se avaliar a expressão não tem efeito observável além do valor."""
+    for node in percorrer(raiz):
+        if not isinstance(node, NOS_PUROS):
+            return False
+        if isinstance(node, BinOpNode) and not divisao_segura(node):
+            return False
+    return True
+
+class EliminadorDeCodigoMorto:
+    """
+    Remove código sem efeito a partir de uma análise de vivacidade feita de trás
+    para frente: atribuições cujo valor nunca é lido, ramos de ifs com condição
+    constante, laços sobre listas sempre vazias e ifs/laços que ficaram sem corpo.
+    No fim, tira da tabela de símbolos as variáveis que não aparecem mais.
+    """
+    def __init__(self, tabela_de_simbolos):
+        self.tabela_de_simbolos = tabela_de_simbolos
+        self.estatisticas = {
+            'atribuições mortas removidas': 0,
+            'ramos inalcançáveis removidos': 0,
+            'laços sobre listas vazias removidos': 0,
+            'comandos vazios removidos': 0,
+            'variáveis não usadas removidas': 0,
+        }
+        self._listas_vazias = set()
+        self._globais_das_funcoes = frozenset()
+
+    def otimizar(self, ast):
+        self._listas_vazias = self._variaveis_sempre_vazias(ast)
+        # Uma chamada lê as globais que as funções leem (a que é chamada ou as que ela chama)
+        globais = set()
+        for funcao in self.tabela_de_simbolos.funcoes.values():
+            globais |= variaveis_lidas(funcao.node.body) - funcao.nomes_locais
+        self._globais_das_funcoes = frozenset(globais)
+        # Depois do fim do programa nenhuma variável é lida
+        ast.statements, _ = self._bloco(ast.statements, frozenset(), True)
+        self._podar_simbolos(ast)
+        return ast
+
+    def _variaveis_sempre_vazias(self, ast):
+        """Variáveis que só recebem a lista literal vazia e nunca crescem: laços sobre elas nunca executam."""
+        vazias, outras = set(), set()
+        for node in percorrer(ast):
+            if isinstance(node, AppendNode):
+                outras.add(node.list_var.name)
+            elif isinstance(node, AssignmentNode):
+                expressao = node.expression
+                if isinstance(expressao, ListNode) and not expressao.elements:
+                    vazias.add(node.variable.name)
+                elif isinstance(expressao, VariableNode):
+                    # As duas variáveis veem a mesma lista: um append em uma aparece na outra
+                    outras.update((node.variable.name, expressao.name))
+                else:
+                    outras.add(node.variable.name)
+        return vazias - outras
+
+    def _bloco(self, statements, vivas, remover):
+        """
+        Processa os comandos de trás para frente a partir das variáveis vivas na
+        saída do bloco. Retorna (comandos mantidos, variáveis vivas na entrada).
+        Com `remover` falso apenas calcula a vivacidade, sem alterar a AST.
+        """
+        mantidos = []
+        for statement in reversed(statements):
+            resultado, vivas = self._comando(statement, vivas, remover)
+            mantidos.extend(reversed(resultado))
+        mantidos.reverse()
+        return mantidos, vivas
+
+    def _lidas(self, raiz):
+        """Variáveis lidas ao avaliar a expressão, incluindo as globais lidas nas chamadas."""
+        lidas = set()
+        chama = False
+        for node in percorrer(raiz):
+            if isinstance(node, VariableNode):
+                lidas.add(node.name)
+            elif isinstance(node, CallNode):
+                chama = True
+        if chama:
+            lidas |= self._globais_das_funcoes
+        return lidas
+
+    def _contar(self, chave, remover):
+        if remover:
+            self.estatisticas[chave] += 1
+
+    def _comando(self, statement, vivas, remover):
+        if isinstance(statement, AssignmentNode):
+            nome = statement.variable.name
+            if nome not in vivas and expressao_pura(statement.expression):
+                self._contar('atribuições mortas removidas', remover)
+                return [], vivas
+            return [statement], (vivas - {nome}) | self._lidas(statement.expression)
+
+        if isinstance(statement, PrintNode):
+            lidas = set()
+            for arg in statement.args:
+                lidas |= self._lidas(arg)
+            return [statement], vivas | lidas
+
+        if isinstance(statement, ExpressionStatementNode):
+            return [statement], vivas | self._lidas(statement.expression)
+
+        if isinstance(statement, AppendNode):
+            return [statement], vivas | self._lidas(statement)
+
+        if isinstance(statement, ReturnNode):
+            # Nada depois do return é executado
+            if statement.expression is None:
+                return [statement], frozenset()
+            return [statement], self._lidas(statement.expression)
+
+        if isinstance(statement, FunctionDefNode):
+            # No fim do corpo nenhuma variável local é lida
+            statement.body.statements, _ = self._bloco(statement.body.statements, frozenset(), remover)
+            return [statement], vivas
+
+        if isinstance(statement, IfNode):
+            return self._if(statement, vivas, remover)
+
+        if isinstance(statement, ForNode):
+            return self._for(statement, vivas, remover)
+
+        if isinstance(statement, ForRangeNode):
+            return self._for_range(statement, vivas, remover)
+
+        if isinstance(statement, WhileNode):
+            return self._while(statement, vivas, remover)
+
+        return [statement], vivas
+
+    def _if(self, node, vivas, remover):
+        if isinstance(node.condition, NumberNode):
+            valor = valor_literal(node.condition)
+            if valor is not None:
+                self._contar('ramos inalcançáveis removidos', remover)
+                bloco = node.if_block if valor else node.else_block
+                if bloco is None:
+                    return [], vivas
+                return self._bloco(bloco.statements, vivas, remover)
+
+        mantidos_if, vivas_if = self._bloco(node.if_block.statements, vivas, remover)
+        mantidos_else, vivas_else = [], vivas
+        if node.else_block:
+            mantidos_else, vivas_else = self._bloco(node.else_block.statements, vivas, remover)
+        if remover:
+            node.if_block.statements = mantidos_if
+            if node.else_block and not mantidos_else:
+                node.else_block = None
+            elif node.else_block:
+                node.else_block.statements = mantidos_else
+            if not mantidos_if and not mantidos_else and expressao_pura(node.condition):
+                self._contar('comandos vazios removidos', remover)
+                return [], vivas
+        return [node], vivas_if | vivas_else | self._lidas(node.condition)
+
+    def _for(self, node, vivas, remover):
+        iterador = node.iterator_var.name
+        if node.iterable_var.name in self._listas_vazias:
+            self._contar('laços sobre listas vazias removidos', remover)
+            return [], vivas
+
+        cabeca = self._cabeca_do_laco(node, vivas | {node.iterable_var.name}, iterador)
+        mantidos, _ = self._bloco(node.body.statements, cabeca, remover)
+        if remover:
+            node.body.statements = mantidos
+            # Sem corpo, o laço só escreveria o iterador
+            if not mantidos and iterador not in vivas:
+                self._contar('comandos vazios removidos', remover)
+                return [], vivas
+        return [node], cabeca
+
+    def _cabeca_do_laco(self, node, base, iterador=None):
+        """
+        Variáveis vivas no início de cada iteração: `base` (o que é lido depois do
+        laço e a cada teste) mais o que o corpo lê antes de escrever; repete até estabilizar.
+        """
+        cabeca = base
+        while True:
+            _, entrada_corpo = self._bloco(node.body.statements, cabeca, False)
+            nova = base | (entrada_corpo - {iterador})
+            if nova == cabeca:
+                return cabeca
+            cabeca = nova
+
+    def _for_range(self, node, vivas, remover):
+        iterador = node.iterator_var.name
+        cabeca = self._cabeca_do_laco(node, vivas, iterador)
+        mantidos, _ = self._bloco(node.body.statements, cabeca, remover)
+        limites = (node.start, node.stop, node.step)
+        if remover:
+            node.body.statements = mantidos
+            if not mantidos and iterador not in vivas and all(expressao_pura(e) for e in limites):
+                self._contar('comandos vazios removidos', remover)
+                return [], vivas
+        # Os argumentos de range() são lidos uma vez, antes do laço
+        return [node], cabeca.union(*(self._lidas(e) for e in limites))
+
+    def _while(self, node, vivas, remover):
+        # Um while que ficou sem corpo é mantido: ele pode nunca terminar
+        cabeca = self._cabeca_do_laco(node, vivas | self._lidas(node.condition))
+        mantidos, _ = self._bloco(node.body.statements, cabeca, remover)
+        if remover:
+            node.body.statements = mantidos
+        return [node], cabeca
+
+    def _podar_simbolos(self, ast):
+        usadas = variaveis_lidas(ast)
+        simbolos = self.tabela_de_simbolos.simbolos
+        for nome in [nome for nome in simbolos if nome not in usadas]:
+            del simbolos[nome]
+            self.estatisticas['variáveis não usadas removidas'] += 1
+        for funcao in self.tabela_de_simbolos.funcoes.values():
+            usadas = variaveis_lidas(funcao.node.body)
+            for nome in [nome for nome in funcao.locais if nome not in usadas and nome not in funcao.parametros]:
+                del funcao.locais[nome]
+                self.estatisticas['variáveis não usadas removidas'] += 1
@@ -1,31 +1,89 @@
 #include <stdio.h>
 #include <stdbool.h>
+#include <stdlib.h>
+#include <string.h>
+
+typedef struct py_vetor {
+    union { long *i; double *f; } dados;
+    long tamanho, capacidade, referencias;
+    struct py_vetor *proximo;
+} py_vetor;
+
+static void py_vetor_liberar(py_vetor *v) {
+    while (v != NULL) {
+        py_vetor *proximo = v->proximo;
+        free(v->dados.i);
+        free(v);
+        v = proximo;
+    }
+}
+
+static void py_sem_memoria(void) {
+    fputs("MemoryError\n", stderr);
+    exit(1);
+}
+
+static py_vetor *py_vetor_novo_f(py_vetor **dono, const double *dados, long tamanho) {
+    py_vetor *v = malloc(sizeof *v);
+    long capacidade = tamanho > 8 ? tamanho : 8;
+    if (v == NULL || (v->dados.f = malloc((size_t)capacidade * sizeof *v->dados.f)) == NULL) py_sem_memoria();
+    if (tamanho > 0) memcpy(v->dados.f, dados, (size_t)tamanho * sizeof *v->dados.f);
+    v->tamanho = tamanho;
+    v->capacidade = capacidade;
+    v->referencias = 1;
+    v->proximo = dono != NULL ? *dono : NULL;
+    if (dono != NULL) *dono = v;
+    return v;
+}
+
+static py_vetor *py_vetor_refazer_f(py_vetor *v, py_vetor **dono, const double *dados, long tamanho) {
+    if (v == NULL || v->referencias > 1) {
+        if (v != NULL) v->referencias--;
+        return py_vetor_novo_f(dono, dados, tamanho);
+    }
+    if (tamanho > v->capacidade) {
+        double *novos = realloc(v->dados.f, (size_t)tamanho * sizeof *novos);
+        if (novos == NULL) py_sem_memoria();
+        v->dados.f = novos;
+        v->capacidade = tamanho;
+    }
+    if (tamanho > 0) memcpy(v->dados.f, dados, (size_t)tamanho * sizeof *v->dados.f);
+    v->tamanho = tamanho;
+    return v;
+}
 
 int main() {
-    double a;
+    long a;
     double b;
     double item;
+    py_vetor *numeros = NULL;
     double soma;
+    py_vetor *py_vetores = NULL;
 
-    a = (5 + (3 * 2));
-    b = ((a + 1) / 3);
-    printf("%s %f\n", "O valor de a e:", a);
-    printf("%s %f\n", "O valor de b e:", b);
+    a = (5L + (3L * 2));
+    b = ((double)(a + 1) / 3);
+    printf("O valor de a e: %ld\n", a);
+    printf("O valor de b e: %f\n", b);
     if ((b > 3)) {
-        printf("%s\n", "b e maior que 3");
+        puts("b e maior que 3");
     } else {
-        printf("%s\n", "b nao e maior que 3");
+        puts("b nao e maior que 3");
     }
-    printf("%s\n", "--- Contagem ---");
-    double numeros[] = {10.5, 20.2, 30.8, 40.1};
+    puts("--- Contagem ---");
+    numeros = py_vetor_refazer_f(numeros, &py_vetores, (double[]){10.5, 20.2, 30.8, 40.1}, 4);
     soma = 0;
-    int size_numeros = sizeof(numeros) / sizeof(numeros[0]);
-    for (int i = 0; i < size_numeros; i++) {
-        item = numeros[i];
-        printf("%s %f\n", "Item atual:", item);
-        soma = (soma + item);
+    {
+        py_vetor *_it0 = numeros;
+        _it0->referencias++;
+        for (long _i0 = 0; _i0 < _it0->tamanho; _i0++) {
+            item = _it0->dados.f[_i0];
+            printf("Item atual: %f\n", item);
+            soma = (soma + item);
+        }
+        _it0->referencias--;
     }
-    printf("%s %f\n", "A soma dos itens e:", soma);
+    printf("A soma dos itens e: %f\n", soma);
 
+    py_vetor_liberar(py_vetores);
     return 0;
-}
\ No newline at end of file
+}
@@ -0,0 +1,141 @@
+# loop_parallelism.py
+#
+# Análise de dependências dos laços for, usada pelo gerador de código com a opção
+# `paralelo` (main.py --parallel). Um laço pode ter as iterações divididas entre
+# threads (e entre as pistas SIMD) quando nenhuma iteração depende de outra: o corpo
+# só faz atribuições a variáveis escalares, com expressões sem efeitos colaterais,
+# e cada variável atribuída é
+#   - uma redução: `s = s + e`, `s = s - e`, `s = s * e` (ou `e + s`, `e * s`), ou o
+#     máximo/mínimo `if e > m: m = e` (`<` para o mínimo), sem nenhum outro uso de
+#     `s` ou `m` no corpo;
+#   - ou privada: escrita antes de qualquer leitura em cada iteração (o iterador, os
+#     temporários). Ao final, ela fica com o valor da última iteração, como no Python.
+
+from ast_nodes import *
+from ast_visitor import percorrer
+from redundancy_elimination import NumeradorDeValores
+from semantic_analyzer import TIPO_INTEIRO, TIPO_NUMERO, TIPO_BOOL
+
+# Nós que podem aparecer nas expressões do corpo (IndexNode só lê: o corpo não altera listas)
+NOS_PERMITIDOS = (BinOpNode, UnaryOpNode, VariableNode, NumberNode, LenNode, IndexNode)
+TIPOS_PRIVADOS = frozenset({TIPO_INTEIRO, TIPO_NUMERO, TIPO_BOOL})
+TIPOS_DE_REDUCAO = frozenset({TIPO_INTEIRO, TIPO_NUMERO})
+
+# Operador da atribuição -> operador da redução do OpenMP. Na subtração as cópias
+# privadas começam em 0 e acumulam os termos negados: a combinação é uma soma.
+REDUCOES_ARITMETICAS = {'+': '+', '-': '+', '*': '*'}
+OPERADORES_COMUTATIVOS = frozenset({'+', '*'})
+# Comparação `e OP m` do if -> redução; com `m OP e` vale a comparação espelhada
+REDUCOES_DE_COMPARACAO = {'>': 'max', '>=': 'max', '<': 'min', '<=': 'min'}
+ESPELHADAS = {'>': '<', '>=': '<=', '<': '>', '<=': '>='}
+
+class LacoParalelo:
+    """Resultado da análise: reduções como (operador do OpenMP, variável) e as variáveis privadas."""
+    __slots__ = ('reducoes', 'privadas')
+
+    def __init__(self, reducoes, privadas):
+        self.reducoes = reducoes
+        self.privadas = privadas
+
+def expressao_permitida(raiz):
+    return all(isinstance(node, NOS_PERMITIDOS) for node in percorrer(raiz))
+
+def lidas(raiz):
+    return [node.name for node in percorrer(raiz) if isinstance(node, VariableNode)]
+
+def mesma_expressao(a, b):
+    """Verdadeiro se as duas expressões são estruturalmente iguais (sem atribuições entre elas)."""
+    numerador = NumeradorDeValores()
+    numerador.numerar(a)
+    numerador.numerar(b)
+    return numerador.numero(a) == numerador.numero(b)
+
+def reducao_aritmetica(statement):
+    """(operador do OpenMP, termo) se a atribuição é `s = s OP termo` (ou `termo OP s`), ou None."""
+    nome = statement.variable.name
+    expressao = statement.expression
+    if not isinstance(expressao, BinOpNode) or expressao.op not in REDUCOES_ARITMETICAS:
+        return None
+    if isinstance(expressao.left, VariableNode) and expressao.left.name == nome:
+        termo = expressao.right
+    elif (expressao.op in OPERADORES_COMUTATIVOS
+          and isinstance(expressao.right, VariableNode) and expressao.right.name == nome):
+        termo = expressao.left
+    else:
+        return None
+    return REDUCOES_ARITMETICAS[expressao.op], termo
+
+def reducao_de_comparacao(statement):
+    """(operador do OpenMP, variável, termo) se o if é `if termo > m: m = termo` (ou min), ou None."""
+    condicao = statement.condition
+    comandos = statement.if_block.statements
+    if (statement.else_block or len(comandos) != 1 or not isinstance(comandos[0], AssignmentNode)
+            or not isinstance(condicao, BinOpNode) or condicao.op not in REDUCOES_DE_COMPARACAO):
+        return None
+    atribuicao = comandos[0]
+    nome = atribuicao.variable.name
+    op, termo, variavel = condicao.op, condicao.left, condicao.right
+    if isinstance(termo, VariableNode) and termo.name == nome:
+        op, termo, variavel = ESPELHADAS[op], variavel, termo
+    if not (isinstance(variavel, VariableNode) and variavel.name == nome):
+        return None
+    if not mesma_expressao(termo, atribuicao.expression):
+        return None
+    return REDUCOES_DE_COMPARACAO[op], nome, termo
+
+def analisar_laco(node, tabela_de_simbolos):
+    """LacoParalelo se as iterações do for `node` são independentes, ou None."""
+    if not isinstance(node, (ForNode, ForRangeNode)):
+        return None
+
+    def tipo(nome):
+        return tabela_de_simbolos.consultar(nome)['tipo']
+
+    iterador = node.iterator_var.name
+    if tipo(iterador) not in TIPOS_PRIVADOS:
+        return None
+    # Cada comando do corpo vira (variável escrita, (operador, termo) se tem a forma
+    # de uma redução, expressões avaliadas)
+    comandos = []
+    for statement in node.body.statements:
+        if isinstance(statement, AssignmentNode):
+            comandos.append((statement.variable.name, reducao_aritmetica(statement), [statement.expression]))
+        elif isinstance(statement, IfNode):
+            reducao = reducao_de_comparacao(statement)
+            if reducao is None:
+                return None
+            operador, nome, termo = reducao
+            atribuicao = statement.if_block.statements[0]
+            comandos.append((nome, (operador, termo), [statement.condition, atribuicao.expression]))
+        else:
+            return None
+
+    escritas = {nome for nome, _, _ in comandos} | {iterador}
+    reducoes = {}
+    definidas = {iterador}
+    for nome, reducao, expressoes in comandos:
+        if not all(expressao_permitida(e) for e in expressoes):
+            return None
+        if reducao is not None and nome not in definidas:
+            # Só o termo é lido: a própria variável é a cópia privada da redução
+            operador, termo = reducao
+            expressoes = [termo]
+        else:
+            # Um `t = t + 1` depois de `t = ...` é uma atribuição comum a uma privada
+            operador = None
+        # Uma leitura antes da escrita na mesma iteração veria o valor da iteração anterior
+        if any(lido in escritas and lido not in definidas for e in expressoes for lido in lidas(e)):
+            return None
+        if nome in reducoes:
+            return None
+        if operador is None:
+            if tipo(nome) not in TIPOS_PRIVADOS:
+                return None
+            definidas.add(nome)
+        else:
+            if tipo(nome) not in TIPOS_DE_REDUCAO:
+                return None
+            reducoes[nome] = operador
+
+    privadas = sorted(definidas)
+    return LacoParalelo(sorted((operador, nome) for nome, operador in reducoes.items()), privadas)
@@ -1,62 +1,520 @@
 import sys
+import os
+import glob
+import argparse
+import cProfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 from py_to_c_lexer import PythonToCLexer
 from py_to_c_parser import Parser
 from semantic_analyzer import AnalisadorSemantico, SemanticError
 from code_generator import CodeGenerator
+from optimizer import otimizar, formatar_relatorio, NIVEL_MAXIMO
+from compile_cache import CompileCache, DIRETORIO_PADRAO, TAMANHO_MAXIMO_PADRAO, obter_cache
+from compile_stats import EstatisticasDeCompilacao, contar_nos, sem_medicao
+from compile_api import analisar, compile_source
+from compile_incremental import CompiladorIncremental
+from native_build import (
+    ConfiguracaoNativa, ErroDeCompilacaoNativa, PERFIS, PERFIL_PADRAO, SUBDIRETORIO_DE_OBJETOS,
+    CacheDeObjetos, caminho_executavel, construir, localizar_compilador,
+)
 
-def main():
-    if len(sys.argv) < 2:
-        print("Uso: python main.py <arquivo.py>")
-        sys.exit(1)
+# Intervalo, em segundos, entre as verificações do arquivo no modo --watch
+INTERVALO_DE_OBSERVACAO = 0.2
 
-    input_file = sys.argv[1]
+def caminho_saida(input_file):
+    """Caminho do arquivo .c gerado ao lado do arquivo de entrada."""
+    return os.path.splitext(input_file)[0] + '.c'
 
+def traduzir_para_arquivo(code, output_file, opcoes, cache=None):
+    """
+    Consulta o cache e, em caso de falha, traduz escrevendo o C direto em `output_file`
+    pelo emissor, sem montar o programa inteiro em memória. Retorna acerto_no_cache.
+    """
+    chave = cache.chave(code, opcoes) if cache else None
+    if cache and cache.copiar_para(chave, output_file):
+        return True
+    ast_tree, tabela_de_simbolos, _ = analisar(code, opcoes)
+    try:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            CodeGenerator(tabela_de_simbolos, opcoes).generate_to(ast_tree, f)
+    except BaseException:
+        # Não deixa um .c incompleto para trás
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        raise
+    if cache:
+        cache.guardar_arquivo(chave, output_file)
+    return False
+
+def compilar_arquivo(input_file, opcoes, config_cache=None):
+    """
+    Compila um único arquivo sem imprimir nada (usado pelos workers do modo em lote).
+    Retorna (arquivo, arquivo_saida, mensagem_de_erro, acerto_no_cache); a mensagem é
+    None em caso de sucesso.
+    """
+    output_file = caminho_saida(input_file)
+    try:
+        with open(input_file, 'r', encoding='utf-8') as f:
+            code = f.read()
+        acerto = traduzir_para_arquivo(code, output_file, opcoes, obter_cache(config_cache))
+        return input_file, output_file, None, acerto
+    except (SyntaxError, SemanticError) as e:
+        return input_file, output_file, f"ERRO DE COMPILAÇÃO: {e}", False
+    except OSError as e:
+        return input_file, output_file, f"Erro de E/S: {e}", False
+    except Exception as e:
+        return input_file, output_file, f"Ocorreu um erro inesperado: {e}", False
+
+def construir_arquivo(input_file, opcoes, config_cache, config_nativa):
+    """
+    Tradução e compilação nativa de um arquivo (worker do modo --build). Retorna
+    (arquivo, executável, mensagem_de_erro, acerto_no_cache, segundos_da_traducao, construcao),
+    onde construcao é (segundos_da_compilacao_nativa, objeto_em_cache), ou None em caso de erro.
+    """
+    inicio = time.perf_counter()
+    _, output_file, erro, acerto = compilar_arquivo(input_file, opcoes, config_cache)
+    traducao = time.perf_counter() - inicio
+    executavel = caminho_executavel(input_file)
+    if erro is not None:
+        return input_file, executavel, erro, acerto, traducao, None
+    try:
+        construcao = construir(output_file, executavel, config_nativa)
+    except ErroDeCompilacaoNativa as e:
+        return input_file, executavel, f"ERRO DO COMPILADOR C: {e}", acerto, traducao, None
+    except OSError as e:
+        return input_file, executavel, f"Erro de E/S: {e}", acerto, traducao, None
+    return input_file, executavel, None, acerto, traducao, construcao
+
+def eh_padrao_glob(entrada):
+    return any(c in entrada for c in '*?[')
+
+def resolver_entradas(entradas):
+    """Expande arquivos, diretórios (recursivamente) e globs em uma lista de arquivos .py sem repetições."""
+    arquivos = []
+    vistos = set()
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            candidatos = sorted(glob.glob(os.path.join(entrada, '**', '*.py'), recursive=True))
+        elif eh_padrao_glob(entrada):
+            candidatos = sorted(c for c in glob.glob(entrada, recursive=True) if os.path.isfile(c))
+        else:
+            candidatos = [entrada]
+        for arquivo in candidatos:
+            chave = os.path.normpath(arquivo)
+            if chave not in vistos:
+                vistos.add(chave)
+                arquivos.append(arquivo)
+    return arquivos
+
+@contextmanager
+def executar_em_pool(tarefa, arquivos, jobs):
+    """Aplica `tarefa` a cada arquivo em um pool de processos (ou neste processo, com -j 1), na ordem."""
+    if jobs <= 1 or len(arquivos) == 1:
+        yield map(tarefa, arquivos)
+        return
+    executor = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        # Lotes maiores reduzem o custo de comunicação entre processos em builds com milhares de arquivos
+        chunksize = max(1, len(arquivos) // (jobs * 4))
+        yield executor.map(tarefa, arquivos, chunksize=chunksize)
+    finally:
+        executor.shutdown()
+
+def compilar_em_lote(arquivos, jobs, opcoes, config_cache=None):
+    """Compila vários arquivos em um pool de processos e imprime um resumo por arquivo."""
+    tarefa = partial(compilar_arquivo, opcoes=opcoes, config_cache=config_cache)
+    falhas = 0
+    acertos = 0
+    with executar_em_pool(tarefa, arquivos, jobs) as resultados:
+        for input_file, output_file, erro, acerto in resultados:
+            if erro is None:
+                acertos += acerto
+                marca = " (cache)" if acerto else ""
+                print(f" [OK]   {input_file} -> {output_file}{marca}")
+            else:
+                falhas += 1
+                print(f" [ERRO] {input_file}: {erro}")
+
+    print("=" * 70)
+    print(f" {len(arquivos) - falhas} arquivo(s) compilado(s) com sucesso, {falhas} com erro.")
+    if config_cache is not None:
+        # Os contadores vivem nos workers; o acerto de cada arquivo volta junto com o resultado
+        print(f" Cache: {acertos} acerto(s), {len(arquivos) - acertos} falha(s).")
+        obter_cache(config_cache).aplicar_limite()
+    return 1 if falhas else 0
+
+def construir_em_lote(arquivos, jobs, opcoes, config_cache, config_nativa):
+    """
+    Modo --build: traduz e compila cada arquivo até o executável no pool de processos
+    e informa, por arquivo e no total, o tempo da tradução e o da compilação nativa.
+    """
+    tarefa = partial(construir_arquivo, opcoes=opcoes, config_cache=config_cache, config_nativa=config_nativa)
+    inicio = time.perf_counter()
+    falhas = 0
+    acertos = 0
+    objetos_em_cache = 0
+    traducao_total = 0.0
+    nativa_total = 0.0
+    with executar_em_pool(tarefa, arquivos, jobs) as resultados:
+        for input_file, executavel, erro, acerto, traducao, construcao in resultados:
+            traducao_total += traducao
+            if erro is not None:
+                falhas += 1
+                print(f" [ERRO] {input_file}: {erro}")
+                continue
+            nativa, objeto_em_cache = construcao
+            nativa_total += nativa
+            acertos += acerto
+            objetos_em_cache += objeto_em_cache
+            marcas = "".join(marca for marca, usada in ((", C do cache", acerto), (", objeto do cache", objeto_em_cache))
+                             if usada)
+            print(f" [OK]   {input_file} -> {executavel} "
+                  f"(tradução {traducao * 1000:.1f} ms, {config_nativa.compilador[0]} {nativa * 1000:.1f} ms{marcas})")
+    decorrido = time.perf_counter() - inicio
+
+    print("=" * 70)
+    print(f" {len(arquivos) - falhas} executável(is) gerado(s) com sucesso, {falhas} com erro "
+          f"(perfil {config_nativa.perfil}: {' '.join(config_nativa.flags)}).")
+    if config_cache is not None:
+        print(f" Cache: {acertos} acerto(s) de código C, {objetos_em_cache} de objeto.")
+        obter_cache(config_cache).aplicar_limite()
+        obter_cache(config_nativa.config_cache, CacheDeObjetos).aplicar_limite()
+    # Somas por arquivo: com -j > 1 elas passam do tempo de parede
+    print(f" Tempo: tradução {traducao_total:.3f} s, compilação nativa {nativa_total:.3f} s, "
+          f"total de parede {decorrido:.3f} s.")
+    return 1 if falhas else 0
+
+def compilar_verboso(input_file, opcoes, config_cache=None, estatisticas=None):
+    """
+    Modo original de arquivo único: mostra o código de entrada, as fases e o C gerado.
+    Com `estatisticas` (EstatisticasDeCompilacao), cada fase é medida e o cache não é
+    consultado, já que um acerto pularia justamente as fases a medir.
+    """
     try:
         with open(input_file, 'r', encoding='utf-8') as f:
             code = f.read()
     except FileNotFoundError:
         print(f"Arquivo não encontrado: {input_file}")
-        sys.exit(1)
+        return 1
 
     print(f"\nANALISANDO: {input_file}\n{'=' * 70}")
     print(code.strip())
     print("=" * 70)
 
+    cache = obter_cache(config_cache)
+    chave = cache.chave(code, opcoes) if cache else None
+    c_code = cache.obter(chave) if cache and estatisticas is None else None
+    if c_code is not None:
+        print("\n Cache: código C reaproveitado (fases 1 a 4 ignoradas).")
+        return salvar_saida_verbosa(input_file, c_code)
+
+    fase = estatisticas.fase if estatisticas else sem_medicao
     try:
         # --- FASE 1: ANÁLISE LÉXICA ---
-        lexer = PythonToCLexer()
-        tokens = lexer.tokenize(code)
+        with fase('lexica') as medidas:
+            lexer = PythonToCLexer()
+            tokens = lexer.tokenize(code)
+        medidas['tokens'] = len(tokens)
         print("\n Fase 1: Análise Léxica concluída.")
 
         # --- FASE 2: ANÁLISE SINTÁTICA (parsing para AST) ---
-        parser = Parser(tokens)
-        ast_tree = parser.parse()
+        with fase('sintatica') as medidas:
+            parser = Parser(tokens)
+            ast_tree = parser.parse()
+        if estatisticas:
+            medidas['nos_ast'] = contar_nos(ast_tree)
         print(" Fase 2: Análise Sintática concluída (AST gerada).")
 
         # --- FASE 3: ANÁLISE SEMÂNTICA ---
-        semantic_analyzer = AnalisadorSemantico(ast_tree)
-        tabela_de_simbolos = semantic_analyzer.analisar()
+        with fase('semantica') as medidas:
+            semantic_analyzer = AnalisadorSemantico(ast_tree)
+            tabela_de_simbolos = semantic_analyzer.analisar()
+        medidas['simbolos'] = len(tabela_de_simbolos.simbolos)
         print(" Fase 3: Análise Semântica concluída.")
 
+        # --- OTIMIZAÇÕES (opcionais, -O) ---
+        nivel = opcoes.get('nivel_otimizacao', 0)
+        if nivel > 0:
+            with fase('otimizacao') as medidas:
+                ast_tree, relatorio = otimizar(ast_tree, tabela_de_simbolos, nivel)
+            if estatisticas:
+                medidas['nos_ast'] = contar_nos(ast_tree)
+                medidas['simbolos'] = len(tabela_de_simbolos.simbolos)
+            print(f" Otimizações -O{nivel}: {formatar_relatorio(relatorio)}.")
+
         # --- FASE 4: GERAÇÃO DE CÓDIGO ---
-        code_gen = CodeGenerator(tabela_de_simbolos)
-        c_code = code_gen.generate(ast_tree)
+        with fase('geracao') as medidas:
+            code_gen = CodeGenerator(tabela_de_simbolos, opcoes)
+            c_code = code_gen.generate(ast_tree)
+        medidas['linhas_c'] = c_code.count("\n")
         print(" Fase 4: Geração de Código C concluída.")
-        
-        print("\n CÓDIGO C FINAL GERADO:")
-        print("-" * 70)
-        print(c_code)
-        print("-" * 70)
 
-        output_file = input_file.replace('.py', '.c')
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(c_code)
-        print(f"\n Código salvo com sucesso em: {output_file}")
+        if cache:
+            cache.guardar(chave, c_code)
+            cache.aplicar_limite()
 
     except (SyntaxError, SemanticError) as e:
         print(f"\n ERRO DE COMPILAÇÃO: {e}")
+        return 1
     except Exception as e:
         print(f"\n Ocorreu um erro inesperado: {e}")
-        
+        return 1
+
+    return salvar_saida_verbosa(input_file, c_code)
+
+def compilar_silencioso(entrada, saida, opcoes, config_cache=None):
+    """
+    Lê o programa de `entrada` ('-' para stdin) e escreve apenas o C em `saida`
+    ('-' para stdout). Nada mais é impresso; erros vão para stderr.
+    """
+    try:
+        if entrada == '-':
+            code = sys.stdin.read()
+        else:
+            with open(entrada, 'r', encoding='utf-8') as f:
+                code = f.read()
+        cache = obter_cache(config_cache)
+        if saida != '-':
+            traduzir_para_arquivo(code, saida, opcoes, cache)
+            if cache:
+                cache.aplicar_limite()
+            return 0
+
+        chave = cache.chave(code, opcoes) if cache else None
+        c_code = cache.obter(chave) if cache else None
+        if c_code is None:
+            resultado = compile_source(code, **opcoes)
+            if not resultado.sucesso:
+                for diagnostico in resultado.diagnosticos:
+                    print(f"ERRO DE COMPILAÇÃO: {diagnostico}", file=sys.stderr)
+                return 1
+            c_code = resultado.c_code
+            if cache:
+                cache.guardar(chave, c_code)
+                cache.aplicar_limite()
+        sys.stdout.write(c_code)
+        return 0
+    except (SyntaxError, SemanticError) as e:
+        print(f"ERRO DE COMPILAÇÃO: {e}", file=sys.stderr)
+    except OSError as e:
+        print(f"Erro de E/S: {e}", file=sys.stderr)
+    return 1
+
+def observar(input_file, saida, opcoes):
+    """
+    Modo --watch: recompila `input_file` para `saida` a cada vez que ele é salvo, até
+    Ctrl+C. Só os comandos alterados (e os afetados por eles) passam de novo pelas fases.
+    """
+    compilador = CompiladorIncremental(**opcoes)
+    versao_compilada = None
+    print(f"Observando {input_file} (Ctrl+C para sair)")
+    try:
+        while True:
+            try:
+                estado = os.stat(input_file)
+                versao = (estado.st_mtime_ns, estado.st_size)
+            except FileNotFoundError:
+                versao = None  # editores que salvam apagando e recriando o arquivo
+            if versao is not None and versao != versao_compilada:
+                versao_compilada = versao
+                recompilar(compilador, input_file, saida)
+            time.sleep(INTERVALO_DE_OBSERVACAO)
+    except KeyboardInterrupt:
+        print()
+        return 0
+
+def recompilar(compilador, input_file, saida):
+    inicio = time.perf_counter()
+    try:
+        with open(input_file, 'r', encoding='utf-8') as f:
+            code = f.read()
+        c_code = compilador.compilar(code)
+        with open(saida, 'w', encoding='utf-8') as f:
+            f.write(c_code)
+    except (SyntaxError, SemanticError) as e:
+        print(f" [ERRO] {input_file}: ERRO DE COMPILAÇÃO: {e}")
+        return
+    except OSError as e:
+        print(f" [ERRO] {input_file}: Erro de E/S: {e}")
+        return
+    milissegundos = (time.perf_counter() - inicio) * 1000
+    estatisticas = compilador.estatisticas
+    if estatisticas['completa']:
+        detalhe = "compilação completa"
+    else:
+        detalhe = f"{estatisticas['novos']} de {estatisticas['trechos']} comando(s) reprocessado(s)"
+    print(f" [OK]   {input_file} -> {saida} ({milissegundos:.1f} ms, {detalhe})")
+
+def salvar_saida_verbosa(input_file, c_code):
+    print("\n CÓDIGO C FINAL GERADO:")
+    print("-" * 70)
+    print(c_code)
+    print("-" * 70)
+
+    output_file = caminho_saida(input_file)
+    try:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(c_code)
+    except OSError as e:
+        print(f"\n Erro ao salvar {output_file}: {e}")
+        return 1
+    print(f"\n Código salvo com sucesso em: {output_file}")
+    return 0
+
+def criar_argparser():
+    parser = argparse.ArgumentParser(
+        description="Compilador Python → C.",
+        usage="python main.py [opções] <arquivo.py | diretório | glob> ...",
+    )
+    parser.add_argument('entradas', nargs='*', metavar='entrada',
+                        help="arquivos .py, diretórios (busca recursiva) ou padrões glob; "
+                             "'-' lê o programa de stdin e escreve só o C em stdout")
+    parser.add_argument('-o', '--output', metavar='ARQUIVO',
+                        help="arquivo de saída de um único programa ('-' para stdout); não imprime mais nada")
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="arquivo único sem a saída detalhada: grava o .c e não imprime nada")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="número de processos do modo em lote (padrão: número de núcleos)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="ignora o cache de compilação (não lê nem grava)")
+    parser.add_argument('--clear-cache', action='store_true',
+                        help="apaga o cache de compilação antes de compilar")
+    parser.add_argument('--cache-dir', default=DIRETORIO_PADRAO,
+                        help=f"diretório do cache (padrão: {DIRETORIO_PADRAO})")
+    parser.add_argument('--cache-size', type=int, default=TAMANHO_MAXIMO_PADRAO // (1024 * 1024),
+                        help="tamanho máximo do cache em MB; as entradas menos usadas são removidas")
+    parser.add_argument('-O', dest='nivel_otimizacao', type=int, default=0,
+                        choices=range(NIVEL_MAXIMO + 1), metavar='NÍVEL',
+                        help=f"nível de otimização, de 0 (padrão) a {NIVEL_MAXIMO}")
+    parser.add_argument('--stdout-buffer', action='store_true',
+                        help="o programa gerado usa um buffer grande em stdout (mais rápido para muita saída)")
+    parser.add_argument('--fast-print', action='store_true',
+                        help="prints só com textos e inteiros são escritos sem printf")
+    parser.add_argument('--parallel', action='store_true',
+                        help="for com iterações independentes (reduções de soma, produto, mínimo e máximo "
+                             "e corpos elemento a elemento) viram laços OpenMP paralelos e vetorizados; "
+                             "compile o C com -fopenmp (o --build já acrescenta)")
+    parser.add_argument('--stats', nargs='?', const='text', choices=('text', 'json'),
+                        help="mede tempo, pico de memória e contagens de cada fase (arquivo único)")
+    parser.add_argument('--stats-file', metavar='ARQUIVO',
+                        help="grava as estatísticas em ARQUIVO em vez de imprimi-las")
+    parser.add_argument('--watch', action='store_true',
+                        help="recompila o arquivo sempre que ele for salvo, reprocessando só os comandos "
+                             "alterados (com -O1/-O2 cada recompilação é completa)")
+    parser.add_argument('--build', action='store_true',
+                        help="compila também o C gerado com o compilador C local e liga um executável "
+                             "ao lado de cada entrada (os arquivos objeto ficam no cache)")
+    parser.add_argument('--perfil', default=PERFIL_PADRAO, choices=sorted(PERFIS),
+                        help=f"flags do compilador C no --build (padrão: {PERFIL_PADRAO}; "
+                             + "; ".join(f"{nome}: {' '.join(flags)}" for nome, flags in PERFIS.items()) + ")")
+    parser.add_argument('--cc', metavar='COMANDO',
+                        help="compilador C do --build (padrão: variável CC, ou cc, gcc ou clang)")
+    parser.add_argument('--profile', metavar='ARQUIVO',
+                        help="executa a compilação sob o cProfile e grava o perfil em ARQUIVO "
+                             "(no modo em lote com -j > 1 os workers não são perfilados)")
+    return parser
+
+def main(argv=None):
+    argparser = criar_argparser()
+    args = argparser.parse_args(argv)
+
+    if args.clear_cache:
+        CompileCache(args.cache_dir).limpar()
+        if not args.entradas:
+            print(f"Cache removido: {args.cache_dir}")
+            return 0
+    if not args.entradas:
+        argparser.print_usage()
+        return 1
+
+    # Opções que alteram o código gerado (e por isso fazem parte da chave do cache)
+    opcoes = {
+        'nivel_otimizacao': args.nivel_otimizacao,
+        'buffer_saida': args.stdout_buffer,
+        'impressao_rapida': args.fast_print,
+        'paralelo': args.parallel,
+    }
+
+    config_cache = None
+    if not args.no_cache:
+        config_cache = (args.cache_dir, args.cache_size * 1024 * 1024)
+
+    # Um único arquivo explícito mantém a saída detalhada original
+    entrada_unica = len(args.entradas) == 1 and not os.path.isdir(args.entradas[0]) \
+        and not eh_padrao_glob(args.entradas[0])
+    if args.watch:
+        if not entrada_unica or args.entradas == ['-'] or args.output == '-':
+            argparser.error("--watch só pode ser usado com um único arquivo, gravando o C em arquivo")
+        return observar(args.entradas[0], args.output or caminho_saida(args.entradas[0]), opcoes)
+
+    if args.build:
+        if args.output is not None or '-' in args.entradas or args.stats or args.stats_file:
+            argparser.error("--build não pode ser usado com -o, '-' ou --stats")
+        try:
+            compilador = localizar_compilador(args.cc)
+            config_objetos = None
+            if config_cache is not None:
+                config_objetos = (os.path.join(args.cache_dir, SUBDIRETORIO_DE_OBJETOS), config_cache[1])
+            config_nativa = ConfiguracaoNativa(compilador, args.perfil, config_objetos, openmp=args.parallel)
+        except ErroDeCompilacaoNativa as e:
+            print(f"ERRO DO COMPILADOR C: {e}")
+            return 1
+        arquivos = resolver_entradas(args.entradas)
+        if not arquivos:
+            print("Nenhum arquivo .py encontrado nas entradas informadas.")
+            return 1
+        jobs = args.jobs if args.jobs is not None else (os.cpu_count() or 1)
+        return construir_em_lote(arquivos, max(1, jobs), opcoes, config_cache, config_nativa)
+
+    silencioso = args.output is not None or args.quiet or args.entradas == ['-']
+    if silencioso:
+        if not entrada_unica:
+            argparser.error("-o, -q e '-' só podem ser usados com um único programa")
+        entrada = args.entradas[0]
+        saida = args.output or ('-' if entrada == '-' else caminho_saida(entrada))
+        return compilar_silencioso(entrada, saida, opcoes, config_cache)
+
+    estatisticas = None
+    if args.stats or args.stats_file:
+        if not entrada_unica or args.jobs is not None:
+            argparser.error("--stats só pode ser usado com um único arquivo")
+        estatisticas = EstatisticasDeCompilacao()
+
+    if entrada_unica and args.jobs is None:
+        acao = partial(compilar_verboso, args.entradas[0], opcoes, config_cache, estatisticas)
+    else:
+        arquivos = resolver_entradas(args.entradas)
+        if not arquivos:
+            print("Nenhum arquivo .py encontrado nas entradas informadas.")
+            return 1
+        jobs = args.jobs if args.jobs is not None else (os.cpu_count() or 1)
+        acao = partial(compilar_em_lote, arquivos, max(1, jobs), opcoes, config_cache)
+
+    if estatisticas:
+        estatisticas.iniciar()
+    try:
+        if args.profile:
+            perfil = cProfile.Profile()
+            resultado = perfil.runcall(acao)
+            perfil.dump_stats(args.profile)
+            print(f" Perfil gravado em: {args.profile} (veja com: python -m pstats {args.profile})")
+        else:
+            resultado = acao()
+    finally:
+        if estatisticas:
+            estatisticas.encerrar()
+
+    if estatisticas and estatisticas.fases:
+        relatorio = estatisticas.formatar_json() if args.stats == 'json' else estatisticas.formatar_texto()
+        if args.stats_file:
+            with open(args.stats_file, 'w', encoding='utf-8') as f:
+                f.write(relatorio + "\n")
+        else:
+            print(relatorio)
+    return resultado
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,130 @@
+# native_build.py
+#
+# Compilação nativa do C gerado (main.py --build). O compilador C local é chamado
+# com um perfil de otimização; o arquivo objeto fica em um cache endereçado pelo hash
+# do C, das flags e da versão do compilador, e o executável é ligado ao lado da
+# entrada. Um C idêntico (mesmo vindo de outro .py) não é compilado de novo.
+
+import hashlib
+import os
+import platform
+import shlex
+import shutil
+import subprocess
+import tempfile
+import time
+
+from compile_cache import CompileCache, obter_cache
+
+# Perfil -> flags usadas na compilação e também na ligação (com LTO, é na ligação
+# que o compilador otimiza)
+PERFIS = {
+    'O2': ('-O2',),
+    'O3-native': ('-O3', '-march=native'),
+    'lto': ('-O2', '-flto'),
+}
+PERFIL_PADRAO = 'O2'
+
+# Ligadas a todo executável: o % entre reais usa fmod, da libm
+BIBLIOTECAS = ('-lm',)
+
+# Subdiretório do cache de compilação onde ficam os objetos
+SUBDIRETORIO_DE_OBJETOS = 'objetos'
+
+class ErroDeCompilacaoNativa(Exception):
+    """O compilador C não foi encontrado ou rejeitou o código gerado."""
+
+def localizar_compilador(preferido=None):
+    """
+    Comando do compilador C, como lista de argumentos: `preferido` (--cc), a variável
+    de ambiente CC ou o primeiro de cc, gcc e clang encontrado no PATH.
+    """
+    candidatos = [preferido] if preferido else [os.environ.get('CC'), 'cc', 'gcc', 'clang']
+    for candidato in candidatos:
+        comando = shlex.split(candidato) if candidato else []
+        if comando and shutil.which(comando[0]):
+            return comando
+    if preferido:
+        raise ErroDeCompilacaoNativa(f"compilador C não encontrado: {preferido}")
+    raise ErroDeCompilacaoNativa("nenhum compilador C encontrado (cc, gcc ou clang); use --cc ou a variável CC")
+
+def executar(comando):
+    """Executa o compilador; a saída de erro dele vira a mensagem da exceção."""
+    try:
+        resultado = subprocess.run(comando, capture_output=True, text=True)
+    except OSError as e:
+        raise ErroDeCompilacaoNativa(f"não foi possível executar {comando[0]}: {e}") from e
+    if resultado.returncode != 0:
+        raise ErroDeCompilacaoNativa(resultado.stderr.strip()
+                                     or f"{comando[0]} terminou com código {resultado.returncode}")
+    return resultado.stdout
+
+def identidade_do_compilador(compilador):
+    """
+    Versão do compilador e arquitetura da máquina, que entram na chave do cache:
+    trocar de compilador (ou compartilhar o cache com outra máquina, o que importa
+    com -march=native) não reaproveita objetos.
+    """
+    return f"{executar([*compilador, '--version'])}\n{platform.machine()}"
+
+class ConfiguracaoNativa:
+    """
+    O que os workers precisam para compilar: compilador, perfil, cache de objetos e se
+    o C usa OpenMP (gerado com a opção paralelo).
+    """
+    __slots__ = ('compilador', 'identidade', 'perfil', 'config_cache', 'openmp')
+
+    def __init__(self, compilador, perfil=PERFIL_PADRAO, config_cache=None, openmp=False):
+        self.compilador = compilador
+        self.identidade = identidade_do_compilador(compilador)
+        self.perfil = perfil
+        # (diretório, tamanho máximo em bytes) ou None sem cache
+        self.config_cache = config_cache
+        self.openmp = openmp
+
+    @property
+    def flags(self):
+        return PERFIS[self.perfil] + (('-fopenmp',) if self.openmp else ())
+
+class CacheDeObjetos(CompileCache):
+    """Cache de arquivos objeto: a chave é o hash do C gerado, das flags e da identidade do compilador."""
+    EXTENSAO = '.o'
+
+    def chave(self, c_code, flags, identidade):
+        h = hashlib.sha256(identidade.encode())
+        h.update(repr(tuple(flags)).encode())
+        h.update(b'\0')
+        h.update(c_code)
+        return h.hexdigest()
+
+def compilar_objeto(arquivo_c, arquivo_o, config):
+    """Compila `arquivo_c` em `arquivo_o`, reaproveitando o objeto do cache. Retorna acerto_no_cache."""
+    cache = obter_cache(config.config_cache, CacheDeObjetos)
+    if cache:
+        with open(arquivo_c, 'rb') as f:
+            chave = cache.chave(f.read(), config.flags, config.identidade)
+        if cache.copiar_para(chave, arquivo_o):
+            return True
+    executar([*config.compilador, *config.flags, '-c', arquivo_c, '-o', arquivo_o])
+    if cache:
+        cache.guardar_arquivo(chave, arquivo_o)
+    return False
+
+def construir(arquivo_c, executavel, config):
+    """
+    Compila e liga `arquivo_c` em `executavel`. O objeto intermediário é temporário.
+    Retorna (segundos, objeto_em_cache).
+    """
+    inicio = time.perf_counter()
+    fd, arquivo_o = tempfile.mkstemp(suffix='.o')
+    os.close(fd)
+    try:
+        acerto = compilar_objeto(arquivo_c, arquivo_o, config)
+        executar([*config.compilador, *config.flags, arquivo_o, '-o', executavel, *BIBLIOTECAS])
+    finally:
+        os.remove(arquivo_o)
+    return time.perf_counter() - inicio, acerto
+
+def caminho_executavel(input_file):
+    """Caminho do executável ligado ao lado do arquivo de entrada."""
+    return os.path.splitext(input_file)[0] + ('.exe' if os.name == 'nt' else '')
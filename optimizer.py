@@ -0,0 +1,48 @@
+# optimizer.py
+
+from constant_folding import PropagadorDeConstantes
+from dead_code import EliminadorDeCodigoMorto
+from redundancy_elimination import EliminadorDeSubexpressoes, MovedorDeInvariantes
+from strength_reduction import ReduzidorDeForca
+
+NIVEL_MAXIMO = 2
+
+def otimizar(ast, tabela_de_simbolos, nivel=1):
+    """
+    Executa os passes de otimização do nível pedido, entre a análise semântica e a
+    geração de código. Retorna (ast otimizada, relatório), onde o relatório é um
+    dicionário descrição -> quantidade de transformações.
+
+    Nível 0: nenhuma otimização.
+    Nível 1: dobramento e propagação de constantes, resolução de ifs constantes,
+             redução de força (potências com expoente literal, divisões por
+             potências de 2), eliminação de código morto e de variáveis não usadas.
+    Nível 2: nível 1 + movimentação de invariantes de laço e eliminação de
+             subexpressões comuns (criam temporários na tabela de símbolos).
+    """
+    relatorio = {}
+    if nivel >= 1:
+        propagador = PropagadorDeConstantes()
+        ast = propagador.otimizar(ast)
+        relatorio.update(propagador.estatisticas)
+        # Antes do nível 2: os quadrados _potN calculados em um laço também podem sair dele
+        redutor = ReduzidorDeForca(tabela_de_simbolos)
+        ast = redutor.otimizar(ast)
+        relatorio.update(redutor.estatisticas)
+    if nivel >= 2:
+        movedor = MovedorDeInvariantes(tabela_de_simbolos)
+        ast = movedor.otimizar(ast)
+        eliminador = EliminadorDeSubexpressoes(tabela_de_simbolos)
+        ast = eliminador.otimizar(ast)
+        relatorio['expressões movidas para fora de laços'] = movedor.movidas
+        relatorio['subexpressões eliminadas'] = eliminador.eliminadas
+    if nivel >= 1:
+        # Por último: também limpa o que os passes anteriores deixaram sem uso
+        eliminador_de_codigo_morto = EliminadorDeCodigoMorto(tabela_de_simbolos)
+        ast = eliminador_de_codigo_morto.otimizar(ast)
+        relatorio.update(eliminador_de_codigo_morto.estatisticas)
+    return ast, relatorio
+
+def formatar_relatorio(relatorio):
+    itens = [f"{descricao}: {quantidade}" for descricao, quantidade in relatorio.items()]
+    return ", ".join(itens) if itens else "nenhuma otimização aplicada"
@@ -1,9 +1,147 @@
+import re
 import tokenize
-from io import BytesIO
-import sys
+from enum import IntEnum
+from io import StringIO
+from itertools import chain, islice
+from token import EXACT_TOKEN_TYPES
+
+class TokenKind(IntEnum):
+    """Códigos compactos dos tipos de token. Cada token é a tupla (kind, valor, linha, coluna)."""
+    IDENTIFICADOR = 1
+    NUMERO = 2
+    STRING = 3
+    PALAVRA_CHAVE = 4
+    COMENTARIO = 5
+    INDENT = 6
+    DEDENT = 7
+    ERRO = 8          # caractere não reconhecido pelo tokenize (ERRORTOKEN)
+    OPERADOR = 9      # operador sem código próprio (ex.: '+=', '->')
+    MAIS = 10
+    MENOS = 11
+    VEZES = 12
+    DIVISAO = 13
+    MODULO = 14
+    POTENCIA = 15
+    DIVISAO_INTEIRA = 16
+    ATRIBUICAO = 17
+    MENOR = 18
+    MAIOR = 19
+    IGUAL = 20
+    DIFERENTE = 21
+    MENOR_IGUAL = 22
+    MAIOR_IGUAL = 23
+    ABRE_PARENTESE = 24
+    FECHA_PARENTESE = 25
+    ABRE_CHAVE = 26
+    FECHA_CHAVE = 27
+    ABRE_COLCHETE = 28
+    FECHA_COLCHETE = 29
+    DOIS_PONTOS = 30
+    VIRGULA = 31
+    PONTO_E_VIRGULA = 32
+    PONTO = 33
+
+# Descrições legíveis usadas apenas nas mensagens de erro
+DESCRICOES = {
+    TokenKind.IDENTIFICADOR: 'Identificador',
+    TokenKind.NUMERO: 'Número',
+    TokenKind.STRING: 'String',
+    TokenKind.PALAVRA_CHAVE: 'Palavra-chave C',
+    TokenKind.COMENTARIO: 'Comentário',
+    TokenKind.INDENT: 'INDENT',
+    TokenKind.DEDENT: 'DEDENT',
+    TokenKind.ERRO: 'ERRORTOKEN',
+    TokenKind.OPERADOR: 'Operador',
+    TokenKind.MAIS: 'Operador +',
+    TokenKind.MENOS: 'Operador -',
+    TokenKind.VEZES: 'Operador *',
+    TokenKind.DIVISAO: 'Operador /',
+    TokenKind.MODULO: 'Operador %',
+    TokenKind.POTENCIA: 'Operador **',
+    TokenKind.DIVISAO_INTEIRA: 'Operador //',
+    TokenKind.ATRIBUICAO: 'Operador =',
+    TokenKind.MENOR: 'Operador <',
+    TokenKind.MAIOR: 'Operador >',
+    TokenKind.IGUAL: 'Operador ==',
+    TokenKind.DIFERENTE: 'Operador !=',
+    TokenKind.MENOR_IGUAL: 'Operador <=',
+    TokenKind.MAIOR_IGUAL: 'Operador >=',
+    TokenKind.ABRE_PARENTESE: 'Abre Parêntese',
+    TokenKind.FECHA_PARENTESE: 'Fecha Parêntese',
+    TokenKind.ABRE_CHAVE: 'Abre Chave',
+    TokenKind.FECHA_CHAVE: 'Fecha Chave',
+    TokenKind.ABRE_COLCHETE: 'Abre Colchete',
+    TokenKind.FECHA_COLCHETE: 'Fecha Colchete',
+    TokenKind.DOIS_PONTOS: 'Dois Pontos',
+    TokenKind.VIRGULA: 'Vírgula',
+    TokenKind.PONTO_E_VIRGULA: 'Ponto e Vírgula',
+    TokenKind.PONTO: 'Ponto',
+}
+
+def descricao_token(kind):
+    return DESCRICOES.get(kind, str(kind))
+
+# --- Expressão mestra do varredor próprio ---
+# Os números seguem a mesma gramática do módulo tokenize, para que cada token tenha
+# exatamente a mesma extensão nos dois caminhos.
+_DIGITOS = r'[0-9](?:_?[0-9])*'
+_EXPOENTE = r'[eE][-+]?' + _DIGITOS
+_REAL = rf'(?:{_DIGITOS}\.(?:{_DIGITOS})?|\.{_DIGITOS})(?:{_EXPOENTE})?|{_DIGITOS}{_EXPOENTE}'
+_INTEIRO = r'0[xX](?:_?[0-9a-fA-F])+|0[bB](?:_?[01])+|0[oO](?:_?[0-7])+|0(?:_?0)*|[1-9](?:_?[0-9])*'
+_NUMERO = rf'{_DIGITOS}[jJ]|(?:{_REAL})[jJ]|{_REAL}|{_INTEIRO}'
+
+def _alternativas_por_prefixo(textos):
+    """
+    Expressão que reconhece `textos` agrupando os prefixos comuns ('*', '**' e '*='
+    compartilham o primeiro '*'): o motor testa um caractere por vez em vez de uma
+    alternativa por operador, e o mais longo sempre ganha.
+    """
+    grupos = {}
+    for texto in textos:
+        grupos.setdefault(texto[0], []).append(texto[1:])
+    partes = []
+    for inicial, restos in sorted(grupos.items()):
+        continuacoes = [resto for resto in restos if resto]
+        if not continuacoes:
+            partes.append(re.escape(inicial))
+            continue
+        opcional = '?' if '' in restos else ''
+        partes.append(f"{re.escape(inicial)}(?:{_alternativas_por_prefixo(continuacoes)}){opcional}")
+    return '|'.join(partes)
+
+# Strings simples de uma linha; com prefixo, de três aspas ou continuadas com '\' ficam para o tokenize
+_STRING = r"""'(?!'')[^\n'\\]*(?:\\.[^\n'\\]*)*'|"(?!"")[^\n"\\]*(?:\\.[^\n"\\]*)*\""""
+
+# Como no tokenize, os espaços antes de cada token fazem parte do mesmo casamento.
+# Um nome colado a aspas (prefixo de string) não casa e, como barra invertida,
+# caracteres inválidos, '\r' etc., cai em 'outro', que é deixado para o tokenize.
+VARREDOR = re.compile(
+    r'[ \t\f]*(?:'
+    r"""(?P<nome>[^\W\d]\w*)(?![\w'"])"""
+    rf'|(?P<numero>{_NUMERO})'
+    rf'|(?P<operador>{_alternativas_por_prefixo(EXACT_TOKEN_TYPES)})'
+    rf'|(?P<string>{_STRING})'
+    r'|(?P<fim>\n)'
+    r'|(?P<comentario>#[^\r\n]*)'
+    r'|(?P<outro>.))'
+)
+GRUPO_NOME, GRUPO_NUMERO, GRUPO_OPERADOR, GRUPO_STRING, GRUPO_OUTRO = (
+    VARREDOR.groupindex[grupo] for grupo in ('nome', 'numero', 'operador', 'string', 'outro'))
+
+class _ForaDoSubconjunto(Exception):
+    """O varredor próprio encontrou algo que só o tokenize sabe tratar."""
 
 class PythonToCLexer:
-    def __init__(self):
+    """
+    Por padrão os tokens vêm de um varredor próprio (uma expressão regular mestra e a
+    pilha de indentação), bem mais rápido que o módulo tokenize e com os mesmos
+    tokens. Ao encontrar algo fora do subconjunto que conhece (strings de várias
+    linhas ou com prefixo, continuação com barra invertida, tabulações na indentação,
+    erros), ele passa a entrada ao tokenize. Com `usar_tokenize`, todo o trabalho fica
+    com o tokenize.
+    """
+    def __init__(self, usar_tokenize=False):
+        self.usar_tokenize = usar_tokenize
         self.keyword_map = {
             'print': 'printf',
             'and': '&&',
@@ -13,9 +151,8 @@ class PythonToCLexer:
             'False': '0',
             'None': 'NULL',
             'def': 'Função',
+            'return': 'return',
             '#': '//',
-            '**': 'pow',
-            '//': '/',
             'if': 'if',
             'for': 'for',
             'else': 'else',
@@ -24,82 +161,194 @@ class PythonToCLexer:
             'in': 'in'
         }
 
-        self.operator_descriptions = {
-            '+': 'Operador +',
-            '-': 'Operador -',
-            '*': 'Operador *',
-            '/': 'Operador /',
-            '%': 'Operador %',
-            '=': 'Operador =',
-            '<': 'Operador <',
-            '>': 'Operador >',
-            '==': 'Operador ==',
-            '!=': 'Operador !=',
-            '<=': 'Operador <=',
-            '>=': 'Operador >=',
-            '&&': 'Operador &&',
-            '||': 'Operador ||',
-            '!': 'Operador !',
-            '(': 'Abre Parêntese',
-            ')': 'Fecha Parêntese',
-            '{': 'Abre Chave',
-            '}': 'Fecha Chave',
-            '[': 'Abre Colchete',
-            ']': 'Fecha Colchete',
-            ':': 'Dois Pontos',
-            ',': 'Vírgula',
-            ';': 'Ponto e Vírgula',
+        self.operator_kinds = {
+            '+': TokenKind.MAIS,
+            '-': TokenKind.MENOS,
+            '*': TokenKind.VEZES,
+            '/': TokenKind.DIVISAO,
+            '%': TokenKind.MODULO,
+            '**': TokenKind.POTENCIA,
+            '//': TokenKind.DIVISAO_INTEIRA,
+            '=': TokenKind.ATRIBUICAO,
+            '<': TokenKind.MENOR,
+            '>': TokenKind.MAIOR,
+            '==': TokenKind.IGUAL,
+            '!=': TokenKind.DIFERENTE,
+            '<=': TokenKind.MENOR_IGUAL,
+            '>=': TokenKind.MAIOR_IGUAL,
+            '(': TokenKind.ABRE_PARENTESE,
+            ')': TokenKind.FECHA_PARENTESE,
+            '{': TokenKind.ABRE_CHAVE,
+            '}': TokenKind.FECHA_CHAVE,
+            '[': TokenKind.ABRE_COLCHETE,
+            ']': TokenKind.FECHA_COLCHETE,
+            ':': TokenKind.DOIS_PONTOS,
+            ',': TokenKind.VIRGULA,
+            ';': TokenKind.PONTO_E_VIRGULA,
+            '.': TokenKind.PONTO,
         }
 
         # MODIFICAÇÃO: 'INDENT' e 'DEDENT' não são mais ignorados.
-        self.ignore_tokens = {'ENCODING', 'ENDMARKER', 'NL', 'NEWLINE', 'COMMENT'}
-
-    def get_token_description(self, token_type, token_value):
-        if token_type == 'OP':
-            return self.operator_descriptions.get(token_value, f'Operador {token_value}')
-        
-        if token_type == 'NAME' and token_value in self.keyword_map:
-            return 'Palavra-chave C'
-        
-        # Adicionado para reconhecer INDENT/DEDENT
-        if token_type in ('INDENT', 'DEDENT'):
-            return token_type
-
-        return {
-            'COMMENT': 'Comentário',
-            'NAME': 'Identificador',
-            'NUMBER': 'Número',
-            'STRING': 'String',
-        }.get(token_type, token_type)
+        self.ignore_tokens = {tokenize.ENCODING, tokenize.ENDMARKER, tokenize.NL, tokenize.NEWLINE, tokenize.COMMENT}
 
-    def tokenize(self, python_code):
-        tokens = []
-        try:
+    def get_token_kind(self, token_type, token_value):
+        if token_type == tokenize.OP:
+            return self.operator_kinds.get(token_value, TokenKind.OPERADOR)
+        if token_type == tokenize.NAME:
+            return TokenKind.PALAVRA_CHAVE if token_value in self.keyword_map else TokenKind.IDENTIFICADOR
+        if token_type == tokenize.NUMBER:
+            return TokenKind.NUMERO
+        if token_type == tokenize.STRING:
+            return TokenKind.STRING
+        if token_type == tokenize.INDENT:
+            return TokenKind.INDENT
+        if token_type == tokenize.DEDENT:
+            return TokenKind.DEDENT
+        if token_type == tokenize.COMMENT:
+            return TokenKind.COMENTARIO
+        return TokenKind.ERRO
+
+    def iter_tokens(self, python_code):
+        """
+        Gera os tokens sob demanda, sem materializar a lista completa. `python_code`
+        pode ser o texto do programa ou um arquivo de texto já aberto.
+        """
+        if isinstance(python_code, str):
             # Adiciona uma nova linha no final para garantir que o último DEDENT seja gerado
             if not python_code.endswith('\n'):
                 python_code += '\n'
+            reiniciar = StringIO(python_code).readline
+            readline = StringIO(python_code).readline
+        else:
+            reiniciar = None
+            readline = python_code.readline
+        if self.usar_tokenize:
+            return self._tokens_do_tokenize(readline)
+        return self._varrer(readline, reiniciar)
 
-            code_bytes = BytesIO(python_code.encode('utf-8')).readline
-            for tok in tokenize.tokenize(code_bytes):
-                original_type = tokenize.tok_name[tok.type]
-                value = tok.string
-                line, column = tok.start
+    def _varrer(self, readline, reiniciar):
+        """
+        Varredor próprio. Os tokens de cada linha só são entregues depois que a linha
+        inteira foi reconhecida; se uma linha sai do subconjunto, o tokenize recomeça do
+        início e os tokens já entregues são descartados da saída dele.
+        """
+        lidas = [] if reiniciar is None else None  # um arquivo não volta ao início: guarda as linhas
+        emitidos = 0
+        try:
+            for tokens in self._linhas_de_tokens(readline, lidas):
+                emitidos += len(tokens)
+                yield from tokens
+        except _ForaDoSubconjunto:
+            if reiniciar is None:
+                restante = chain(lidas, iter(readline, ''))
+                reiniciar = lambda: next(restante, '')
+            yield from islice(self._tokens_do_tokenize(reiniciar), emitidos, None)
+
+    def _linhas_de_tokens(self, readline, lidas):
+        """Listas com os tokens de cada linha; lança _ForaDoSubconjunto onde o tokenize é necessário."""
+        keyword_map = self.keyword_map
+        operator_kinds = self.operator_kinds
+        varrer = VARREDOR.finditer
+        IDENTIFICADOR, PALAVRA_CHAVE, NUMERO, STRING, OPERADOR = (
+            TokenKind.IDENTIFICADOR, TokenKind.PALAVRA_CHAVE, TokenKind.NUMERO, TokenKind.STRING, TokenKind.OPERADOR)
+        indentacoes = [0]
+        parenteses = 0
+        numero_linha = 0
+        while True:
+            linha = readline()
+            if not linha:
+                break
+            if lidas is not None:
+                lidas.append(linha)
+            numero_linha += 1
+            if linha[-1] != '\n':
+                raise _ForaDoSubconjunto
+            tokens = []
+            inicio = 0
+            if parenteses == 0:
+                # Início de um comando: mede a indentação (só espaços)
+                inicio = len(linha) - len(linha.lstrip(' '))
+                primeiro = linha[inicio]
+                if primeiro == '#' or primeiro == '\n':
+                    continue  # linha em branco ou só com comentário
+                if primeiro in '\t\f\r':
+                    raise _ForaDoSubconjunto
+                if inicio > indentacoes[-1]:
+                    indentacoes.append(inicio)
+                    tokens.append((TokenKind.INDENT, linha[:inicio], numero_linha, 0))
+                while inicio < indentacoes[-1]:
+                    if inicio not in indentacoes:
+                        raise _ForaDoSubconjunto  # o tokenize lança o IndentationError
+                    indentacoes.pop()
+                    tokens.append((TokenKind.DEDENT, '', numero_linha, inicio))
+
+            for m in varrer(linha, inicio):
+                grupo = m.lastindex
+                if grupo == GRUPO_NOME:
+                    valor = m.group(grupo)
+                    if valor in keyword_map:
+                        tokens.append((PALAVRA_CHAVE, keyword_map[valor], numero_linha, m.start(grupo)))
+                    elif valor.isascii() or valor[0].isidentifier():
+                        tokens.append((IDENTIFICADOR, valor, numero_linha, m.start(grupo)))
+                    else:
+                        raise _ForaDoSubconjunto
+                elif grupo == GRUPO_OPERADOR:
+                    valor = m.group(grupo)
+                    if valor in '([{':
+                        parenteses += 1
+                    elif valor in ')]}':
+                        parenteses -= 1
+                        if parenteses < 0:
+                            raise _ForaDoSubconjunto
+                    tokens.append((operator_kinds.get(valor, OPERADOR), keyword_map.get(valor, valor),
+                                   numero_linha, m.start(grupo)))
+                elif grupo == GRUPO_NUMERO:
+                    seguinte = linha[m.end()]
+                    if seguinte.isalnum() or seguinte in '_.':
+                        # Literal inválido (ex.: 0123, 1e): cada versão do tokenize o divide de um jeito
+                        raise _ForaDoSubconjunto
+                    tokens.append((NUMERO, m.group(grupo), numero_linha, m.start(grupo)))
+                elif grupo == GRUPO_STRING:
+                    valor = m.group(grupo)
+                    tokens.append((STRING, f'"{valor[1:-1]}"', numero_linha, m.start(grupo)))
+                elif grupo == GRUPO_OUTRO:
+                    raise _ForaDoSubconjunto
+            if tokens:
+                yield tokens
+
+        if parenteses:
+            raise _ForaDoSubconjunto  # o tokenize lança o erro de parêntese não fechado
+        # Como no tokenize, os DEDENTs finais ficam na linha seguinte à última
+        yield [(TokenKind.DEDENT, '', numero_linha + 1, 0) for _ in indentacoes[1:]]
 
-                if original_type in self.ignore_tokens:
+    def _tokens_do_tokenize(self, readline):
+        keyword_map = self.keyword_map
+        ignore_tokens = self.ignore_tokens
+        try:
+            for tok in tokenize.generate_tokens(readline):
+                token_type = tok.type
+                if token_type in ignore_tokens:
                     continue
 
-                token_desc = self.get_token_description(original_type, value)
+                value = tok.string
+                line, column = tok.start
+                kind = self.get_token_kind(token_type, value)
 
-                if original_type == 'COMMENT':
-                    tokens.append(('Comentário', '//' + value[1:], line, column))
-                elif original_type == 'NAME' and value in self.keyword_map:
-                    tokens.append(('Palavra-chave C', self.keyword_map[value], line, column))
-                elif original_type == 'STRING':
-                    tokens.append(('String', f'"{tok.string[1:-1]}"', line, column))
+                if kind == TokenKind.COMENTARIO:
+                    yield (kind, '//' + value[1:], line, column)
+                elif kind == TokenKind.PALAVRA_CHAVE:
+                    yield (kind, keyword_map[value], line, column)
+                elif kind == TokenKind.STRING:
+                    yield (kind, f'"{value[1:-1]}"', line, column)
                 else:
-                    c_value = self.keyword_map.get(value, value)
-                    tokens.append((token_desc, c_value, line, column))
+                    yield (kind, keyword_map.get(value, value), line, column)
 
         except tokenize.TokenError as e:
-            print(f"Erro na tokenização: {e}", file=sys.stderr)
-        return tokens
\ No newline at end of file
+            # Ex.: parêntese não fechado no fim do arquivo
+            mensagem, (linha, coluna) = e.args
+            erro = SyntaxError(f"Erro na tokenização: {mensagem} na linha {linha}, coluna {coluna}")
+            erro.linha, erro.coluna = linha, coluna
+            raise erro from None
+
+    def tokenize(self, python_code):
+        return list(self.iter_tokens(python_code))
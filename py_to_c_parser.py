@@ -1,21 +1,86 @@
 # py_to_c_parser.py
 
+import sys
+from collections import deque
 from ast_nodes import *
+from py_to_c_lexer import TokenKind, descricao_token
+
+# Força de ligação de cada nível de precedência: quanto maior, mais forte o
+# operador prende seus operandos (a ordem é a mesma do Python)
+OU, E, NAO, COMPARACAO, SOMA, PRODUTO, UNARIO, POTENCIA = range(1, 9)
+
+# Operadores binários -> (força, associa à direita). A chave é o TokenKind; para as
+# palavras-chave (and/or, que chegam do lexer como '&&'/'||') é o valor do token.
+OPERADORES_BINARIOS = {
+    '||': (OU, False),
+    '&&': (E, False),
+    TokenKind.MENOR: (COMPARACAO, False),
+    TokenKind.MAIOR: (COMPARACAO, False),
+    TokenKind.IGUAL: (COMPARACAO, False),
+    TokenKind.DIFERENTE: (COMPARACAO, False),
+    TokenKind.MENOR_IGUAL: (COMPARACAO, False),
+    TokenKind.MAIOR_IGUAL: (COMPARACAO, False),
+    TokenKind.MAIS: (SOMA, False),
+    TokenKind.MENOS: (SOMA, False),
+    TokenKind.VEZES: (PRODUTO, False),
+    TokenKind.DIVISAO: (PRODUTO, False),
+    TokenKind.MODULO: (PRODUTO, False),
+    TokenKind.DIVISAO_INTEIRA: (PRODUTO, False),
+    # Mais forte que o menos unário à esquerda (-2 ** 2 é -(2 ** 2)); à direita o
+    # operando pode ser um unário (2 ** -1), que ainda é aceito com a força UNARIO
+    TokenKind.POTENCIA: (POTENCIA, True),
+}
+
+# Operadores prefixados -> força com que prendem o operando. Um prefixado só é
+# aceito onde a força mínima não passa da sua (ex.: `a == not b` é erro, como no Python).
+OPERADORES_PREFIXADOS = {
+    '!': NAO,
+    TokenKind.MENOS: UNARIO,
+    TokenKind.MAIS: UNARIO,
+}
+
+# True e False chegam do lexer como palavras-chave com os valores '1' e '0'
+LITERAIS_BOOLEANOS = frozenset({'1', '0'})
+
+# Lidos a cada token do laço de expressões: consultar o TokenKind toda vez custa caro
+NUMERO, IDENTIFICADOR, PALAVRA_CHAVE, ABRE_PARENTESE, ABRE_COLCHETE = (
+    TokenKind.NUMERO, TokenKind.IDENTIFICADOR, TokenKind.PALAVRA_CHAVE, TokenKind.ABRE_PARENTESE,
+    TokenKind.ABRE_COLCHETE)
 
 class Parser:
+    """
+    Parser descendente recursivo. Os tokens podem vir de uma lista ou de um gerador
+    (PythonToCLexer.iter_tokens): eles são consumidos sob demanda, com um pequeno
+    buffer de lookahead, sem nunca materializar a sequência completa.
+    """
     def __init__(self, tokens):
-        self.tokens = tokens
-        self.pos = 0
-        self.current_token = self.tokens[self.pos] if self.tokens else None
+        self._tokens = iter(tokens)
+        self._lookahead = deque()
+        self.current_token = next(self._tokens, None)
+        self._em_funcao = False  # dentro do corpo de um def (onde return é permitido)
 
     def advance(self):
-        self.pos += 1
-        self.current_token = self.tokens[self.pos] if self.pos < len(self.tokens) else None
+        if self._lookahead:
+            self.current_token = self._lookahead.popleft()
+        else:
+            self.current_token = next(self._tokens, None)
+
+    def peek(self, distancia=1):
+        """Token `distancia` posições à frente do atual, sem consumi-lo (None no fim da entrada)."""
+        while len(self._lookahead) < distancia:
+            token = next(self._tokens, None)
+            if token is None:
+                return None
+            self._lookahead.append(token)
+        return self._lookahead[distancia - 1]
 
     def error(self, mensagem):
         if self.current_token:
             _, valor, linha, coluna = self.current_token
-            raise SyntaxError(f"{mensagem} na linha {linha}, coluna {coluna} ('{valor}')")
+            erro = SyntaxError(f"{mensagem} na linha {linha}, coluna {coluna} ('{valor}')")
+            # Posição também em atributos, como no SemanticError (lineno mudaria o texto da mensagem)
+            erro.linha, erro.coluna = linha, coluna
+            raise erro
         else:
             raise SyntaxError(f"{mensagem} no final do arquivo")
 
@@ -26,114 +91,246 @@ class Parser:
             return token
         else:
             valor_encontrado = f"'{token[1]}'" if token else "EOF"
-            tipo_encontrado = f"'{token[0]}'" if token else ""
-            self.error(f"Esperado '{valor_esperado or tipo_esperado}', encontrado {valor_encontrado} do tipo {tipo_encontrado}")
+            tipo_encontrado = f"'{descricao_token(token[0])}'" if token else ""
+            self.error(f"Esperado '{valor_esperado or descricao_token(tipo_esperado)}', encontrado {valor_encontrado} do tipo {tipo_encontrado}")
 
     def parse(self):
         statements = []
-        while self.current_token and self.current_token[0] != 'DEDENT':
-            statements.append(self.parse_comando())
+        while self.current_token and self.current_token[0] != TokenKind.DEDENT:
+            if self.current_token[0] == TokenKind.PALAVRA_CHAVE and self.current_token[1] == 'Função':
+                statements.append(self.parse_def())
+            else:
+                statements.append(self.parse_comando())
         return ProgramNode(statements)
 
     def parse_bloco(self):
-        self.expect('INDENT')
+        self.expect(TokenKind.INDENT)
         statements = []
-        while self.current_token and self.current_token[0] != 'DEDENT':
+        while self.current_token and self.current_token[0] != TokenKind.DEDENT:
             statements.append(self.parse_comando())
-        self.expect('DEDENT')
+        self.expect(TokenKind.DEDENT)
         return ProgramNode(statements)
 
     def parse_comando(self):
         token_type = self.current_token[0]
-        if token_type == 'Identificador':
+        if token_type == TokenKind.IDENTIFICADOR:
+            proximo = self.peek()
+            if proximo and proximo[0] == TokenKind.ABRE_PARENTESE:
+                expressao = self.parse_expressao()
+                if not isinstance(expressao, CallNode):
+                    self.error("Só chamadas de função podem ser usadas como comando")
+                return ExpressionStatementNode(expressao)
+            if proximo and proximo[0] == TokenKind.PONTO:
+                return self.parse_metodo()
             return self.parse_atribuicao()
-        if token_type == 'Palavra-chave C':
+        if token_type == TokenKind.PALAVRA_CHAVE:
             if self.current_token[1] == 'if': return self.parse_if()
             if self.current_token[1] == 'for': return self.parse_for()
+            if self.current_token[1] == 'while': return self.parse_while()
             if self.current_token[1] == 'printf': return self.parse_print()
+            if self.current_token[1] == 'return': return self.parse_return()
+            if self.current_token[1] == 'Função':
+                self.error("Funções só podem ser definidas no nível superior do programa")
         self.error("Comando ou declaração inválida")
 
+    def parse_def(self):
+        def_token = self.expect(TokenKind.PALAVRA_CHAVE, 'Função')
+        nome_token = self.expect(TokenKind.IDENTIFICADOR)
+        self.expect(TokenKind.ABRE_PARENTESE)
+        parametros = []
+        while self.current_token and self.current_token[0] != TokenKind.FECHA_PARENTESE:
+            if parametros:
+                self.expect(TokenKind.VIRGULA)
+            if self.current_token and self.current_token[1] in parametros:
+                self.error(f"Parâmetro '{self.current_token[1]}' repetido")
+            parametros.append(sys.intern(self.expect(TokenKind.IDENTIFICADOR)[1]))
+        self.expect(TokenKind.FECHA_PARENTESE)
+        self.expect(TokenKind.DOIS_PONTOS)
+        self._em_funcao = True
+        try:
+            corpo = self.parse_bloco()
+        finally:
+            self._em_funcao = False
+        return FunctionDefNode(nome_token, parametros, corpo, token=def_token)
+
+    def parse_return(self):
+        if not self._em_funcao:
+            self.error("'return' fora de uma função")
+        return_token = self.expect(TokenKind.PALAVRA_CHAVE, 'return')
+        token = self.current_token
+        expressao = None
+        # Os tokens não trazem as quebras de linha: o valor, se houver, começa na linha do return
+        if token and token[0] != TokenKind.DEDENT and token[2] == return_token[2]:
+            expressao = self.parse_expressao()
+        return ReturnNode(expressao, token=return_token)
+
+    def parse_metodo(self):
+        lista = VariableNode(self.expect(TokenKind.IDENTIFICADOR))
+        self.expect(TokenKind.PONTO)
+        metodo_token = self.current_token
+        if metodo_token is None or metodo_token[0] != TokenKind.IDENTIFICADOR or metodo_token[1] != 'append':
+            self.error("Só o método append é suportado nesta versão")
+        self.advance()
+        args = self.parse_argumentos()
+        if len(args) != 1:
+            self.error(f"append() recebe 1 argumento, mas recebeu {len(args)}")
+        return AppendNode(lista, args[0], token=metodo_token)
+
     def parse_atribuicao(self):
-        var_node = VariableNode(self.expect('Identificador'))
-        op_token = self.expect('Operador =')
+        var_node = VariableNode(self.expect(TokenKind.IDENTIFICADOR))
+        op_token = self.expect(TokenKind.ATRIBUICAO)
         expr_node = self.parse_expressao()
         return AssignmentNode(var_node, expr_node, token=op_token)
 
-    def parse_expressao(self):
-        return self.parse_comparacao()
-
-    def parse_comparacao(self):
-        node = self.parse_soma_sub()
-        while self.current_token and self.current_token[1] in ('<', '>', '==', '!=', '<=', '>='):
-            op_token = self.current_token; self.advance()
-            right_node = self.parse_soma_sub()
-            node = BinOpNode(left=node, op_token=op_token, right=right_node)
-        return node
-
-    def parse_soma_sub(self):
-        node = self.parse_mult_div()
-        while self.current_token and self.current_token[1] in ('+', '-'):
-            op_token = self.current_token; self.advance()
-            right_node = self.parse_mult_div()
-            node = BinOpNode(left=node, op_token=op_token, right=right_node)
-        return node
-
-    def parse_mult_div(self):
-        node = self.parse_fator()
-        while self.current_token and self.current_token[1] in ('*', '/', '%'):
-            op_token = self.current_token; self.advance()
-            right_node = self.parse_fator()
-            node = BinOpNode(left=node, op_token=op_token, right=right_node)
-        return node
+    def parse_expressao(self, forca_minima=0):
+        """
+        Precedence climbing sobre OPERADORES_BINARIOS: consome operadores enquanto
+        eles ligarem mais forte que `forca_minima`. Números e variáveis são lidos aqui
+        mesmo; cada operando custa uma única chamada, seja qual for o número de
+        níveis de precedência.
+        """
+        token = self.current_token
+        if token is None: self.error("Fator inesperado na expressão")
+        kind = token[0]
+        if kind == NUMERO:
+            self.advance()
+            node = NumberNode(token)
+        elif kind == IDENTIFICADOR:
+            self.advance()
+            proximo = self.current_token
+            if proximo and proximo[0] == ABRE_PARENTESE:
+                node = self.parse_chamada(token)
+            elif proximo and proximo[0] == ABRE_COLCHETE:
+                node = self.parse_indice(token)
+            else:
+                node = VariableNode(token)
+        else:
+            forca = OPERADORES_PREFIXADOS.get(token[1] if kind == PALAVRA_CHAVE else kind)
+            if forca is None:
+                node = self.parse_fator()
+            else:
+                if forca < forca_minima:
+                    self.error(f"Operador '{token[1]}' inesperado na expressão")
+                self.advance()
+                node = UnaryOpNode(op_token=token, operand=self.parse_expressao(forca))
+
+        binarios = OPERADORES_BINARIOS
+        while True:
+            token = self.current_token
+            if token is None:
+                return node
+            kind = token[0]
+            regra = binarios.get(token[1] if kind == PALAVRA_CHAVE else kind)
+            if regra is None or regra[0] <= forca_minima:
+                return node
+            forca, associa_a_direita = regra
+            self.advance()
+            right_node = self.parse_expressao(forca - 1 if associa_a_direita else forca)
+            node = BinOpNode(left=node, op_token=token, right=right_node)
 
     def parse_fator(self):
         token = self.current_token
-        if token[0] == 'Número': self.advance(); return NumberNode(token)
-        if token[0] == 'String': self.advance(); return StringNode(token)
-        if token[0] == 'Identificador': self.advance(); return VariableNode(token)
-        if token[0] == 'Abre Parêntese':
-            self.advance(); node = self.parse_expressao(); self.expect('Fecha Parêntese'); return node
-        if token[0] == 'Abre Colchete': return self.parse_lista()
+        if token is None: self.error("Fator inesperado na expressão")
+        kind = token[0]
+        # Números e variáveis já são tratados em parse_expressao
+        if kind == TokenKind.PALAVRA_CHAVE and token[1] in LITERAIS_BOOLEANOS: self.advance(); return BoolNode(token)
+        if kind == TokenKind.STRING: self.advance(); return StringNode(token)
+        if kind == TokenKind.ABRE_PARENTESE:
+            self.advance(); node = self.parse_expressao(); self.expect(TokenKind.FECHA_PARENTESE); return node
+        if kind == TokenKind.ABRE_COLCHETE: return self.parse_lista()
         self.error(f"Fator inesperado na expressão: {token[1]}")
 
+    def parse_chamada(self, nome_token):
+        args = self.parse_argumentos()
+        if nome_token[1] == 'len':
+            if len(args) != 1:
+                self.error(f"len() recebe 1 argumento, mas recebeu {len(args)}")
+            return LenNode(args[0], token=nome_token)
+        return CallNode(nome_token, args)
+
+    def parse_indice(self, nome_token):
+        abre_colchete = self.expect(TokenKind.ABRE_COLCHETE)
+        indice = self.parse_expressao()
+        self.expect(TokenKind.FECHA_COLCHETE)
+        return IndexNode(VariableNode(nome_token), indice, token=abre_colchete)
+
+    def parse_argumentos(self):
+        """Lista de argumentos entre parênteses (possivelmente vazia)."""
+        self.expect(TokenKind.ABRE_PARENTESE)
+        args = []
+        if self.current_token and self.current_token[0] != TokenKind.FECHA_PARENTESE:
+            args.append(self.parse_expressao())
+            while self.current_token and self.current_token[0] == TokenKind.VIRGULA:
+                self.advance()
+                args.append(self.parse_expressao())
+        self.expect(TokenKind.FECHA_PARENTESE)
+        return args
+
     def parse_if(self):
-        if_token = self.expect('Palavra-chave C', 'if')
+        if_token = self.expect(TokenKind.PALAVRA_CHAVE, 'if')
         condicao = self.parse_expressao()
-        self.expect('Dois Pontos')
+        self.expect(TokenKind.DOIS_PONTOS)
         if_block = self.parse_bloco()
         else_block = None
         if self.current_token and self.current_token[1] == 'else':
             self.advance()
-            self.expect('Dois Pontos')
+            self.expect(TokenKind.DOIS_PONTOS)
             else_block = self.parse_bloco()
         return IfNode(condicao, if_block, else_block, token=if_token)
 
     def parse_for(self):
-        for_token = self.expect('Palavra-chave C', 'for')
-        iterator_var = VariableNode(self.expect('Identificador'))
-        self.expect('Palavra-chave C', 'in')
-        iterable_var = VariableNode(self.expect('Identificador'))
-        self.expect('Dois Pontos')
+        for_token = self.expect(TokenKind.PALAVRA_CHAVE, 'for')
+        iterator_var = VariableNode(self.expect(TokenKind.IDENTIFICADOR))
+        self.expect(TokenKind.PALAVRA_CHAVE, 'in')
+        iterable_token = self.expect(TokenKind.IDENTIFICADOR)
+        proximo = self.current_token
+        if iterable_token[1] == 'range' and proximo and proximo[0] == TokenKind.ABRE_PARENTESE:
+            return self.parse_for_range(for_token, iterator_var)
+        iterable_var = VariableNode(iterable_token)
+        self.expect(TokenKind.DOIS_PONTOS)
         body = self.parse_bloco()
         return ForNode(iterator_var, iterable_var, body, token=for_token)
 
+    def parse_for_range(self, for_token, iterator_var):
+        # range(stop), range(start, stop) ou range(start, stop, step), como no Python;
+        # os argumentos omitidos viram os literais 0 e 1
+        abre_parentese = self.current_token
+        args = self.parse_argumentos()
+        if not 1 <= len(args) <= 3:
+            self.error(f"range() recebe de 1 a 3 argumentos, mas recebeu {len(args)}")
+        if len(args) == 1:
+            args.insert(0, NumberNode((TokenKind.NUMERO, '0', abre_parentese[2], abre_parentese[3])))
+        if len(args) == 2:
+            args.append(NumberNode((TokenKind.NUMERO, '1', abre_parentese[2], abre_parentese[3])))
+        self.expect(TokenKind.DOIS_PONTOS)
+        body = self.parse_bloco()
+        start, stop, step = args
+        return ForRangeNode(iterator_var, start, stop, step, body, token=for_token)
+
+    def parse_while(self):
+        while_token = self.expect(TokenKind.PALAVRA_CHAVE, 'while')
+        condicao = self.parse_expressao()
+        self.expect(TokenKind.DOIS_PONTOS)
+        body = self.parse_bloco()
+        return WhileNode(condicao, body, token=while_token)
+
     def parse_print(self):
-        print_token = self.expect('Palavra-chave C', 'printf')
-        self.expect('Abre Parêntese')
+        print_token = self.expect(TokenKind.PALAVRA_CHAVE, 'printf')
+        self.expect(TokenKind.ABRE_PARENTESE)
         args = [self.parse_expressao()]
-        while self.current_token and self.current_token[0] == 'Vírgula':
+        while self.current_token and self.current_token[0] == TokenKind.VIRGULA:
             self.advance()
             args.append(self.parse_expressao())
-        self.expect('Fecha Parêntese')
+        self.expect(TokenKind.FECHA_PARENTESE)
         return PrintNode(args, token=print_token)
 
     def parse_lista(self):
-        open_bracket_token = self.expect('Abre Colchete')
+        open_bracket_token = self.expect(TokenKind.ABRE_COLCHETE)
         elementos = []
-        if self.current_token[0] != 'Fecha Colchete':
+        if self.current_token[0] != TokenKind.FECHA_COLCHETE:
             elementos.append(self.parse_expressao())
-            while self.current_token and self.current_token[0] == 'Vírgula':
+            while self.current_token and self.current_token[0] == TokenKind.VIRGULA:
                 self.advance()
                 elementos.append(self.parse_expressao())
-        self.expect('Fecha Colchete')
+        self.expect(TokenKind.FECHA_COLCHETE)
         return ListNode(elementos, token=open_bracket_token)
\ No newline at end of file
@@ -0,0 +1,379 @@
+# redundancy_elimination.py
+
+from collections import Counter
+from ast_nodes import *
+from ast_visitor import filhos_com_campo, percorrer, substituir_filho, variaveis_atribuidas
+from py_to_c_lexer import TokenKind
+from constant_folding import valor_literal
+from semantic_analyzer import TIPO_INTEIRO, TIPO_NUMERO, TIPO_BOOL, inteiro_literal
+
+OPERADORES_COMUTATIVOS = frozenset({'+', '*', '==', '!=', '&&', '||'})
+# O operando direito só é avaliado às vezes; fora de condições (tipo booleano)
+# o resultado é um dos operandos, e a ordem deles importa
+OPERADORES_DE_CURTO_CIRCUITO = frozenset({'&&', '||'})
+# Só expressões escalares são guardadas em temporários
+TIPOS_CANDIDATOS = frozenset({TIPO_INTEIRO, TIPO_NUMERO, TIPO_BOOL})
+LACOS = (ForNode, ForRangeNode, WhileNode)
+
+def eh_candidata(node):
+    return isinstance(node, BinOpNode) and node.tipo in TIPOS_CANDIDATOS
+
+def raizes_de_expressao(statement):
+    """Expressões avaliadas diretamente por um comando, como (pai, campo, índice, expressão)."""
+    if isinstance(statement, AssignmentNode):
+        yield statement, 'expression', None, statement.expression
+    elif isinstance(statement, PrintNode):
+        for indice, arg in enumerate(statement.args):
+            yield statement, 'args', indice, arg
+    elif isinstance(statement, IfNode):
+        yield statement, 'condition', None, statement.condition
+    elif isinstance(statement, ForRangeNode):
+        yield statement, 'start', None, statement.start
+        yield statement, 'stop', None, statement.stop
+    elif isinstance(statement, WhileNode):
+        # Avaliada antes de cada iteração, não só uma vez antes do comando
+        yield statement, 'condition', None, statement.condition
+    elif isinstance(statement, ExpressionStatementNode):
+        yield statement, 'expression', None, statement.expression
+    elif isinstance(statement, AppendNode):
+        yield statement, 'value', None, statement.value
+    elif isinstance(statement, ReturnNode) and statement.expression is not None:
+        yield statement, 'expression', None, statement.expression
+
+def divisao_segura(node):
+    """
+    Falso para '/', '//' e '%' cujo divisor pode ser zero e para '**' cujo expoente
+    pode ser negativo (0 ** -1 e, entre inteiros, qualquer expoente negativo terminam
+    o programa): essas operações não podem ser executadas onde o programa original
+    não as executaria, nem descartadas.
+    """
+    if node.op == '**':
+        expoente = inteiro_literal(node.right)
+        return expoente is not None and expoente >= 0
+    if node.op not in ('/', '//', '%'):
+        return True
+    divisor = node.right
+    return isinstance(divisor, NumberNode) and bool(valor_literal(divisor))
+
+def pode_falhar(raiz):
+    """Verdadeiro se a expressão contém uma operação que pode falhar (ver divisao_segura) ou a leitura de um elemento de lista."""
+    return any(isinstance(node, IndexNode) or (isinstance(node, BinOpNode) and not divisao_segura(node))
+               for node in percorrer(raiz))
+
+def filhos_avaliados(node):
+    """
+    Como `filhos_com_campo`, mas sem o operando direito de um and/or quando ele pode
+    falhar: ele só é avaliado às vezes, então nada dele pode ir para antes do comando.
+    """
+    for campo, indice, filho in filhos_com_campo(node):
+        if (campo == 'right' and isinstance(node, BinOpNode)
+                and node.op in OPERADORES_DE_CURTO_CIRCUITO and pode_falhar(filho)):
+            continue
+        yield campo, indice, filho
+
+def blocos_aninhados(statement):
+    if isinstance(statement, IfNode):
+        yield statement.if_block
+        if statement.else_block:
+            yield statement.else_block
+    elif isinstance(statement, LACOS):
+        yield statement.body
+
+def por_escopo(ast, tabela_de_simbolos):
+    """
+    Percorre o programa um escopo por vez: o nível superior (sem as funções) e depois
+    o corpo de cada função, com a tabela no escopo dela (onde os temporários são declarados).
+    """
+    yield ast
+    for statement in ast.statements:
+        if isinstance(statement, FunctionDefNode):
+            with tabela_de_simbolos.escopo(tabela_de_simbolos.funcoes[statement.name]):
+                yield statement.body
+
+def nova_variavel(nome, tipo, origem):
+    node = VariableNode((TokenKind.IDENTIFICADOR, nome, origem.line, origem.col))
+    node.tipo = tipo
+    return node
+
+def nova_atribuicao(nome, expressao):
+    variavel = nova_variavel(nome, expressao.tipo, expressao)
+    return AssignmentNode(variavel, expressao, (TokenKind.ATRIBUICAO, '=', expressao.line, expressao.col))
+
+class GeradorDeTemporarios:
+    """Cria variáveis temporárias com nomes livres e as declara na tabela de símbolos."""
+    def __init__(self, tabela_de_simbolos, prefixo):
+        self.tabela_de_simbolos = tabela_de_simbolos
+        self.prefixo = prefixo
+        self._proximo = 0
+
+    def novo(self, tipo):
+        while True:
+            nome = f"{self.prefixo}{self._proximo}"
+            self._proximo += 1
+            if not self.tabela_de_simbolos.existe(nome):
+                self.tabela_de_simbolos.declarar(nome, tipo)
+                return nome
+
+class NumeradorDeValores:
+    """
+    Numeração de valores: expressões estruturalmente iguais sobre as mesmas versões
+    das variáveis recebem o mesmo número. Cada atribuição cria uma nova versão da
+    variável, então expressões calculadas antes dela deixam de ser equivalentes às
+    calculadas depois.
+    """
+    def __init__(self):
+        self.versoes = {}
+        self._numeros = {}
+        self._por_no = {}
+        self._proximo = 0
+
+    def _novo(self):
+        self._proximo += 1
+        return self._proximo
+
+    def nova_versao(self, nome):
+        self.versoes[nome] = self.versoes.get(nome, 0) + 1
+
+    def numero(self, node):
+        return self._por_no[id(node)]
+
+    def numerar(self, raiz):
+        """Numera todos os nós da expressão, em pós-ordem e sem recursão."""
+        pilha = [(raiz, False)]
+        while pilha:
+            node, filhos_prontos = pilha.pop()
+            if not filhos_prontos:
+                pilha.append((node, True))
+                for _, _, filho in reversed(list(filhos_com_campo(node))):
+                    pilha.append((filho, False))
+                continue
+            self._por_no[id(node)] = self._numero_de(node)
+
+    def _numero_de(self, node):
+        if isinstance(node, VariableNode):
+            chave = ('v', node.name, self.versoes.get(node.name, 0))
+        elif isinstance(node, NumberNode):
+            chave = ('n', node.value, node.tipo)
+        elif isinstance(node, BinOpNode):
+            esquerda = self._por_no[id(node.left)]
+            direita = self._por_no[id(node.right)]
+            comutativo = node.op in OPERADORES_COMUTATIVOS and (
+                node.op not in OPERADORES_DE_CURTO_CIRCUITO or node.tipo == TIPO_BOOL)
+            if comutativo and direita < esquerda:
+                esquerda, direita = direita, esquerda
+            chave = (node.op, esquerda, direita, node.tipo)
+        elif isinstance(node, UnaryOpNode):
+            chave = (node.op, self._por_no[id(node.operand)], node.tipo)
+        else:
+            # Nós sem semântica de valor conhecida nunca são considerados iguais
+            return self._novo()
+        numero = self._numeros.get(chave)
+        if numero is None:
+            numero = self._numeros[chave] = self._novo()
+        return numero
+
+class EliminadorDeSubexpressoes:
+    """
+    Eliminação de subexpressões comuns em cada bloco linear: uma expressão que se
+    repete (com as mesmas versões das variáveis) é calculada uma única vez em um
+    temporário `_cseN`, atribuído logo antes do primeiro comando que a usa.
+    """
+    def __init__(self, tabela_de_simbolos):
+        self.temporarios = GeradorDeTemporarios(tabela_de_simbolos, '_cse')
+        self.eliminadas = 0
+
+    def otimizar(self, ast):
+        for raiz in por_escopo(ast, self.temporarios.tabela_de_simbolos):
+            pendentes = [raiz]
+            while pendentes:
+                bloco = pendentes.pop()
+                self._bloco(bloco)
+                for statement in bloco.statements:
+                    pendentes.extend(blocos_aninhados(statement))
+        return ast
+
+    def _bloco(self, bloco):
+        numerador = NumeradorDeValores()
+        raizes_por_comando = []
+        contagem = Counter()
+        for statement in bloco.statements:
+            if isinstance(statement, WhileNode):
+                # A condição lê valores escritos pelo corpo: não pode ir para antes do laço
+                raizes = []
+            else:
+                raizes = list(raizes_de_expressao(statement))
+            for _, _, _, raiz in raizes:
+                numerador.numerar(raiz)
+                for _, _, _, node in self._percorrer(raiz):
+                    if eh_candidata(node):
+                        contagem[numerador.numero(node)] += 1
+            raizes_por_comando.append(raizes)
+            # Escritas invalidam as expressões anteriores que leem a variável
+            if isinstance(statement, AssignmentNode):
+                numerador.nova_versao(statement.variable.name)
+            elif isinstance(statement, (IfNode,) + LACOS):
+                for nome in variaveis_atribuidas(statement):
+                    numerador.nova_versao(nome)
+
+        if not any(n >= 2 for n in contagem.values()):
+            return
+
+        # Uma ocorrência dentro de outra subexpressão que será substituída não é mais
+        # avaliada; refaz as contagens até só restarem repetições efetivas.
+        while True:
+            efetivas = self._simular(raizes_por_comando, numerador, contagem)
+            mudou = False
+            for numero, total in contagem.items():
+                if total >= 2 and efetivas[numero] < 2:
+                    contagem[numero] = efetivas[numero]
+                    mudou = True
+            if not mudou:
+                break
+
+        novos = []
+        temporarios = {}
+        for statement, raizes in zip(bloco.statements, raizes_por_comando):
+            for pai, campo, indice, raiz in raizes:
+                novos.extend(self._reescrever(pai, campo, indice, raiz, numerador, contagem, temporarios))
+            novos.append(statement)
+        bloco.statements = novos
+
+    def _percorrer(self, raiz, pai=None, campo=None, indice=None):
+        pilha = [(pai, campo, indice, raiz)]
+        while pilha:
+            item = pilha.pop()
+            yield item
+            node = item[3]
+            for filho_campo, filho_indice, filho in reversed(list(filhos_avaliados(node))):
+                pilha.append((node, filho_campo, filho_indice, filho))
+
+    def _simular(self, raizes_por_comando, numerador, contagem):
+        efetivas = Counter()
+        vistos = set()
+        for raizes in raizes_por_comando:
+            for _, _, _, raiz in raizes:
+                pilha = [raiz]
+                while pilha:
+                    node = pilha.pop()
+                    if eh_candidata(node):
+                        numero = numerador.numero(node)
+                        if contagem[numero] >= 2:
+                            efetivas[numero] += 1
+                            if numero in vistos:
+                                continue  # será trocada pelo temporário: os filhos não são avaliados
+                            vistos.add(numero)
+                    pilha.extend(filho for _, _, filho in filhos_avaliados(node))
+        return efetivas
+
+    def _reescrever(self, pai, campo, indice, raiz, numerador, contagem, temporarios):
+        """Substitui as repetições na expressão; devolve as atribuições de temporários a inserir antes do comando."""
+        insercoes = []
+        pilha = [('visitar', pai, campo, indice, raiz)]
+        while pilha:
+            acao = pilha.pop()
+            if acao[0] == 'definir':
+                _, nome, node = acao
+                insercoes.append(nova_atribuicao(nome, node))
+                continue
+            _, pai, campo, indice, node = acao
+            if eh_candidata(node) and contagem[numerador.numero(node)] >= 2:
+                numero = numerador.numero(node)
+                nome = temporarios.get(numero)
+                if nome is not None:
+                    substituir_filho(pai, campo, indice, nova_variavel(nome, node.tipo, node))
+                    self.eliminadas += 1
+                    continue
+                nome = temporarios[numero] = self.temporarios.novo(node.tipo)
+                substituir_filho(pai, campo, indice, nova_variavel(nome, node.tipo, node))
+                # Os filhos são processados antes da definição: temporários internos vêm primeiro
+                pilha.append(('definir', nome, node))
+            for filho_campo, filho_indice, filho in reversed(list(filhos_avaliados(node))):
+                pilha.append(('visitar', node, filho_campo, filho_indice, filho))
+        return insercoes
+
+class MovedorDeInvariantes:
+    """
+    Move para antes de cada laço as expressões do corpo (e da condição do while)
+    cujo valor não muda entre as iterações (nenhuma variável lida é escrita no
+    laço). Cada expressão invariante
+    maximal é calculada uma vez em um temporário `_licmN`.
+    """
+    def __init__(self, tabela_de_simbolos):
+        self.temporarios = GeradorDeTemporarios(tabela_de_simbolos, '_licm')
+        self.movidas = 0
+
+    def otimizar(self, ast):
+        for raiz in por_escopo(ast, self.temporarios.tabela_de_simbolos):
+            self._bloco(raiz)
+        return ast
+
+    def _bloco(self, bloco):
+        novos = []
+        for statement in bloco.statements:
+            if isinstance(statement, LACOS):
+                # O laço externo é tratado antes: o que não depende de nenhum dos dois sai de ambos
+                novos.extend(self._mover(statement))
+            for aninhado in blocos_aninhados(statement):
+                self._bloco(aninhado)
+            novos.append(statement)
+        bloco.statements = novos
+
+    def _comandos(self, bloco):
+        pilha = [bloco]
+        while pilha:
+            atual = pilha.pop()
+            for statement in atual.statements:
+                yield statement
+                pilha.extend(blocos_aninhados(statement))
+
+    def _mover(self, laco):
+        escritas = variaveis_atribuidas(laco)  # inclui o iterador do for
+        numerador = NumeradorDeValores()
+        temporarios = {}
+        hoisted = []
+        raizes = []
+        if isinstance(laco, WhileNode):
+            raizes.append((laco, 'condition', None, laco.condition))
+        for statement in list(self._comandos(laco.body)):
+            raizes.extend(raizes_de_expressao(statement))
+        for pai, campo, indice, raiz in raizes:
+            numerador.numerar(raiz)
+            invariantes = self._invariantes(raiz, escritas)
+            pilha = [(pai, campo, indice, raiz)]
+            while pilha:
+                pai, campo, indice, node = pilha.pop()
+                if eh_candidata(node) and id(node) in invariantes:
+                    numero = numerador.numero(node)
+                    nome = temporarios.get(numero)
+                    if nome is None:
+                        nome = temporarios[numero] = self.temporarios.novo(node.tipo)
+                        hoisted.append(nova_atribuicao(nome, node))
+                    substituir_filho(pai, campo, indice, nova_variavel(nome, node.tipo, node))
+                    self.movidas += 1
+                    continue
+                for filho_campo, filho_indice, filho in filhos_com_campo(node):
+                    pilha.append((node, filho_campo, filho_indice, filho))
+        return hoisted
+
+    def _invariantes(self, raiz, escritas):
+        """ids dos nós da expressão cujo valor é o mesmo em todas as iterações."""
+        invariantes = set()
+        pilha = [(raiz, False)]
+        while pilha:
+            node, filhos_prontos = pilha.pop()
+            if not filhos_prontos:
+                pilha.append((node, True))
+                pilha.extend((filho, False) for _, _, filho in filhos_com_campo(node))
+                continue
+            if isinstance(node, NumberNode):
+                invariantes.add(id(node))
+            elif isinstance(node, VariableNode):
+                if node.name not in escritas:
+                    invariantes.add(id(node))
+            elif isinstance(node, BinOpNode):
+                if id(node.left) in invariantes and id(node.right) in invariantes and divisao_segura(node):
+                    invariantes.add(id(node))
+            elif isinstance(node, UnaryOpNode):
+                if id(node.operand) in invariantes:
+                    invariantes.add(id(node))
+        return invariantes
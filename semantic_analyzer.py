@@ -1,13 +1,97 @@
 # semantic_analyzer.py
 
+from contextlib import contextmanager
 from ast_nodes import *
+from ast_visitor import NodeVisitor, percorrer, variaveis_atribuidas
 
-TIPO_NUMERO = 'numero'
+TIPO_INTEIRO = 'inteiro'
+TIPO_NUMERO = 'numero'  # número real (double)
 TIPO_STRING = 'string'
+TIPO_ARRAY_INTEIRO = 'array_inteiro'
 TIPO_ARRAY_NUMERO = 'array_numero'
 TIPO_BOOL = 'booleano'
 TIPO_INDEFINIDO = 'indefinido'
 
+TIPOS_NUMERICOS = (TIPO_INTEIRO, TIPO_NUMERO)
+TIPOS_ARRAY = (TIPO_ARRAY_INTEIRO, TIPO_ARRAY_NUMERO)
+# Tipos que passam por parâmetros, retornos e variáveis globais lidas por funções
+TIPOS_ESCALARES = (TIPO_INTEIRO, TIPO_NUMERO, TIPO_BOOL)
+
+# Literais inteiros fora de 64 bits continuam sendo tratados como reais
+LIMITE_INTEIRO = 2 ** 63
+
+# Reconhecidas pelo parser (for ... in range(...), len(...)): não podem ser redefinidas
+FUNCOES_EMBUTIDAS = frozenset({'range', 'len'})
+
+def eh_numerico(tipo):
+    return tipo in TIPOS_NUMERICOS
+
+def unir_tipos(atual, novo):
+    """
+    Tipo de uma variável que recebe valores dos dois tipos: inteiro e real se
+    alargam para real (e o mesmo para arrays). Para tipos incompatíveis vale o
+    último atribuído.
+    """
+    if atual is None or atual == novo:
+        return novo
+    if atual in TIPOS_NUMERICOS and novo in TIPOS_NUMERICOS:
+        return TIPO_NUMERO
+    if atual in TIPOS_ARRAY and novo in TIPOS_ARRAY:
+        return TIPO_ARRAY_NUMERO
+    return novo
+
+def tipo_do_literal(texto):
+    try:
+        valor = int(texto, 0)
+    except ValueError:
+        return TIPO_NUMERO
+    return TIPO_INTEIRO if -LIMITE_INTEIRO <= valor < LIMITE_INTEIRO else TIPO_NUMERO
+
+def tipo_logico(tipo):
+    """Tipo de um operando de and/or/not: números e booleanos (como inteiros); None para os demais."""
+    if tipo == TIPO_BOOL:
+        return TIPO_INTEIRO
+    return tipo if tipo in TIPOS_NUMERICOS else None
+
+def unir_escalares(atual, novo):
+    """
+    Como unir_tipos, para parâmetros e retornos: um booleano junto com um número
+    passa a valer como inteiro (como True + 1 no Python), em vez de valer o último.
+    """
+    if atual is None or atual == novo:
+        return novo
+    return unir_tipos(tipo_logico(atual), tipo_logico(novo))
+
+def sempre_retorna(bloco):
+    """Verdadeiro se todo caminho pelo bloco termina em um return."""
+    if not bloco.statements:
+        return False
+    ultimo = bloco.statements[-1]
+    if isinstance(ultimo, ReturnNode):
+        return True
+    if isinstance(ultimo, IfNode) and ultimo.else_block is not None:
+        return sempre_retorna(ultimo.if_block) and sempre_retorna(ultimo.else_block)
+    return False
+
+def inteiro_literal(node):
+    """Valor de um inteiro literal, com sinal ou não (ex.: o passo 2 ou -1 de um range()); None nos outros casos."""
+    sinal = 1
+    if isinstance(node, UnaryOpNode) and node.op in ('-', '+'):
+        sinal = -1 if node.op == '-' else 1
+        node = node.operand
+    if not isinstance(node, NumberNode):
+        return None
+    try:
+        return sinal * int(node.value, 0)
+    except ValueError:
+        return None
+
+def tipo_do_elemento(tipo_array):
+    return TIPO_INTEIRO if tipo_array == TIPO_ARRAY_INTEIRO else TIPO_NUMERO
+
+def tipo_de_array(tipo_elemento):
+    return TIPO_ARRAY_INTEIRO if tipo_elemento == TIPO_INTEIRO else TIPO_ARRAY_NUMERO
+
 class SemanticError(Exception):
     def __init__(self, message, line=None, col=None):
         super().__init__(message)
@@ -20,118 +104,441 @@ class SemanticError(Exception):
             return f"Erro Semântico na linha {self.line}, coluna {self.col}: {self.message}"
         return f"Erro Semântico: {self.message}"
 
+class Funcao:
+    """
+    Uma função do programa. Cada uma vira uma única função C, então o tipo de cada
+    parâmetro é a união dos argumentos de todas as chamadas, e o do retorno, a união
+    dos valores dos returns. `locais` é o escopo da função (parâmetros incluídos).
+    """
+    __slots__ = ('nome', 'node', 'parametros', 'nomes_locais', 'locais', 'tipos_dos_parametros',
+                 'retorno', 'retorna_valor', 'globais_lidas', 'chamadas', 'chave_da_analise', 'em_analise')
+
+    def __init__(self, node):
+        self.nome = node.name
+        self.node = node
+        self.parametros = tuple(node.params)
+        # Como no Python, todo nome atribuído no corpo é local à função inteira
+        self.nomes_locais = set(node.params) | variaveis_atribuidas(node.body)
+        self.locais = {}
+        self.tipos_dos_parametros = [None] * len(self.parametros)
+        self.retorno = None
+        nos = list(percorrer(node.body))
+        self.retorna_valor = any(isinstance(n, ReturnNode) and n.expression is not None for n in nos)
+        self.globais_lidas = tuple(sorted({n.name for n in nos if isinstance(n, VariableNode)} - self.nomes_locais))
+        self.chamadas = tuple(sorted({n.name for n in nos if isinstance(n, CallNode)}))
+        self.chave_da_analise = None  # tipos com que o corpo foi analisado pela última vez
+        self.em_analise = False
+
+    @property
+    def analisada(self):
+        return self.chave_da_analise is not None
+
 class TabelaDeSimbolos:
     def __init__(self):
-        self.simbolos = {}
+        self.simbolos = {}  # variáveis do nível superior (globais)
+        self.funcoes = {}  # nome -> Funcao
+        self._escopos = []
+        self.funcao_atual = None  # função cujo corpo está sendo visitado (None no nível superior)
+
+    @contextmanager
+    def escopo(self, funcao):
+        """Dentro do bloco, os nomes locais de `funcao` são resolvidos no escopo dela."""
+        self._escopos.append(funcao)
+        self.funcao_atual = funcao
+        try:
+            yield funcao
+        finally:
+            self._escopos.pop()
+            self.funcao_atual = self._escopos[-1] if self._escopos else None
+
+    def _simbolos_de(self, nome):
+        funcao = self.funcao_atual
+        if funcao is not None and nome in funcao.nomes_locais:
+            return funcao.locais
+        return self.simbolos
 
     def declarar(self, nome, tipo):
-        if nome in self.simbolos:
-            pass
-        self.simbolos[nome] = {'tipo': tipo}
+        if self.funcao_atual is not None:
+            self.funcao_atual.nomes_locais.add(nome)
+        self._simbolos_de(nome)[nome] = {'tipo': tipo}
+
+    def existe(self, nome):
+        """Verdadeiro se `nome` já é uma variável visível no escopo atual ou uma função."""
+        funcao = self.funcao_atual
+        return (nome in self.simbolos or nome in self.funcoes
+                or (funcao is not None and nome in funcao.nomes_locais))
 
     def consultar(self, nome):
-        simbolo = self.simbolos.get(nome)
+        simbolo = self._simbolos_de(nome).get(nome)
         if not simbolo:
             # O erro é lançado aqui, mas será capturado e enriquecido com linha/coluna
             raise SemanticError(f"Variável '{nome}' não foi declarada antes do uso.")
         return simbolo
 
     def definir_tipo(self, nome, tipo):
-        self.simbolos[nome] = {'tipo': tipo}
+        self._simbolos_de(nome)[nome] = {'tipo': tipo}
+
+    def unir_tipo(self, nome, tipo):
+        """Registra mais um valor atribuído à variável, alargando o tipo dela se preciso."""
+        simbolos = self._simbolos_de(nome)
+        simbolo = simbolos.get(nome)
+        simbolos[nome] = {'tipo': unir_tipos(simbolo['tipo'] if simbolo else None, tipo)}
+
+    def tipos(self):
+        """Todos os tipos inferidos até aqui, para comparar uma passagem da análise com a anterior."""
+        globais = {nome: info['tipo'] for nome, info in self.simbolos.items()}
+        funcoes = {
+            nome: (tuple(funcao.tipos_dos_parametros), funcao.retorno,
+                   {local: info['tipo'] for local, info in funcao.locais.items()})
+            for nome, funcao in self.funcoes.items()
+        }
+        return globais, funcoes
 
-class AnalisadorSemantico:
+class AnalisadorSemantico(NodeVisitor):
     def __init__(self, ast):
         self.ast = ast
         self.tabela_de_simbolos = TabelaDeSimbolos()
+        # ids dos and/or usados só como condição (if, while, not): ali só importa se o
+        # valor é verdadeiro, e o C gerado é um && ou || comum
+        self._condicoes = set()
 
-    def analisar(self):
-        self.visit(self.ast)
-        return self.tabela_de_simbolos
+    def _marcar_condicao(self, node):
+        pilha = [node]
+        while pilha:
+            node = pilha.pop()
+            if isinstance(node, BinOpNode) and node.op in ('&&', '||'):
+                self._condicoes.add(id(node))
+                pilha.extend((node.left, node.right))
 
-    def visit(self, node):
-        method_name = f'visit_{type(node).__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+    def analisar(self):
+        # Cada variável vira uma única declaração C, então seu tipo é a união de tudo
+        # o que ela recebe no programa. Uma atribuição posterior (ex.: dentro de um
+        # laço) pode alargar o tipo de leituras anteriores: a análise é repetida até
+        # nenhum tipo mudar. Como os tipos só alargam, isso termina rapidamente.
+        # O mesmo vale para parâmetros e retornos de funções, inferidos nas chamadas.
+        while True:
+            antes = self.tabela_de_simbolos.tipos()
+            self.visit(self.ast)
+            if self.tabela_de_simbolos.tipos() == antes:
+                return self.tabela_de_simbolos
 
     def generic_visit(self, node):
         return
 
+    # Os métodos com `yield filho` são executados pela pilha explícita do NodeVisitor
+
     def visit_ProgramNode(self, node):
         for statement in node.statements:
-            self.visit(statement)
+            yield statement
 
     def visit_AssignmentNode(self, node):
         nome_variavel = node.variable.name
-        tipo_expressao = self.visit(node.expression)
-        self.tabela_de_simbolos.definir_tipo(nome_variavel, tipo_expressao)
+        if nome_variavel in self.tabela_de_simbolos.funcoes:
+            raise SemanticError(f"'{nome_variavel}' é uma função e não pode receber valores.",
+                                line=node.variable.line, col=node.variable.col)
+        tipo_expressao = yield node.expression
+        tabela = self.tabela_de_simbolos
+        tabela.unir_tipo(nome_variavel, tipo_expressao)
+        if isinstance(node.expression, VariableNode) and tipo_expressao in TIPOS_ARRAY:
+            # As duas variáveis passam a apontar para a mesma lista: os tipos precisam ser iguais
+            tabela.unir_tipo(node.expression.name, tabela.consultar(nome_variavel)['tipo'])
+        node.variable.tipo = tabela.consultar(nome_variavel)['tipo']
+
+    # Toda expressão tem o tipo inferido anotado em `node.tipo` para as fases seguintes
 
     def visit_BinOpNode(self, node):
-        tipo_esquerda = self.visit(node.left)
-        tipo_direita = self.visit(node.right)
+        tipo_esquerda = yield node.left
+        tipo_direita = yield node.right
         
-        operadores_numericos = ['+', '-', '*', '/', '%']
+        operadores_numericos = ['+', '-', '*', '/', '%', '//', '**']
         operadores_logicos = ['<', '>', '==', '!=', '<=', '>=']
+        operadores_booleanos = ['&&', '||']
 
         if node.op in operadores_numericos:
-            if tipo_esquerda != TIPO_NUMERO or tipo_direita != TIPO_NUMERO:
+            if not eh_numerico(tipo_esquerda) or not eh_numerico(tipo_direita):
                 raise SemanticError(
                     f"Operação '{node.op}' inválida entre os tipos '{tipo_esquerda}' e '{tipo_direita}'.",
                     line=node.line, col=node.col
                 )
-            return TIPO_NUMERO
+            # Como no Python: '/' é sempre divisão real; os demais só são inteiros entre inteiros
+            if node.op == '/':
+                node.tipo = TIPO_NUMERO
+            elif node.op == '**':
+                # Entre inteiros o resultado só é real com expoente negativo: com um
+                # literal isso já se sabe aqui; um expoente variável negativo é um
+                # erro em tempo de execução (o tipo C já foi decidido como inteiro)
+                expoente = inteiro_literal(node.right)
+                if TIPO_NUMERO in (tipo_esquerda, tipo_direita) or (expoente is not None and expoente < 0):
+                    node.tipo = TIPO_NUMERO
+                else:
+                    node.tipo = TIPO_INTEIRO
+            else:
+                node.tipo = unir_tipos(tipo_esquerda, tipo_direita)
+            return node.tipo
         elif node.op in operadores_logicos:
-            if tipo_esquerda != tipo_direita and (tipo_esquerda != TIPO_NUMERO or tipo_direita != TIPO_NUMERO):
+            if tipo_esquerda in TIPOS_ARRAY or tipo_direita in TIPOS_ARRAY:
+                raise SemanticError("Comparações entre listas não são suportadas nesta versão.",
+                                    line=node.line, col=node.col)
+            if tipo_esquerda != tipo_direita and not (eh_numerico(tipo_esquerda) and eh_numerico(tipo_direita)):
                  raise SemanticError(
                     f"Comparação '{node.op}' inválida entre os tipos '{tipo_esquerda}' e '{tipo_direita}'.",
                     line=node.line, col=node.col
                 )
+            node.tipo = TIPO_BOOL
             return TIPO_BOOL
+        elif node.op in operadores_booleanos:
+            if tipo_logico(tipo_esquerda) is None or tipo_logico(tipo_direita) is None:
+                raise SemanticError(
+                    f"Operação '{node.op}' inválida entre os tipos '{tipo_esquerda}' e '{tipo_direita}'.",
+                    line=node.line, col=node.col
+                )
+            # Como no Python, o resultado é um dos operandos: só é booleano se os dois
+            # forem, ou se o valor só é usado como condição
+            if (tipo_esquerda == TIPO_BOOL and tipo_direita == TIPO_BOOL) or id(node) in self._condicoes:
+                node.tipo = TIPO_BOOL
+            else:
+                if any(isinstance(filho, CallNode) for filho in percorrer(node.left)):
+                    # O operando da esquerda é avaliado duas vezes no C gerado
+                    raise SemanticError(
+                        f"O operando da esquerda de um '{node.op}' que devolve um número não pode chamar funções nesta versão.",
+                        line=node.line, col=node.col
+                    )
+                node.tipo = unir_tipos(tipo_logico(tipo_esquerda), tipo_logico(tipo_direita))
+            return node.tipo
         
         raise SemanticError(f"Operador desconhecido: {node.op}", line=node.line, col=node.col)
 
+    def visit_UnaryOpNode(self, node):
+        if node.op == '!':
+            self._marcar_condicao(node.operand)
+        tipo_operando = yield node.operand
+        if node.op == '!':
+            valido = tipo_logico(tipo_operando) is not None
+            node.tipo = TIPO_BOOL
+        else:
+            valido = eh_numerico(tipo_operando)
+            node.tipo = tipo_operando
+        if not valido:
+            raise SemanticError(f"Operação '{node.op}' inválida para o tipo '{tipo_operando}'.",
+                                line=node.line, col=node.col)
+        return node.tipo
+
+    # --- Funções ---
+
+    def visit_FunctionDefNode(self, node):
+        # O corpo é analisado nas chamadas, quando os tipos dos parâmetros são conhecidos
+        tabela = self.tabela_de_simbolos
+        funcao = tabela.funcoes.get(node.name)
+        if funcao is not None:
+            if funcao.node is not node:
+                raise SemanticError(f"A função '{node.name}' já foi definida.", line=node.line, col=node.col)
+            return
+        if node.name in FUNCOES_EMBUTIDAS:
+            raise SemanticError(f"'{node.name}' é uma função embutida e não pode ser redefinida nesta versão.",
+                                line=node.line, col=node.col)
+        if node.name in tabela.simbolos:
+            raise SemanticError(f"'{node.name}' já é uma variável e não pode ser o nome de uma função.",
+                                line=node.line, col=node.col)
+        funcao = Funcao(node)
+        if funcao.retorna_valor:
+            sem_valor = next((n for n in percorrer(node.body) if isinstance(n, ReturnNode) and n.expression is None), None)
+            if sem_valor is not None:
+                raise SemanticError(f"A função '{node.name}' tem returns com e sem valor (None não é suportado).",
+                                    line=sem_valor.line, col=sem_valor.col)
+            if not sempre_retorna(node.body):
+                raise SemanticError(f"A função '{node.name}' pode terminar sem retornar um valor (None não é suportado).",
+                                    line=node.line, col=node.col)
+        tabela.funcoes[node.name] = funcao
+
+    def visit_ReturnNode(self, node):
+        if node.expression is None:
+            return
+        tipo = yield node.expression
+        if tipo not in TIPOS_ESCALARES:
+            raise SemanticError(f"Funções só podem retornar números nesta versão (o valor é do tipo '{tipo}').",
+                                line=node.expression.line, col=node.expression.col)
+        funcao = self.tabela_de_simbolos.funcao_atual
+        funcao.retorno = unir_escalares(funcao.retorno, tipo)
+
+    def visit_CallNode(self, node):
+        return (yield from self._chamada(node, como_comando=False))
+
+    def visit_ExpressionStatementNode(self, node):
+        yield from self._chamada(node.expression, como_comando=True)
+
+    def _chamada(self, node, como_comando):
+        tabela = self.tabela_de_simbolos
+        atual = tabela.funcao_atual
+        if atual is not None and node.name in atual.nomes_locais:
+            raise SemanticError(f"'{node.name}' é uma variável local, não uma função.", line=node.line, col=node.col)
+        funcao = tabela.funcoes.get(node.name)
+        if funcao is None:
+            raise SemanticError(f"Função '{node.name}' não foi definida antes do uso.", line=node.line, col=node.col)
+        if len(node.args) != len(funcao.parametros):
+            raise SemanticError(
+                f"A função '{node.name}' recebe {len(funcao.parametros)} argumento(s), mas foi chamada com {len(node.args)}.",
+                line=node.line, col=node.col)
+
+        for i, arg in enumerate(node.args):
+            tipo = yield arg
+            if tipo not in TIPOS_ESCALARES:
+                raise SemanticError(f"Argumentos de função só podem ser números nesta versão (o argumento é do tipo '{tipo}').",
+                                    line=arg.line, col=arg.col)
+            funcao.tipos_dos_parametros[i] = unir_escalares(funcao.tipos_dos_parametros[i], tipo)
+
+        # Numa chamada recursiva vale o retorno inferido até aqui
+        if not funcao.em_analise:
+            chave = self._chave_da_analise(funcao)
+            if chave != funcao.chave_da_analise:
+                yield from self._analisar_corpo(funcao)
+                # A chave é a da entrada: se a própria análise alargou algum tipo, a
+                # próxima chamada (ou a próxima passagem do ponto fixo) analisa de novo
+                funcao.chave_da_analise = chave
+
+        node.tipo = funcao.retorno
+        if node.tipo is None and funcao.retorna_valor:
+            # Chamada recursiva antes de qualquer return analisado: começa pelo tipo
+            # numérico mais estreito e o ponto fixo alarga se os returns pedirem
+            node.tipo = TIPO_INTEIRO
+        if node.tipo is None and not como_comando:
+            raise SemanticError(f"A função '{node.name}' não retorna um valor.", line=node.line, col=node.col)
+        return node.tipo
+
+    def _chave_da_analise(self, funcao):
+        """Tudo de que dependem os tipos anotados no corpo da função."""
+        tabela = self.tabela_de_simbolos
+        globais = tuple(tabela.simbolos[nome]['tipo'] if nome in tabela.simbolos else None
+                        for nome in funcao.globais_lidas)
+        retornos = tuple(tabela.funcoes[nome].retorno if nome in tabela.funcoes else None
+                         for nome in funcao.chamadas)
+        locais = tuple(sorted((nome, info['tipo']) for nome, info in funcao.locais.items()))
+        return tuple(funcao.tipos_dos_parametros), locais, globais, retornos
+
+    def _analisar_corpo(self, funcao):
+        for nome, tipo in zip(funcao.parametros, funcao.tipos_dos_parametros):
+            simbolo = funcao.locais.get(nome)
+            funcao.locais[nome] = {'tipo': unir_escalares(simbolo['tipo'] if simbolo else None, tipo)}
+        funcao.em_analise = True
+        try:
+            with self.tabela_de_simbolos.escopo(funcao):
+                yield funcao.node.body
+        finally:
+            funcao.em_analise = False
+
     def visit_IfNode(self, node):
-        self.visit(node.condition)
-        self.visit(node.if_block)
+        self._marcar_condicao(node.condition)
+        yield node.condition
+        yield node.if_block
         if node.else_block:
-            self.visit(node.else_block)
+            yield node.else_block
 
     def visit_ForNode(self, node):
-        tipo_iteravel = self.visit(node.iterable_var)
-        if tipo_iteravel != TIPO_ARRAY_NUMERO:
+        tipo_iteravel = yield node.iterable_var
+        if tipo_iteravel not in TIPOS_ARRAY:
             raise SemanticError(f"Só é possível iterar sobre um array de números (a variável '{node.iterable_var.name}' é do tipo '{tipo_iteravel}').",
             line=node.iterable_var.line, col=node.iterable_var.col)
-        self.tabela_de_simbolos.definir_tipo(node.iterator_var.name, TIPO_NUMERO)
-        self.visit(node.body)
+        self.tabela_de_simbolos.unir_tipo(node.iterator_var.name, tipo_do_elemento(tipo_iteravel))
+        yield node.body
+
+    def visit_ForRangeNode(self, node):
+        for argumento in (node.start, node.stop, node.step):
+            tipo = yield argumento
+            if tipo not in (TIPO_INTEIRO, TIPO_BOOL):
+                raise SemanticError(f"Os argumentos de range() precisam ser inteiros (o argumento é do tipo '{tipo}').",
+                                    line=argumento.line, col=argumento.col)
+        # Com o sinal do passo conhecido, o laço C compara o índice sempre do mesmo jeito
+        passo = inteiro_literal(node.step)
+        if passo is None:
+            raise SemanticError("O passo de range() precisa ser um inteiro literal nesta versão.",
+                                line=node.step.line, col=node.step.col)
+        if passo == 0:
+            raise SemanticError("O passo de range() não pode ser zero.", line=node.step.line, col=node.step.col)
+        self.tabela_de_simbolos.unir_tipo(node.iterator_var.name, TIPO_INTEIRO)
+        yield node.body
+
+    def visit_WhileNode(self, node):
+        self._marcar_condicao(node.condition)
+        yield node.condition
+        yield node.body
+
+    def visit_AppendNode(self, node):
+        tipo_lista = yield node.list_var
+        if tipo_lista not in TIPOS_ARRAY:
+            raise SemanticError(f"append só pode ser usado em listas (a variável '{node.list_var.name}' é do tipo '{tipo_lista}').",
+                                line=node.list_var.line, col=node.list_var.col)
+        tipo_valor = yield node.value
+        if not eh_numerico(tipo_valor):
+            raise SemanticError("Listas só podem conter números nesta versão.", line=node.value.line, col=node.value.col)
+        self.tabela_de_simbolos.unir_tipo(node.list_var.name, tipo_de_array(tipo_valor))
 
     def visit_PrintNode(self, node):
         for arg in node.args:
-            self.visit(arg)
+            yield arg
 
     def visit_VariableNode(self, node):
         try:
             simbolo = self.tabela_de_simbolos.consultar(node.name)
-            return simbolo['tipo']
         except SemanticError as e:
-            raise SemanticError(str(e), line=node.line, col=node.col)
+            raise SemanticError(e.message, line=node.line, col=node.col)
+        node.tipo = simbolo['tipo']
+        funcao = self.tabela_de_simbolos.funcao_atual
+        if funcao is not None and node.tipo not in TIPOS_ESCALARES and node.name not in funcao.nomes_locais:
+            raise SemanticError(
+                f"Funções só podem ler variáveis globais numéricas nesta versão ('{node.name}' é do tipo '{node.tipo}').",
+                line=node.line, col=node.col)
+        return node.tipo
+
+    def visit_LenNode(self, node):
+        tipo = yield node.operand
+        if tipo not in TIPOS_ARRAY or not isinstance(node.operand, VariableNode):
+            raise SemanticError(f"len() só é suportado para variáveis de lista nesta versão (o argumento é do tipo '{tipo}').",
+                                line=node.operand.line, col=node.operand.col)
+        node.tipo = TIPO_INTEIRO
+        return TIPO_INTEIRO
+
+    def visit_IndexNode(self, node):
+        tipo_lista = yield node.list_var
+        if tipo_lista not in TIPOS_ARRAY:
+            raise SemanticError(f"Só é possível indexar listas (a variável '{node.list_var.name}' é do tipo '{tipo_lista}').",
+                                line=node.list_var.line, col=node.list_var.col)
+        tipo_indice = yield node.index
+        if tipo_indice not in (TIPO_INTEIRO, TIPO_BOOL):
+            raise SemanticError(f"Índices de lista precisam ser inteiros (o índice é do tipo '{tipo_indice}').",
+                                line=node.index.line, col=node.index.col)
+        node.tipo = tipo_do_elemento(tipo_lista)
+        return node.tipo
 
     def visit_NumberNode(self, node):
-        return TIPO_NUMERO
+        node.tipo = tipo_do_literal(node.value)
+        return node.tipo
+
+    def visit_BoolNode(self, node):
+        node.tipo = TIPO_BOOL
+        return TIPO_BOOL
 
     def visit_StringNode(self, node):
+        node.tipo = TIPO_STRING
         return TIPO_STRING
 
     def visit_ListNode(self, node):
         if not node.elements:
-            return TIPO_ARRAY_NUMERO
+            # O tipo mais estreito: o que a lista recebe depois (append, outras atribuições) alarga
+            node.tipo = TIPO_ARRAY_INTEIRO
+            return node.tipo
         
-        primeiro_tipo = self.visit(node.elements[0])
-        if primeiro_tipo != TIPO_NUMERO:
+        primeiro_tipo = yield node.elements[0]
+        if not eh_numerico(primeiro_tipo):
             raise SemanticError("Listas só podem conter números nesta versão.", line=node.elements[0].line, col=node.elements[0].col)
         
+        tipo_elementos = primeiro_tipo
         for elemento in node.elements[1:]:
-            if self.visit(elemento) != primeiro_tipo:
+            tipo_elemento = yield elemento
+            if not eh_numerico(tipo_elemento):
                 raise SemanticError("Todos os elementos da lista devem ser do mesmo tipo.", line=elemento.line, col=elemento.col)
-        return TIPO_ARRAY_NUMERO
+            tipo_elementos = unir_tipos(tipo_elementos, tipo_elemento)
+        node.tipo = tipo_de_array(tipo_elementos)
+        return node.tipo
         
     def visit_DictNode(self, node):
+        node.tipo = TIPO_INDEFINIDO
         return TIPO_INDEFINIDO
\ No newline at end of file
@@ -0,0 +1,152 @@
+# strength_reduction.py
+#
+# Redução de força: troca operações caras por equivalentes baratas quando o
+# resultado é exatamente o mesmo do Python.
+#   - x ** n, com n inteiro literal: n = 0 vira 1, n = 1 vira x; com x inteiro e
+#     n até LIMITE_DO_EXPOENTE, multiplicações no lugar da chamada a py_pot_i: x * x
+#     e x * x * x, e a partir de x ** 4 quadrados sucessivos em temporários `_potN`
+#     calculados antes do comando (x ** 8 são 3 multiplicações). Com x real só
+#     x ** 2 vira x * x: para os outros expoentes o pow() do C é o que dá o mesmo
+#     arredondamento do Python.
+#   - a // 2**k e a % 2**k, com `a` inteiro: viram a >> k e a & (2**k - 1). Os dois
+#     arredondam para baixo também com `a` negativo, como o '//' e o '%' do Python
+#     (o >> de um long negativo é aritmético no gcc e no clang).
+
+from ast_nodes import *
+from ast_visitor import filhos_com_campo, substituir_filho
+from constant_folding import novo_numero
+from py_to_c_lexer import TokenKind
+from redundancy_elimination import (GeradorDeTemporarios, blocos_aninhados, nova_atribuicao, nova_variavel,
+                                    por_escopo, raizes_de_expressao)
+from semantic_analyzer import TIPO_INTEIRO, TIPO_NUMERO, inteiro_literal
+
+# Expoentes maiores continuam com a chamada a py_pot_i
+LIMITE_DO_EXPOENTE = 8
+
+def expoente_de_dois(valor):
+    """k se `valor` é 2**k com k >= 1; None nos outros casos."""
+    if valor is None or valor < 2 or valor & (valor - 1):
+        return None
+    return valor.bit_length() - 1
+
+def nova_operacao(esquerda, op, direita, tipo, origem):
+    """BinOpNode sintetizado, na posição do nó `origem`."""
+    node = BinOpNode(esquerda, (TokenKind.OPERADOR, op, origem.line, origem.col), direita)
+    node.tipo = tipo
+    return node
+
+def copia_da_variavel(variavel):
+    node = VariableNode((TokenKind.IDENTIFICADOR, variavel.name, variavel.line, variavel.col))
+    node.tipo = variavel.tipo
+    return node
+
+def produto(fatores, tipo, origem):
+    """Multiplicação das variáveis `fatores`, da esquerda para a direita."""
+    resultado = copia_da_variavel(fatores[0])
+    for fator in fatores[1:]:
+        resultado = nova_operacao(resultado, '*', copia_da_variavel(fator), tipo, origem)
+    return resultado
+
+class ReduzidorDeForca:
+    """Reescreve potências com expoente literal e divisões/restos inteiros por potências de 2."""
+    def __init__(self, tabela_de_simbolos):
+        self.temporarios = GeradorDeTemporarios(tabela_de_simbolos, '_pot')
+        self.estatisticas = {
+            'potências reduzidas': 0,
+            'divisões por potências de 2 reduzidas': 0,
+        }
+        # Do comando sendo reescrito: atribuições a inserir antes dele (None se nada
+        # pode ir para antes) e (variável, k) -> temporário com variável ** 2**k
+        self._insercoes = None
+        self._quadrados = {}
+
+    def otimizar(self, ast):
+        for raiz in por_escopo(ast, self.temporarios.tabela_de_simbolos):
+            pendentes = [raiz]
+            while pendentes:
+                bloco = pendentes.pop()
+                novos = []
+                for statement in bloco.statements:
+                    # A condição do while é avaliada a cada iteração, não só antes do laço
+                    self._insercoes = None if isinstance(statement, WhileNode) else []
+                    self._quadrados = {}
+                    for pai, campo, indice, expressao in list(raizes_de_expressao(statement)):
+                        self._expressao(pai, campo, indice, expressao)
+                    novos.extend(self._insercoes or ())
+                    novos.append(statement)
+                    pendentes.extend(blocos_aninhados(statement))
+                bloco.statements = novos
+        return ast
+
+    def _expressao(self, pai, campo, indice, raiz):
+        # Pré-ordem: os filhos de cada nó são obtidos depois que ele foi trocado,
+        # então as partes mantidas do nó original também são percorridas
+        pilha = [(pai, campo, indice, raiz)]
+        while pilha:
+            pai, campo, indice, node = pilha.pop()
+            if isinstance(node, BinOpNode):
+                novo = self._reduzir(node)
+                if novo is not node:
+                    substituir_filho(pai, campo, indice, novo)
+                    node = novo
+            pilha.extend((node, filho_campo, filho_indice, filho)
+                         for filho_campo, filho_indice, filho in filhos_com_campo(node))
+
+    def _potencia_inteira(self, base, expoente):
+        """base ** expoente (expoente >= 2) como multiplicações, ou None se precisaria de temporários onde não cabem."""
+        if expoente <= 3:
+            return produto([base] * expoente, TIPO_INTEIRO, base)
+        if self._insercoes is None:
+            return None
+        # quadrados[k] é a variável com base ** 2**k
+        quadrados = [base]
+        for k in range(1, expoente.bit_length()):
+            nome = self._quadrados.get((base.name, k))
+            if nome is None:
+                anterior = quadrados[-1]
+                nome = self._quadrados[base.name, k] = self.temporarios.novo(TIPO_INTEIRO)
+                self._insercoes.append(nova_atribuicao(nome, produto([anterior, anterior], TIPO_INTEIRO, base)))
+            quadrados.append(nova_variavel(nome, TIPO_INTEIRO, base))
+        fatores = [quadrados[k] for k in reversed(range(expoente.bit_length())) if expoente >> k & 1]
+        return produto(fatores, TIPO_INTEIRO, base)
+
+    def _reduzir(self, node):
+        if node.op == '**':
+            return self._potencia(node)
+        if node.op in ('//', '%') and node.tipo == TIPO_INTEIRO and node.left.tipo == TIPO_INTEIRO:
+            return self._divisao(node)
+        return node
+
+    def _potencia(self, node):
+        expoente = inteiro_literal(node.right)
+        base = node.left
+        if expoente is None or expoente < 0 or node.tipo != base.tipo:
+            return node
+        if expoente == 1:
+            novo = base
+        elif not isinstance(base, VariableNode):
+            # Os outros casos descartam ou repetem a base: só sem efeitos ao avaliá-la
+            return node
+        elif expoente == 0:
+            novo = novo_numero(1, node.tipo, node)
+        elif node.tipo == TIPO_INTEIRO and expoente <= LIMITE_DO_EXPOENTE:
+            novo = self._potencia_inteira(base, expoente)
+            if novo is None:
+                return node
+        elif node.tipo == TIPO_NUMERO and expoente == 2:
+            novo = produto([base, base], TIPO_NUMERO, base)
+        else:
+            return node
+        self.estatisticas['potências reduzidas'] += 1
+        return novo
+
+    def _divisao(self, node):
+        k = expoente_de_dois(inteiro_literal(node.right))
+        if k is None:
+            return node
+        if node.op == '//':
+            novo = nova_operacao(node.left, '>>', novo_numero(k, TIPO_INTEIRO, node.right), TIPO_INTEIRO, node)
+        else:
+            novo = nova_operacao(node.left, '&', novo_numero((1 << k) - 1, TIPO_INTEIRO, node.right), TIPO_INTEIRO, node)
+        self.estatisticas['divisões por potências de 2 reduzidas'] += 1
+        return novo